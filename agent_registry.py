@@ -0,0 +1,119 @@
+import ast
+import importlib
+import importlib.util
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agents.base_agent import BaseAgent
+
+# Class attributes read from an agent's source (without importing it) when a spec leaves them unset
+_STATIC_ATTRIBUTES = ("keywords", "consumes_upstream", "cacheable", "uses_history")
+
+
+@dataclass
+class AgentSpec:
+    """Declares an agent by name and "module:Class" target without importing it.
+
+    keywords, consumes_upstream, cacheable and uses_history default to the class's own
+    literal attributes, read from its source file, so routing never needs the agent module.
+    """
+    name: str
+    target: str
+    description: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    keywords: Optional[List[str]] = None
+    consumes_upstream: Optional[bool] = None
+    cacheable: Optional[bool] = None
+    uses_history: Optional[bool] = None
+
+
+class LazyAgent(BaseAgent):
+    """Stand-in that imports and builds the real agent on its first routed task.
+
+    Routing only needs the declared keywords, so an orchestrator over lazy agents
+    starts without importing agent modules or their dependencies. Attributes the
+    proxy does not define are forwarded to the real agent.
+    """
+
+    def __init__(self, spec: AgentSpec):
+        super().__init__(spec.name, spec.description)
+        self._agent: Optional[BaseAgent] = None
+        self._lock = threading.Lock()
+        self.spec = spec
+        declared = {"keywords": spec.keywords, "consumes_upstream": spec.consumes_upstream,
+                    "cacheable": spec.cacheable, "uses_history": spec.uses_history}
+        if any(value is None for value in declared.values()):
+            found = read_class_attributes(spec.target, _STATIC_ATTRIBUTES)
+            declared = {name: found.get(name) if value is None else value for name, value in declared.items()}
+        self.keywords = list(declared["keywords"] or [])
+        self.consumes_upstream = bool(declared["consumes_upstream"])
+        self.cacheable = bool(declared["cacheable"])
+        self.uses_history = bool(declared["uses_history"])
+
+    @property
+    def loaded(self) -> bool:
+        return self._agent is not None
+
+    @property
+    def agent(self) -> BaseAgent:
+        """The real agent, imported and constructed on first access."""
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    agent_class = load_target(self.spec.target)
+                    self._agent = agent_class(name=self.name, description=self.description, **self.spec.kwargs)
+        return self._agent
+
+    def run(self, task_description: str, context: dict) -> str:
+        return self.agent.run(task_description, context)
+
+    async def arun(self, task_description: str, context: dict) -> str:
+        return await self.agent.arun(task_description, context)
+
+    def has_native_arun(self) -> bool:
+        return self.agent.has_native_arun()
+
+    def can_handle_task(self, task_description: str) -> bool:
+        if self.keywords:
+            return any(keyword in task_description.lower() for keyword in self.keywords)
+        return self.agent.can_handle_task(task_description)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+
+
+def load_target(target: str) -> Any:
+    """Imports a "module:attribute" target."""
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def read_class_attributes(target: str, names: tuple) -> Dict[str, Any]:
+    """Reads literal class attributes from a "module:Class" target's source without executing it."""
+    module_name, _, class_name = target.partition(":")
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        raise ValueError(f"Cannot locate source for agent module {module_name!r}")
+    with open(spec.origin, encoding="utf-8") as source_file:
+        tree = ast.parse(source_file.read(), spec.origin)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            found = {}
+            for statement in node.body:
+                if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+                    target_node, value = statement.targets[0], statement.value
+                elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+                    target_node, value = statement.target, statement.value
+                else:
+                    continue
+                if isinstance(target_node, ast.Name) and target_node.id in names:
+                    found[target_node.id] = ast.literal_eval(value)
+            return found
+    raise ValueError(f"Class {class_name!r} not found in {spec.origin}")
+
+
+def build_lazy_agents(specs: List[AgentSpec]) -> List[LazyAgent]:
+    return [LazyAgent(spec) for spec in specs]
@@ -2,21 +2,19 @@ import streamlit as st
 import asyncio
 import logging
 import os
+from collections import deque
 
 # Import agents and orchestrator
 from workflows.orchestrator import Orchestrator
-from agents.rag_agent import RagAgent
-from agents.tag_agent import TagAgent
-from agents.email_agent import EmailAgent
-from agents.compliance_agent import ComplianceAgent
-from agents.sales_agent import SalesAgent
-from agents.hr_agent import HRAgent
-
-# Import utility for real-time execution
-from utils.realtime_utils import async_run_task
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from workflows.default_orchestrator import build_default_orchestrator
+from workflows.workflow_history import WorkflowHistory
+from config.config import (HISTORY_MAX_ENTRIES, HISTORY_MAX_SESSIONS, HISTORY_SPILL_PATH, LOG_LEVEL,
+                           WORK_QUEUE_UI_MAX_ITEMS)
+from utils.log_config import setup_buffered_logging
+from utils.metrics import metrics
+
+# Configure logging; records are formatted and written off the request thread
+setup_buffered_logging(level=getattr(logging, LOG_LEVEL, logging.INFO))
 logger = logging.getLogger(__name__)
 
 # Set Streamlit page config
@@ -24,15 +22,9 @@ st.set_page_config(page_title="Agentic AI Workflow Manager", layout="wide")
 
 def init_orchestrator():
     # Initialize mock agents (real agents would have actual dependencies injected)
-    rag_agent = RagAgent(name="RAG Agent", description="Retrieves information from knowledge bases.", vector_store=None, retriever=None)
-    tag_agent = TagAgent(name="TAG Agent", description="Processes and analyzes tabular data.", db_connector=None)
-    email_agent = EmailAgent(name="Email Agent", description="Manages email communications.", email_client=None)
-    compliance_agent = ComplianceAgent(name="Compliance Agent", description="Ensures regulatory adherence and audits.", compliance_tool=None)
-    sales_agent = SalesAgent(name="Sales Agent", description="Handles sales-related tasks like lead scoring.", crm_api=None)
-    hr_agent = HRAgent(name="HR Agent", description="Manages HR processes like candidate screening.", hr_system_api=None)
-
-    agents = [rag_agent, tag_agent, email_agent, compliance_agent, sales_agent, hr_agent]
-    return Orchestrator(agents=agents)
+    history = WorkflowHistory(max_entries=HISTORY_MAX_ENTRIES, max_sessions=HISTORY_MAX_SESSIONS,
+                              spill_path=HISTORY_SPILL_PATH)
+    return build_default_orchestrator(history=history)
 
 # Initialize orchestrator once
 if 'orchestrator' not in st.session_state:
@@ -40,11 +32,12 @@ if 'orchestrator' not in st.session_state:
 
 orchestrator = st.session_state.orchestrator
 
-async def run_workflow_streamlit(task_description: str, orch: Orchestrator):
+async def run_workflow_streamlit(task_description: str, orch: Orchestrator, profile: bool = False):
     """Runs the workflow and handles Streamlit display."""
     try:
-        # Simulate asynchronous execution using async_run_task
-        result = await async_run_task(orch.run_workflow, task_description)
+        # Agents run off the event loop via BaseAgent.arun
+        # Only set the profile key when ticked, so unprofiled runs see the same context as before
+        result = await orch.arun_workflow(task_description, {"profile": True} if profile else {})
         return result
     except Exception as e:
         logger.error(f"Error running workflow: {e}")
@@ -61,12 +54,19 @@ task_description = st.text_area(
     height=100
 )
 
-if st.button("Trigger Workflow"):
+profile_run = st.checkbox(
+    "Profile this run (cProfile)", value=False,
+    help="Runs the agent in a worker thread so cProfile can see it; async agents get their own event loop there.",
+)
+
+col_run, col_queue = st.columns(2)
+
+if col_run.button("Trigger Workflow"):
     if task_description:
         with st.spinner("Running workflow... Please wait."):
             try:
                 # Run the asynchronous workflow
-                workflow_output = asyncio.run(run_workflow_streamlit(task_description, orchestrator))
+                workflow_output = asyncio.run(run_workflow_streamlit(task_description, orchestrator, profile_run))
                 st.success(f"Workflow completed!\n\nResult: {workflow_output}")
             except ValueError as ve:
                 st.error(f"Workflow Error: {ve}")
@@ -75,5 +75,38 @@ if st.button("Trigger Workflow"):
     else:
         st.warning("Please enter a task description to trigger a workflow.")
 
+if col_queue.button("Queue Workflow"):
+    if task_description:
+        # Hand off to the background work queue so this request returns immediately.
+        # Imported here so the queue and its worker pools only load once they are used.
+        from utils.realtime_utils import process_queue_item
+        try:
+            future = process_queue_item(task_description)
+            # Bounded like the workflow history: the oldest entries drop off the list
+            queued = st.session_state.setdefault('queued_workflows', deque(maxlen=WORK_QUEUE_UI_MAX_ITEMS))
+            queued.append((task_description, future))
+            st.info("Workflow queued.")
+        except ValueError as ve:
+            st.error(f"Workflow Error: {ve}")
+    else:
+        st.warning("Please enter a task description to queue a workflow.")
+
+if st.session_state.get('queued_workflows'):
+    st.subheader("Queued workflows")
+    for queued_task, future in st.session_state.queued_workflows:
+        if not future.done():
+            st.write(f"⏳ {queued_task}")
+        elif future.exception() is not None:
+            st.write(f"❌ {queued_task}: {future.exception()}")
+        else:
+            st.write(f"✅ {queued_task}: {future.result()}")
 
-print(f"Created {project_root}/app.py")
+with st.expander("Metrics"):
+    if orchestrator.response_cache is not None:
+        st.caption("Workflow response cache")
+        st.json(orchestrator.response_cache.stats())
+    st.code(metrics.to_prometheus(), language="text")
+    if metrics.profiles:
+        latest = metrics.profiles[-1]
+        st.caption(f"Latest profile: {latest['label']}")
+        st.code(latest["report"], language="text")
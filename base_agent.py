@@ -1,17 +1,36 @@
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Callable, Any
+from typing import Callable, Any, List, Optional
 
 @dataclass
 class Tool:
-    """Represents a tool that an agent can use."""
+    """Represents a tool that an agent can use.
+
+    func may be a plain function or a coroutine function. max_concurrency caps
+    simultaneous calls when the tool is invoked through a ToolRegistry.
+    """
     name: str
     description: str
     func: Callable[..., Any]
+    max_concurrency: Optional[int] = None
 
 class BaseAgent(ABC):
     """Abstract base class for all specialized agents."""
 
+    # Routing keywords compiled into the orchestrator's routing index.
+    # Agents that leave this empty are routed through can_handle_task instead.
+    keywords: List[str] = []
+    # Set by agents that act on other agents' results (e.g. sending a report); in
+    # planned DAG workflows they run after every earlier step instead of in parallel.
+    consumes_upstream: bool = False
+    # Whether the orchestrator may answer a repeated task from its response cache.
+    # Off by default; only read-only agents (retrieval, table queries) opt in.
+    cacheable: bool = False
+    # Set by agents that reason over the conversation; the orchestrator then packs the
+    # session's earlier turns into the general-agent prompt and passes it as context["prompt"].
+    uses_history: bool = False
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -21,9 +40,20 @@ class BaseAgent(ABC):
         """Executes the agent's specific task."""
         pass
 
+    async def arun(self, task_description: str, context: dict) -> str:
+        """Executes the agent's task without blocking the event loop.
+
+        The default offloads the synchronous run method to the loop's thread pool;
+        agents with native async clients should override this.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, task_description, context)
+
+    def has_native_arun(self) -> bool:
+        """Whether the agent overrides arun rather than offloading run to a thread."""
+        return type(self).arun is not BaseAgent.arun
+
     @abstractmethod
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task."""
         pass
-
-print(f"Created {project_root}/agents/base_agent.py")
@@ -0,0 +1,166 @@
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence
+
+from workflows.process_worker import DEFAULT_FACTORY, init_process_worker, load_factory, run_in_process_worker, run_one
+
+# Where a record's task text comes from, first match wins; "a+b" joins several fields
+# (so backlog-style {"request_id", "title", "body"} records run as "title\n\nbody")
+DEFAULT_TASK_FIELDS = ("task", "task_description", "title+body")
+
+
+def iter_tasks(stream: IO[str], task_fields: Sequence[str] = DEFAULT_TASK_FIELDS) -> Iterator[Dict[str, Any]]:
+    """Lazily parses JSONL task records: {"id" (or "request_id"), <task fields>, "context"}.
+
+    The task text is taken from the first of task_fields present in the record; an
+    entry like "title+body" joins those fields with a blank line.
+
+    A line that cannot be used is yielded as {"id", "line", "error"} instead, so one
+    bad line is reported in the output rather than aborting the batch.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"id": line_number, "line": line_number, "error": f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield {"id": line_number, "line": line_number, "error": "Task record must be a JSON object"}
+            continue
+        task = _task_text(record, task_fields)
+        if not task:
+            yield {"id": record.get("id", record.get("request_id", line_number)), "line": line_number,
+                   "error": f"Missing task field (expected one of: {', '.join(task_fields)})"}
+            continue
+        yield {
+            "id": record.get("id", record.get("request_id", line_number)),
+            "task": task,
+            "context": record.get("context") or {},
+        }
+
+
+def _task_text(record: Dict[str, Any], task_fields: Sequence[str]) -> Optional[str]:
+    for task_field in task_fields:
+        parts = [record.get(name) for name in task_field.split("+")]
+        if all(isinstance(part, str) and part.strip() for part in parts):
+            return "\n\n".join(part.strip() for part in parts)
+    return None
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_batch(tasks: Iterator[Dict[str, Any]], output: IO[str], factory_path: str = DEFAULT_FACTORY,
+              mode: str = "thread", workers: int = 8, max_in_flight: Optional[int] = None) -> Dict[str, Any]:
+    """Streams tasks through a worker pool, writing result lines as they complete.
+
+    Thread mode shares one orchestrator across workers; process mode builds one per
+    worker process. At most max_in_flight tasks are submitted at a time, so input is
+    read only as fast as workers drain it.
+    """
+    max_in_flight = max_in_flight or workers * 4
+    executor: Executor
+    if mode == "thread":
+        orchestrator = load_factory(factory_path)()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda record: executor.submit(run_one, orchestrator, record)
+    elif mode == "process":
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_process_worker,
+                                       initargs=(factory_path,))
+        submit = lambda record: executor.submit(run_in_process_worker, record)
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    latencies: List[float] = []
+    failures = invalid = 0
+    in_flight: set = set()
+    started = time.perf_counter()
+
+    def drain(done: set) -> None:
+        nonlocal failures
+        for future in done:
+            result = future.result()
+            latencies.append(result["latency_ms"])
+            if "error" in result or str(result.get("result", "")).startswith("Error:"):
+                failures += 1
+            output.write(json.dumps(result) + "\n")
+
+    with executor:
+        for record in tasks:
+            if "error" in record:
+                invalid += 1
+                failures += 1
+                output.write(json.dumps(record) + "\n")
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                drain(done)
+            in_flight.add(submit(record))
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            drain(done)
+    output.flush()
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "tasks": len(latencies) + invalid,
+        "failures": failures,
+        "invalid": invalid,
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run workflow tasks from a JSONL file through a worker pool.")
+    parser.add_argument("input", help="JSONL file of tasks ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for results ('-' for stdout)")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum submitted but unfinished tasks (default: 4 x workers)")
+    parser.add_argument("--task-field", action="append", dest="task_fields", default=None,
+                        help="Record field holding the task text, tried in the order given; join several "
+                             "fields with '+', e.g. title+body (default: " + ", ".join(DEFAULT_TASK_FIELDS) + ")")
+    parser.add_argument("--factory", default=DEFAULT_FACTORY,
+                        help="module:function returning the Orchestrator to use")
+    args = parser.parse_args(argv)
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = run_batch(iter_tasks(input_stream, args.task_fields or DEFAULT_TASK_FIELDS), output_stream, args.factory, args.mode,
+                            args.workers, args.max_in_flight)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(
+        f"Processed {summary['tasks']} tasks ({summary['failures']} failed, {summary['invalid']} invalid) in {summary['elapsed_s']:.2f}s: "
+        f"{summary['throughput_per_s']:.1f} tasks/s, p50 {summary['p50_ms']:.2f} ms, "
+        f"p95 {summary['p95_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""Offline benchmark suite for routing, workflow execution, retrieval and tool dispatch.
+
+Run everything at the default scale and write the results as JSON:
+
+    python benchmarks.py -o results.json
+
+Compare a new run against a saved baseline; the exit status is 1 when any metric
+regressed by more than the threshold:
+
+    python benchmarks.py --compare results.json --threshold 0.15
+
+Corpora are synthetic and seeded, and retrieval uses the local HashingEmbedder, so
+runs are reproducible and need no network access.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from workflows.batch_runner import percentile
+from workflows.default_orchestrator import build_default_agents
+from workflows.orchestrator import Orchestrator
+from workflows.workflow_history import WorkflowHistory
+
+# Chunk counts for the chunking and retrieval benchmarks at each --scale
+SCALES = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+
+# Metric name suffixes and which direction is better
+_LOWER_IS_BETTER = ("_ms", "_s")
+_HIGHER_IS_BETTER = ("_per_s",)
+
+_ROUTING_TASKS = [
+    "Retrieve the latest sales report for Q1 and email it to stakeholders",
+    "Start onboarding for the new employee in engineering",
+    "Audit the vendor contracts for GDPR compliance",
+    "Analyze the spreadsheet of customer leads",
+]
+
+
+class _SyntheticAgent(BaseAgent):
+    """Agent with generated routing keywords and an optional simulated I/O delay."""
+
+    def __init__(self, name: str, keywords: List[str], latency: float = 0.0):
+        super().__init__(name, f"Synthetic agent {name}")
+        self.keywords = keywords
+        self.latency = latency
+
+    def run(self, task_description: str, context: dict) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"{self.name} handled: {task_description}"
+
+    async def arun(self, task_description: str, context: dict) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return f"{self.name} handled: {task_description}"
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return any(keyword in task_description.lower() for keyword in self.keywords)
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """Times func over repeat rounds of number calls; reports per-call latency in milliseconds."""
+    func()  # warm-up: imports, caches, lazily compiled indexes
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - started) / number * 1000)
+    rounds.sort()
+    median = percentile(rounds, 0.50)
+    return {
+        "median_ms": median,
+        "p95_ms": percentile(rounds, 0.95),
+        "min_ms": rounds[0],
+        "ops_per_s": 1000 / median if median else 0.0,
+    }
+
+
+def synthetic_words(count: int, vocabulary: int = 5000, seed: int = 0) -> List[str]:
+    """Draws Zipf-distributed words from a generated vocabulary, like natural text."""
+    rng = np.random.default_rng(seed)
+    words = np.asarray([f"w{index:x}" for index in range(vocabulary)])
+    ranks = np.minimum(rng.zipf(1.3, size=count), vocabulary) - 1
+    return words[ranks].tolist()
+
+
+def synthetic_chunks(count: int, words_per_chunk: int = 40, seed: int = 0) -> Iterator[str]:
+    """Yields count unique synthetic chunks, generated in blocks to bound memory."""
+    block = 10_000
+    for start in range(0, count, block):
+        size = min(block, count - start)
+        words = synthetic_words(size * words_per_chunk, seed=seed + start)
+        for row in range(size):
+            yield f"chunk {start + row} " + " ".join(words[row * words_per_chunk:(row + 1) * words_per_chunk])
+
+
+def bench_routing(agent_counts: Sequence[int] = (8, 64, 512), keywords_per_agent: int = 16) -> Dict[str, Any]:
+    """select_agent latency as the number of agents and routing keywords grows."""
+    results = {}
+    for agent_count in agent_counts:
+        agents = [
+            _SyntheticAgent(f"agent-{index}", [f"kw{index}x{keyword}" for keyword in range(keywords_per_agent)])
+            for index in range(agent_count)
+        ]
+        # Keep the real routing vocabulary so the sample tasks still resolve
+        agents.append(_SyntheticAgent("catch-all", ["sales", "onboarding", "compliance", "spreadsheet"]))
+        orchestrator = Orchestrator(agents)
+        tasks = _ROUTING_TASKS + [f"please handle kw{agent_count - 1}x3 for the quarterly review"]
+        timing = measure(lambda: [orchestrator.select_agent(task) for task in tasks], number=200)
+        results[f"agents_{agent_count}"] = {
+            "keywords": agent_count * keywords_per_agent + 4,
+            "median_ms": timing["median_ms"] / len(tasks),
+            "p95_ms": timing["p95_ms"] / len(tasks),
+            "ops_per_s": timing["ops_per_s"] * len(tasks),
+        }
+    return results
+
+
+def bench_workflow(tasks: int = 200, agent_latency: float = 0.002) -> Dict[str, Any]:
+    """run_workflow end to end: sequential sync calls vs concurrent arun_workflow calls."""
+    workload = [_ROUTING_TASKS[index % len(_ROUTING_TASKS)] for index in range(tasks)]
+    results = {}
+    for label, orchestrator in (
+        # No response cache: after the warm-up run every call would be a cache hit
+        ("default_agents", Orchestrator(build_default_agents(), history=WorkflowHistory(max_entries=tasks * 2))),
+        ("io_bound_agents", Orchestrator(
+            [_SyntheticAgent("io", ["sales", "onboarding", "compliance", "spreadsheet"], latency=agent_latency)],
+            history=WorkflowHistory(max_entries=tasks * 2),
+        )),
+    ):
+        async def run_async() -> None:
+            await asyncio.gather(*(orchestrator.arun_workflow(task) for task in workload))
+
+        sync = measure(lambda: [orchestrator.run_workflow(task) for task in workload], repeat=3)
+        concurrent = measure(lambda: asyncio.run(run_async()), repeat=3)
+        results[label] = {
+            "tasks": tasks,
+            "sync_s": sync["median_ms"] / 1000,
+            "async_s": concurrent["median_ms"] / 1000,
+            "sync_tasks_per_s": tasks / (sync["median_ms"] / 1000),
+            "async_tasks_per_s": tasks / (concurrent["median_ms"] / 1000),
+        }
+    return results
+
+
+def bench_chunking(chunks: int, chunk_size: int = 500, chunk_overlap: int = 50) -> Dict[str, Any]:
+    """chunk_documents throughput on a synthetic corpus sized to produce about `chunks` chunks."""
+    from utils.rag_utils import chunk_documents
+
+    document_count = max(1, chunks // 100)
+    sample = synthetic_words(10_000)
+    mean_word_chars = sum(len(word) + 1 for word in sample) / len(sample)
+    words = synthetic_words(int(chunks * (chunk_size - chunk_overlap) / mean_word_chars))
+    per_document = len(words) // document_count
+    documents = [" ".join(words[index * per_document:(index + 1) * per_document]) for index in range(document_count)]
+    corpus_chars = sum(len(document) for document in documents)
+    started = time.perf_counter()
+    produced = len(chunk_documents(documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": document_count,
+        "chunks": produced,
+        "elapsed_s": elapsed,
+        "chunks_per_s": produced / elapsed,
+        "mb_per_s": corpus_chars / elapsed / 1e6,
+    }
+
+
+def bench_retrieval(chunks: int, queries: int = 256, k: int = 5, dim: int = 256,
+                    batch_size: int = 10_000) -> Dict[str, Any]:
+    """Index build and vector vs hybrid query latency over `chunks` synthetic chunks."""
+    from utils.embeddings import HashingEmbedder
+    from utils.rag_utils import retrieve_documents, retrieve_documents_batch
+    from utils.vector_index import VectorIndex
+
+    query_texts = [" ".join(synthetic_words(6, seed=10_000_000 + index)) for index in range(queries)]
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(directory, HashingEmbedder(n_features=dim))
+        started = time.perf_counter()
+        batch: List[str] = []
+        for text in synthetic_chunks(chunks):
+            batch.append(text)
+            if len(batch) >= batch_size:
+                index.add_texts(batch)
+                batch = []
+        if batch:
+            index.add_texts(batch)
+        index.save()
+        build_s = time.perf_counter() - started
+
+        results: Dict[str, Any] = {"chunks": len(index), "dim": dim, "build_s": build_s,
+                                   "build_chunks_per_s": len(index) / build_s}
+        for hybrid in (False, True):
+            mode = "hybrid" if hybrid else "vector"
+            retrieve_documents(index, query_texts[0], k=k, hybrid=hybrid)  # builds BM25 for hybrid
+            single = measure(lambda: retrieve_documents(index, query_texts[1], k=k, hybrid=hybrid), number=5)
+            started = time.perf_counter()
+            retrieve_documents_batch(index, query_texts, k=k, hybrid=hybrid)
+            batch_s = time.perf_counter() - started
+            results[mode] = {
+                "query_median_ms": single["median_ms"],
+                "query_p95_ms": single["p95_ms"],
+                "batch_queries_per_s": queries / batch_s,
+            }
+    return results
+
+
+@contextlib.contextmanager
+def _simulated_tag_registry(latency: float) -> Iterator[None]:
+    """Swaps the TAG tool registry for one with the given latency and starts from a cold cache."""
+    from utils import tag_utils
+
+    original = tag_utils.tool_registry
+    tag_utils.tool_registry = tag_utils.build_tool_registry(latency=latency, connect_latency=latency)
+    tag_utils.invalidate_tag_cache()
+    try:
+        yield
+    finally:
+        tag_utils.tool_registry = original
+        tag_utils.invalidate_tag_cache()
+
+
+def bench_tag_dispatch(latency: float = 0.005, calls: int = 64) -> Dict[str, Any]:
+    """process_tag_query against simulated-latency tools: uncached, cached and async fan-out."""
+    from utils.tag_utils import afan_out_tag_queries, process_tag_query
+
+    tools = ["google_sheets", "notion", "crm"]
+    queries = [(tools[index % len(tools)], f"sales lead task {index}") for index in range(calls)]
+    with _simulated_tag_registry(latency):
+        uncached = measure(lambda: process_tag_query("crm", "customer leads", use_cache=False), number=10)
+        cached = measure(lambda: process_tag_query("crm", "customer leads"), number=1000)
+        fan_out = measure(lambda: asyncio.run(afan_out_tag_queries(queries, use_cache=False)), repeat=3)
+    return {
+        "simulated_latency_ms": latency * 1000,
+        "uncached_median_ms": uncached["median_ms"],
+        "cached_median_ms": cached["median_ms"],
+        "fan_out_calls": calls,
+        "fan_out_s": fan_out["median_ms"] / 1000,
+        "fan_out_calls_per_s": calls / (fan_out["median_ms"] / 1000),
+    }
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Dict[str, Any]]] = {
+    "routing": lambda args: bench_routing(),
+    "workflow": lambda args: bench_workflow(),
+    "chunking": lambda args: bench_chunking(SCALES[args.scale]),
+    "retrieval": lambda args: bench_retrieval(SCALES[args.scale], dim=args.dim),
+    "tag_dispatch": lambda args: bench_tag_dispatch(latency=args.tag_latency),
+}
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flattens nested results into {"bench.case.metric": value} for comparison."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Lists timing/throughput metrics that got worse than the baseline by more than threshold."""
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    regressions = []
+    for name, before in old.items():
+        after = new.get(name)
+        if after is None or before <= 0:
+            continue
+        metric = name.rsplit(".", 1)[-1]
+        if metric.endswith(_HIGHER_IS_BETTER):
+            change = (before - after) / before
+        elif metric.endswith(_LOWER_IS_BETTER):
+            change = (after - before) / before
+        else:
+            continue
+        if change > threshold:
+            regressions.append({"metric": name, "baseline": before, "current": after, "worse_by": change})
+    return sorted(regressions, key=lambda regression: -regression["worse_by"])
+
+
+def run_benchmarks(names: Sequence[str], args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = BENCHMARKS[name](args)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scale": args.scale,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("-o", "--output", default="-", help="JSON file for results ('-' for stdout)")
+    parser.add_argument("--scale", choices=list(SCALES), default="small",
+                        help="Corpus size for chunking/retrieval: " +
+                             ", ".join(f"{name}={count:,} chunks" for name, count in SCALES.items()))
+    parser.add_argument("--dim", type=int, default=256, help="HashingEmbedder dimensions for retrieval")
+    parser.add_argument("--tag-latency", type=float, default=0.005, help="Simulated TAG tool latency (seconds)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown that counts as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    current = run_benchmarks(args.benchmarks or list(BENCHMARKS), args)
+    report = json.dumps(current, indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(report + "\n")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding="utf-8") as baseline_file:
+        regressions = compare(json.load(baseline_file), current, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['metric']}: {regression['baseline']:.4g} -> {regression['current']:.4g} "
+            f"({regression['worse_by']:.0%} worse)",
+            file=sys.stderr,
+        )
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}.", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
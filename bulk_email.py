@@ -0,0 +1,284 @@
+import smtplib
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from email.utils import make_msgid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from config.config import (
+    EMAIL_BURST,
+    EMAIL_CONNECTIONS,
+    EMAIL_MESSAGES_PER_CONNECTION,
+    EMAIL_RATE_LIMIT,
+    EMAIL_SENDER,
+    SMTP_HOST,
+    SMTP_PASSWORD,
+    SMTP_PORT,
+    SMTP_USE_TLS,
+    SMTP_USERNAME,
+)
+from utils.metrics import metrics
+
+Recipient = Union[str, Dict[str, Any]]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills at rate tokens/second up to capacity."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks until tokens are available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                # Tolerate float rounding so a sleep of exactly the computed delay always suffices
+                if self._tokens >= tokens - 1e-9:
+                    self._tokens = max(0.0, self._tokens - tokens)
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class EmailTemplate:
+    """Subject and body templates in str.format syntax, e.g. "Hi {name}".
+
+    Field names are parsed once up front, so rendering only depends on the fields the
+    templates actually use and identical personalizations share one rendering.
+    """
+
+    def __init__(self, subject: str, body: str):
+        self.subject = subject
+        self.body = body
+        formatter = string.Formatter()
+        self.fields = tuple(sorted({
+            name.split(".")[0].split("[")[0]
+            for template in (subject, body)
+            for _literal, name, _spec, _conversion in formatter.parse(template)
+            if name
+        }))
+        self._rendered: Dict[Tuple[Any, ...], Tuple[str, str]] = {}
+        self.renders = 0
+
+    def render(self, values: Dict[str, Any]) -> Tuple[str, str]:
+        """Returns (subject, body), rendering only for personalizations not seen before."""
+        key = tuple(_hashable(values.get(name)) for name in self.fields)
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            missing = [name for name in self.fields if name not in values]
+            if missing:
+                raise KeyError(f"Missing template fields: {', '.join(missing)}")
+            rendered = self._rendered[key] = (self.subject.format(**values), self.body.format(**values))
+            self.renders += 1
+        return rendered
+
+
+@dataclass
+class SendResult:
+    """Outcome for one recipient: "sent", "failed" or "duplicate"."""
+    recipient: str
+    status: str
+    error: Optional[str] = None
+    message_id: Optional[str] = None
+
+
+@dataclass
+class BulkSendReport:
+    """Per-recipient outcomes of a bulk send, in input order."""
+    results: List[SendResult] = field(default_factory=list)
+    renders: int = 0
+    connections: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for result in self.results if result.status == "sent")
+
+    @property
+    def failed(self) -> List[SendResult]:
+        return [result for result in self.results if result.status == "failed"]
+
+    def summary(self) -> str:
+        return (f"Sent {self.sent}/{len(self.results)} emails ({len(self.failed)} failed) in {self.elapsed:.2f}s "
+                f"over {self.connections} connection(s), {self.renders} unique rendering(s)")
+
+
+def default_smtp_factory(host: str = SMTP_HOST, port: int = SMTP_PORT, username: Optional[str] = SMTP_USERNAME,
+                         password: Optional[str] = SMTP_PASSWORD, use_tls: bool = SMTP_USE_TLS,
+                         timeout: float = 30.0) -> Callable[[], smtplib.SMTP]:
+    """Returns a factory opening authenticated SMTP connections with the configured settings."""
+    def connect() -> smtplib.SMTP:
+        client = smtplib.SMTP(host, port, timeout=timeout)
+        if use_tls:
+            client.starttls()
+        if username:
+            client.login(username, password or "")
+        return client
+    return connect
+
+
+class BulkEmailSender:
+    """Sends one personalized message per recipient over a few long-lived SMTP connections.
+
+    Recipients are split across `connections` worker threads, each of which keeps its
+    SMTP session open and reconnects after messages_per_connection messages or when the
+    server drops it. All workers share one token bucket, so the overall send rate stays
+    under rate_limit messages per second.
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], smtplib.SMTP]] = None, sender: str = EMAIL_SENDER,
+                 rate_limit: float = EMAIL_RATE_LIMIT, burst: Optional[float] = EMAIL_BURST,
+                 connections: int = EMAIL_CONNECTIONS, messages_per_connection: int = EMAIL_MESSAGES_PER_CONNECTION):
+        self.client_factory = client_factory or default_smtp_factory()
+        self.sender = sender
+        self.rate_limiter = TokenBucket(rate_limit, burst)
+        self.connections = max(1, connections)
+        self.messages_per_connection = messages_per_connection
+
+    def send(self, recipients: Iterable[Recipient], template: EmailTemplate,
+             common: Optional[Dict[str, Any]] = None, sender: Optional[str] = None) -> BulkSendReport:
+        """Renders and sends template to every recipient, returning per-recipient outcomes.
+
+        A recipient is an address or a dict with an "email" key plus personalization
+        fields; common supplies fields shared by every recipient. Invalid recipients
+        are reported as failed rather than raising. Once a connection cannot be
+        opened, the recipients still waiting are failed without further attempts.
+        """
+        started = time.perf_counter()
+        sender = sender or self.sender
+        report = BulkSendReport()
+        jobs: List[Tuple[int, str, str, str]] = []
+        seen = set()
+        for recipient in recipients:
+            values = dict(common or {})
+            if isinstance(recipient, dict):
+                values.update(recipient)
+            else:
+                values["email"] = recipient
+            address = values.get("email")
+            index = len(report.results)
+            if not isinstance(address, str) or "@" not in address:
+                report.results.append(SendResult("" if address is None else str(address), "failed",
+                                                 error="Missing or invalid email address"))
+                continue
+            if address.lower() in seen:
+                report.results.append(SendResult(address, "duplicate"))
+                continue
+            seen.add(address.lower())
+            try:
+                subject, body = template.render(values)
+            except (KeyError, IndexError, ValueError) as e:
+                report.results.append(SendResult(address, "failed", error=f"Template error: {e}"))
+                continue
+            report.results.append(SendResult(address, "pending"))
+            jobs.append((index, address, subject, body))
+
+        workers = min(self.connections, len(jobs)) or 1
+        shards = [jobs[worker::workers] for worker in range(workers)]
+        connection_down: List[str] = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for results, connections in executor.map(
+                    lambda shard: self._send_shard(shard, sender, connection_down), shards):
+                report.connections += connections
+                for index, result in results:
+                    report.results[index] = result
+        report.renders = template.renders
+        report.elapsed = time.perf_counter() - started
+        for result in report.results:
+            metrics.increment("emails_total", status=result.status)
+        return report
+
+    def _send_shard(self, jobs: List[Tuple[int, str, str, str]], sender: str,
+                    connection_down: List[str]) -> Tuple[List[Tuple[int, SendResult]], int]:
+        """Sends one worker's jobs; connection_down is shared and holds the first connect error."""
+        results: List[Tuple[int, SendResult]] = []
+        client: Optional[smtplib.SMTP] = None
+        connections = sent_on_connection = 0
+        try:
+            for index, address, subject, body in jobs:
+                if connection_down:
+                    results.append((index, SendResult(address, "failed",
+                                                      error=f"Not sent, SMTP unavailable: {connection_down[0]}")))
+                    continue
+                message = EmailMessage()
+                message["From"] = sender
+                message["To"] = address
+                message["Subject"] = subject
+                # An explicit domain avoids a hostname lookup per message
+                message["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2] or None)
+                message.set_content(body)
+                self.rate_limiter.acquire()
+                for attempt in (1, 2):
+                    if client is None or sent_on_connection >= self.messages_per_connection:
+                        _close(client)
+                        client, sent_on_connection = None, 0
+                        try:
+                            client = self.client_factory()
+                        except (OSError, smtplib.SMTPException) as e:
+                            connection_down.append(str(e))
+                            results.append((index, SendResult(address, "failed", error=f"Connect failed: {e}")))
+                            break
+                        connections += 1
+                    try:
+                        with metrics.timed("email_send"):
+                            refused = client.send_message(message, from_addr=sender, to_addrs=[address])
+                    except smtplib.SMTPServerDisconnected as e:
+                        # The server may drop idle or long-lived sessions; reconnect and retry once.
+                        client = None
+                        if attempt == 2:
+                            results.append((index, SendResult(address, "failed", error=str(e))))
+                        continue
+                    except smtplib.SMTPRecipientsRefused as e:
+                        code, reason = e.recipients.get(address, (None, b""))
+                        results.append((index, SendResult(address, "failed", error=f"{code} {_text(reason)}")))
+                    except smtplib.SMTPException as e:
+                        results.append((index, SendResult(address, "failed", error=str(e))))
+                    else:
+                        sent_on_connection += 1
+                        if address in refused:
+                            code, reason = refused[address]
+                            results.append((index, SendResult(address, "failed", error=f"{code} {_text(reason)}")))
+                        else:
+                            results.append((index, SendResult(address, "sent", message_id=message["Message-ID"])))
+                    break
+        finally:
+            _close(client)
+        return results, connections
+
+
+def _close(client: Optional[smtplib.SMTP]) -> None:
+    if client is None:
+        return
+    try:
+        client.quit()
+    except (OSError, smtplib.SMTPException):
+        client.close()
+
+
+def _text(reason: Any) -> str:
+    return reason.decode("utf-8", "replace") if isinstance(reason, bytes) else str(reason)
+
+
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
@@ -4,19 +4,18 @@ from agents.base_agent import BaseAgent, Tool
 class ComplianceAgent(BaseAgent):
     """Specialized agent for compliance, audits, and documentation review tasks."""
 
+    keywords = ["compliance", "audit", "review", "policy", "regulation", "legal"]
+
     def __init__(self, name: str, description: str, compliance_tool: Any = None):
         super().__init__(name, description)
         self.compliance_tool = compliance_tool  # Placeholder for a compliance checking tool/API
 
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task based on keywords."""
-        keywords = ["compliance", "audit", "review", "policy", "regulation", "legal"]
-        return any(keyword in task_description.lower() for keyword in keywords)
+        return any(keyword in task_description.lower() for keyword in self.keywords)
 
     def run(self, task_description: str, context: dict) -> str:
         """Executes the Compliance agent's task, simulating compliance checks."""
         # In a real implementation, this would involve using self.compliance_tool
         # to perform checks and generate reports.
         return f"ComplianceAgent executed task: '{task_description}' with context: {context}. Performed compliance check."
-
-print(f"Created {project_root}/agents/compliance_agent.py")
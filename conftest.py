@@ -0,0 +1,47 @@
+"""Lets the test suite run from the flat source tree.
+
+The modules live side by side in the repository root but import each other as
+agents.*, config.*, prompts.*, utils.* and workflows.*, the layout they are
+deployed in. Each of those packages is registered here as a package whose
+search path is the root, so e.g. utils.metrics resolves to ./metrics.py.
+Shared fixtures live here too.
+"""
+import importlib.machinery
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+for package in ("agents", "config", "prompts", "utils", "workflows"):
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [ROOT]
+        module.__spec__ = importlib.machinery.ModuleSpec(package, None, is_package=True)
+        module.__spec__.submodule_search_locations = module.__path__
+        sys.modules[package] = module
+
+
+class FakeClock:
+    """Manually advanced clock: call it (or its time method) for the time; sleep advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.slept += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,186 @@
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from agents.base_agent import BaseAgent
+from utils.metrics import metrics
+
+# Clause boundaries used when splitting a compound task into steps. "then" also
+# acts as a barrier: every step after it waits for every step before it.
+_CLAUSE_SPLIT = re.compile(r"(\s*[;,]?\s+(?:and then|then)\s+|\s*;\s*|\s+and\s+)", re.IGNORECASE)
+_BARRIER = re.compile(r"\bthen\b|;", re.IGNORECASE)
+
+
+@dataclass
+class WorkflowStep:
+    """A single agent invocation inside a DAG workflow."""
+    name: str
+    agent: BaseAgent
+    task: str
+    depends_on: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StepResult:
+    """Output and timing of a completed workflow step, relative to the workflow start."""
+    name: str
+    agent_name: str
+    output: str
+    started_at: float
+    duration: float
+
+
+@dataclass
+class DagRun:
+    """Results of a DAG workflow run, keyed by step name in completion order."""
+    steps: Dict[str, StepResult]
+    sinks: List[str]
+    total_duration: float
+
+    @property
+    def output(self) -> str:
+        """Combined output of the steps nothing else depends on."""
+        return "\n".join(self.steps[name].output for name in self.sinks)
+
+    def timings(self) -> Dict[str, float]:
+        """Returns per-step durations in seconds."""
+        return {name: step.duration for name, step in self.steps.items()}
+
+
+class DagWorkflow:
+    """Runs agent steps as a DAG, starting each step as soon as its dependencies finish.
+
+    Upstream outputs reach a step through context["upstream_results"], keyed by step
+    name, so independent branches run concurrently and end-to-end latency follows the
+    critical path rather than the sum of all steps.
+    """
+
+    def __init__(self, steps: List[WorkflowStep]):
+        self.steps = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate workflow step name: {step.name}")
+            self.steps[step.name] = step
+        for step in steps:
+            for dependency in step.depends_on:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dependency}'")
+        self._check_acyclic()
+
+    def sinks(self) -> List[str]:
+        """Returns the names of steps no other step depends on."""
+        depended_on = {dep for step in self.steps.values() for dep in step.depends_on}
+        return [name for name in self.steps if name not in depended_on]
+
+    async def arun(self, context: Dict[str, Any] = None) -> DagRun:
+        """Executes every step, running independent branches concurrently."""
+        if context is None:
+            context = {}
+        start = time.perf_counter()
+        results: Dict[str, StepResult] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_step(step: WorkflowStep) -> StepResult:
+            await asyncio.gather(*(tasks[dep] for dep in step.depends_on))
+            step_context = dict(context)
+            step_context["upstream_results"] = {dep: results[dep].output for dep in step.depends_on}
+            started = time.perf_counter()
+            with metrics.timed("agent_run", step.agent.name):
+                output = await step.agent.arun(step.task, step_context)
+            finished = time.perf_counter()
+            result = StepResult(step.name, step.agent.name, output, started - start, finished - started)
+            results[step.name] = result
+            return result
+
+        for name in self._topological_order():
+            tasks[name] = asyncio.ensure_future(run_step(self.steps[name]))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return DagRun(steps=results, sinks=self.sinks(), total_duration=time.perf_counter() - start)
+
+    def run(self, context: Dict[str, Any] = None) -> DagRun:
+        """Synchronous wrapper around arun for callers without an event loop."""
+        ensure_no_running_loop("DagWorkflow.run()", "await DagWorkflow.arun()")
+        return asyncio.run(self.arun(context))
+
+    def _topological_order(self) -> List[str]:
+        remaining = {name: len(step.depends_on) for name, step in self.steps.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.steps}
+        for step in self.steps.values():
+            for dependency in step.depends_on:
+                dependents[dependency].append(step.name)
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        return order
+
+    def _check_acyclic(self) -> None:
+        if len(self._topological_order()) != len(self.steps):
+            raise ValueError("Workflow steps contain a dependency cycle")
+
+
+def plan_workflow(task_description: str,
+                  rank_agents: Callable[[str], List[Tuple[BaseAgent, int]]]) -> DagWorkflow:
+    """Splits a compound task into clauses and builds a DAG of agent steps.
+
+    Each clause is routed with rank_agents. Clauses no agent can handle are folded
+    into the neighbouring clause, and consecutive clauses routed to the same agent
+    become one step. Steps after a "then" depend on every earlier step, and agents
+    with consumes_upstream set (e.g. EmailAgent) depend on every step before them.
+    """
+    parts = _CLAUSE_SPLIT.split(task_description.strip())
+    # Each clause is (text, separator before it, preceded by a barrier, routed agent).
+    clauses: List[Tuple[str, str, bool, BaseAgent]] = []
+    pending, previous_separator, barrier = "", "", False
+    for index in range(0, len(parts), 2):
+        text = pending + parts[index]
+        separator = parts[index + 1] if index + 1 < len(parts) else ""
+        ranked = rank_agents(text)
+        if not ranked:
+            if separator:
+                pending = text + separator
+                barrier = barrier or bool(_BARRIER.search(separator))
+            elif clauses:
+                last_text, last_separator, last_barrier, last_agent = clauses[-1]
+                clauses[-1] = (last_text + previous_separator + text, last_separator, last_barrier, last_agent)
+            continue
+        clauses.append((text, previous_separator, barrier, ranked[0][0]))
+        pending, previous_separator, barrier = "", separator, bool(_BARRIER.search(separator))
+
+    steps: List[WorkflowStep] = []
+    stage_start = 0
+    for text, separator, after_barrier, agent in clauses:
+        if after_barrier:
+            stage_start = len(steps)
+        elif steps and steps[-1].agent is agent:
+            steps[-1].task = steps[-1].task + separator + text
+            continue
+        if agent.consumes_upstream:
+            depends_on = [step.name for step in steps]
+        else:
+            depends_on = [step.name for step in steps[:stage_start]]
+        steps.append(WorkflowStep(name=f"step_{len(steps) + 1}", agent=agent, task=text, depends_on=depends_on))
+
+    if not steps:
+        raise ValueError(f"No suitable agent found for task: {task_description}")
+    return DagWorkflow(steps)
+
+
+def ensure_no_running_loop(caller: str, alternative: str) -> None:
+    """Raises RuntimeError when a synchronous wrapper is called from inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    raise RuntimeError(f"{caller} cannot run inside a running event loop; use {alternative} instead")
@@ -0,0 +1,56 @@
+from typing import List, Optional
+
+from agents.base_agent import BaseAgent
+from config.config import (
+    WORKFLOW_CACHE_MAX_ENTRIES,
+    WORKFLOW_CACHE_SEMANTIC,
+    WORKFLOW_CACHE_SIMILARITY,
+    WORKFLOW_CACHE_TTL,
+)
+from workflows.agent_registry import AgentSpec, build_lazy_agents
+from workflows.orchestrator import Orchestrator
+from workflows.response_cache import WorkflowResponseCache
+from workflows.workflow_history import WorkflowHistory
+
+# Standard agent roster. Agents are declared by module path and only imported when a
+# task is first routed to them (real agents would have actual dependencies injected).
+DEFAULT_AGENT_SPECS = [
+    AgentSpec("RAG Agent", "agents.rag_agent:RagAgent", "Retrieves information from knowledge bases.",
+              {"vector_store": None, "retriever": None}),
+    AgentSpec("TAG Agent", "agents.tag_agent:TagAgent", "Processes and analyzes tabular data.",
+              {"db_connector": None}),
+    AgentSpec("Email Agent", "agents.email_agent:EmailAgent", "Manages email communications.",
+              {"email_client": None}),
+    AgentSpec("Compliance Agent", "agents.compliance_agent:ComplianceAgent", "Ensures regulatory adherence and audits.",
+              {"compliance_tool": None}),
+    AgentSpec("Sales Agent", "agents.sales_agent:SalesAgent", "Handles sales-related tasks like lead scoring.",
+              {"crm_api": None}),
+    AgentSpec("HR Agent", "agents.hr_agent:HRAgent", "Manages HR processes like candidate screening.",
+              {"hr_system_api": None}),
+]
+
+
+def build_default_agents(lazy: bool = True) -> List[BaseAgent]:
+    """Creates the standard agent roster, as lazy proxies unless lazy is False."""
+    agents = build_lazy_agents(DEFAULT_AGENT_SPECS)
+    if not lazy:
+        return [agent.agent for agent in agents]
+    return agents
+
+
+def build_response_cache() -> Optional[WorkflowResponseCache]:
+    """Builds the configured workflow response cache, or None when WORKFLOW_CACHE_TTL is 0."""
+    if WORKFLOW_CACHE_TTL <= 0:
+        return None
+    embedder = None
+    if WORKFLOW_CACHE_SEMANTIC:
+        # Local hashing embedder: cheap enough to run on every task, no network round trip
+        from utils.embeddings import HashingEmbedder
+        embedder = HashingEmbedder()
+    return WorkflowResponseCache(max_entries=WORKFLOW_CACHE_MAX_ENTRIES, ttl=WORKFLOW_CACHE_TTL,
+                                 embedder=embedder, similarity_threshold=WORKFLOW_CACHE_SIMILARITY)
+
+
+def build_default_orchestrator(history: WorkflowHistory = None) -> Orchestrator:
+    """Creates an Orchestrator over the standard agent roster with the configured response cache."""
+    return Orchestrator(agents=build_default_agents(), history=history, response_cache=build_response_cache())
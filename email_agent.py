@@ -1,22 +1,58 @@
-from typing import Any
+from typing import Any, Dict, List, Optional
 from agents.base_agent import BaseAgent, Tool
+from utils.bulk_email import BulkEmailSender, BulkSendReport, EmailTemplate, Recipient
 
 class EmailAgent(BaseAgent):
     """Specialized agent for email management tasks."""
 
+    keywords = ["email", "send", "draft", "reply", "inbox", "communication"]
+    consumes_upstream = True
+    cacheable = False
+
     def __init__(self, name: str, description: str, email_client: Any = None):
         super().__init__(name, description)
         self.email_client = email_client  # Placeholder for an email client/API
+        self._bulk_sender: Optional[BulkEmailSender] = None
 
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task based on keywords."""
-        keywords = ["email", "send", "draft", "reply", "inbox", "communication"]
-        return any(keyword in task_description.lower() for keyword in keywords)
+        return any(keyword in task_description.lower() for keyword in self.keywords)
 
     def run(self, task_description: str, context: dict) -> str:
-        """Executes the Email agent's task, simulating email operations."""
+        """Executes the Email agent's task, simulating email operations.
+
+        With a BulkEmailSender as email_client and context["recipients"] set, the
+        upstream results (or context["body_template"]) are sent to every recipient.
+        """
+        if isinstance(self.email_client, BulkEmailSender) and context.get("recipients"):
+            upstream = "\n\n".join(context.get("upstream_results", {}).values())
+            body = context.get("body_template") or _escape(upstream or task_description)
+            subject = context.get("subject_template") or _escape(task_description[:78])
+            report = self.send_bulk(context["recipients"], subject, body, common=context.get("template_values"))
+            return f"EmailAgent executed task: '{task_description}'. {report.summary()}"
         # In a real implementation, this would involve using self.email_client
         # to perform email actions.
         return f"EmailAgent executed task: '{task_description}' with context: {context}. Processed email operation."
 
-print(f"Created {project_root}/agents/email_agent.py")
+    def send_bulk(self, recipients: List[Recipient], subject_template: str, body_template: str,
+                  common: Optional[Dict[str, Any]] = None, sender: Optional[str] = None) -> BulkSendReport:
+        """Sends a templated email to every recipient over reused, rate-limited SMTP connections.
+
+        Recipients are addresses or dicts with an "email" key and personalization fields
+        used by the templates (str.format syntax, e.g. "Hi {name}").
+        """
+        return self.bulk_sender.send(recipients, EmailTemplate(subject_template, body_template), common, sender)
+
+    @property
+    def bulk_sender(self) -> BulkEmailSender:
+        """email_client when it is a BulkEmailSender, else one built from the SMTP settings."""
+        if isinstance(self.email_client, BulkEmailSender):
+            return self.email_client
+        if self._bulk_sender is None:
+            self._bulk_sender = BulkEmailSender()
+        return self._bulk_sender
+
+
+def _escape(text: str) -> str:
+    """Escapes literal text for use as a str.format template."""
+    return text.replace("{", "{{").replace("}", "}}")
@@ -0,0 +1,227 @@
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def embedder_name(embedder: Any) -> str:
+    """Identifies an embedding model; cached wrappers report the model they wrap."""
+    embedder = getattr(embedder, "wrapped", embedder)
+    model = getattr(embedder, "model", None)
+    return f"{type(embedder).__name__}:{model}" if model else type(embedder).__name__
+
+
+class HashingEmbedder:
+    """Offline TF-IDF embedder using the hashing trick, implemented in NumPy.
+
+    Tokens are hashed into n_features signed buckets with sublinear term frequency.
+    IDF weights are optional: call fit() on a corpus to learn them, otherwise all
+    buckets weigh the same. Vectors are L2-normalised. Follows the LangChain
+    Embeddings interface, returning NumPy arrays.
+    """
+
+    def __init__(self, n_features: int = 1024, ngram_range: tuple = (1, 1)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.idf: Optional[np.ndarray] = None
+        self.model = f"hashing-{n_features}-{ngram_range[0]}{ngram_range[1]}"
+        self._buckets: Dict[str, tuple] = {}
+
+    def fit(self, texts: Iterable[str]) -> "HashingEmbedder":
+        """Learns smoothed IDF weights per bucket from a corpus."""
+        document_frequency = np.zeros(self.n_features, dtype=np.float64)
+        n_documents = 0
+        for text in texts:
+            n_documents += 1
+            buckets = {self._bucket(term)[0] for term in self._terms(text)}
+            document_frequency[list(buckets)] += 1
+        self.idf = (np.log((1 + n_documents) / (1 + document_frequency)) + 1).astype(np.float32)
+        digest = hashlib.sha1(self.idf.tobytes()).hexdigest()[:12]
+        self.model = f"hashing-{self.n_features}-{self.ngram_range[0]}{self.ngram_range[1]}-idf-{digest}"
+        return self
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(self._terms(text))
+            if not counts:
+                continue
+            columns = np.empty(len(counts), dtype=np.int64)
+            values = np.empty(len(counts), dtype=np.float32)
+            for position, (term, count) in enumerate(counts.items()):
+                bucket, sign = self._bucket(term)
+                columns[position] = bucket
+                values[position] = sign * (1.0 + math.log(count))
+            np.add.at(matrix[row], columns, values)
+        if self.idf is not None:
+            matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+    def _terms(self, text: str) -> List[str]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        low, high = self.ngram_range
+        if low == high == 1:
+            return tokens
+        terms = []
+        for n in range(low, high + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def _bucket(self, term: str) -> tuple:
+        bucket = self._buckets.get(term)
+        if bucket is None:
+            digest = zlib.crc32(term.encode("utf-8"))
+            bucket = (digest % self.n_features, 1.0 if digest & 0x80000000 else -1.0)
+            if len(self._buckets) < 1_000_000:
+                self._buckets[term] = bucket
+        return bucket
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding store keyed by (model, text hash) with LRU eviction.
+
+    Lookups only read: last_used touches are buffered in memory and written with
+    the next put_many, once flush_every of them are pending, or on flush/close.
+    """
+
+    _SQLITE_MAX_PARAMS = 900
+
+    def __init__(self, path: str, max_entries: int = 1_000_000, flush_every: int = 4096):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[bytes, float] = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._count = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        return hashlib.sha1(model.encode("utf-8") + b"\0" + text.encode("utf-8")).digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Returns cached vectors for the keys that are present and marks them recently used."""
+        found: Dict[bytes, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(unique_keys), self._SQLITE_MAX_PARAMS):
+                batch = unique_keys[start:start + self._SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+                    self._touched[key] = now
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+            if len(self._touched) >= self.flush_every:
+                self._write_touches()
+                self._connection.commit()
+        return found
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """Stores vectors, evicting the least recently used entries beyond max_entries."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+        with self._lock:
+            # Eviction orders by last_used, so apply buffered touches first
+            self._write_touches()
+            before = self._connection.total_changes
+            self._connection.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._count += self._connection.total_changes - before
+            excess = self._count - self.max_entries
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self._count -= excess
+            self._connection.commit()
+
+    def flush(self) -> None:
+        """Writes buffered last_used touches."""
+        with self._lock:
+            if self._touched:
+                self._write_touches()
+                self._connection.commit()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+    def _write_touches(self) -> None:
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+            self._touched = {}
+
+
+class CachedEmbeddings:
+    """Wraps an embedder with an EmbeddingCache and bulk-embeds cache misses.
+
+    Misses are de-duplicated and sent to the wrapped embedder in batches of
+    batch_size texts, so re-indexing a mostly unchanged corpus costs only cache
+    lookups. Returns NumPy arrays.
+    """
+
+    def __init__(self, wrapped: Any, cache: EmbeddingCache, batch_size: int = 512):
+        self.wrapped = wrapped
+        self.cache = cache
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        model = embedder_name(self.wrapped)
+        keys = [EmbeddingCache.key(model, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[start:start + self.batch_size]
+            embedded = self.wrapped.embed_documents([missing[key] for key in batch_keys])
+            fresh = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(batch_keys, embedded)}
+            self.cache.put_many(fresh)
+            vectors.update(fresh)
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
@@ -9,5 +9,3 @@ Task Description:
 
 Provide a detailed and actionable response to the task.
 """
-
-print(f"Created {project_root}/prompts/general_agent_prompt.py")
@@ -4,19 +4,18 @@ from agents.base_agent import BaseAgent, Tool
 class HRAgent(BaseAgent):
     """Specialized agent for Human Resources tasks like screening, onboarding, and payroll."""
 
+    keywords = ["hr", "human resources", "recruitment", "screening", "onboarding", "payroll", "employee"]
+
     def __init__(self, name: str, description: str, hr_system_api: Any = None):
         super().__init__(name, description)
         self.hr_system_api = hr_system_api  # Placeholder for HR system API
 
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task based on keywords."""
-        keywords = ["hr", "human resources", "recruitment", "screening", "onboarding", "payroll", "employee"]
-        return any(keyword in task_description.lower() for keyword in keywords)
+        return any(keyword in task_description.lower() for keyword in self.keywords)
 
     def run(self, task_description: str, context: dict) -> str:
         """Executes the HR agent's task, simulating HR operations."""
         # In a real implementation, this would involve using self.hr_system_api
         # to update employee records, initiate onboarding workflows, etc.
         return f"HRAgent executed task: '{task_description}' with context: {context}. Performed HR operation."
-
-print(f"Created {project_root}/agents/hr_agent.py")
@@ -0,0 +1,217 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k highest scores in each row, best first (argpartition + small sort)."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], k: int, rrf_k: int = 60) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Fuses per-query ranked id matrices (-1 = no hit) with RRF. Returns (ids, scores) per query."""
+    fused = []
+    depth = [ranking.shape[1] for ranking in rankings]
+    weights = np.concatenate([1.0 / (rrf_k + 1 + np.arange(width)) for width in depth])
+    for query in range(rankings[0].shape[0]):
+        ids = np.concatenate([ranking[query] for ranking in rankings])
+        valid = ids != -1
+        unique_ids, inverse = np.unique(ids[valid], return_inverse=True)
+        scores = np.bincount(inverse, weights=weights[valid], minlength=len(unique_ids))
+        best = np.argsort(-scores, kind="stable")[:k]
+        fused.append((unique_ids[best], scores[best]))
+    return fused
+
+
+def _count_terms(texts: Iterable[str], vocabulary: Dict[str, int],
+                 first_row: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Tokenizes texts into COO (term id, row, frequency) arrays plus document lengths.
+
+    New terms are added to vocabulary; rows are numbered from first_row.
+    """
+    term_ids: List[int] = []
+    rows: List[int] = []
+    frequencies: List[int] = []
+    lengths: List[int] = []
+    for row, text in enumerate(texts, first_row):
+        counts = Counter(tokenize(text))
+        lengths.append(sum(counts.values()))
+        for term, count in counts.items():
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+            rows.append(row)
+            frequencies.append(count)
+    return (np.asarray(term_ids, dtype=np.int64), np.asarray(rows, dtype=np.int64),
+            np.asarray(frequencies, dtype=np.float32), np.asarray(lengths, dtype=np.float32))
+
+
+class BM25Index:
+    """Sparse BM25 inverted index stored as CSR arrays over term ids.
+
+    Term weights (idf and length normalisation) are precomputed per posting, so a
+    batch of queries is scored by scattering each query term's postings into a
+    dense (queries x documents) block in one vectorised step per term. Raw term
+    frequencies and document lengths are kept alongside, so extend() can add and
+    drop documents while tokenizing only the new ones.
+    """
+
+    def __init__(self, ids: np.ndarray, vocabulary: Dict[str, int], indptr: np.ndarray,
+                 postings: np.ndarray, weights: np.ndarray, tf: np.ndarray, lengths: np.ndarray,
+                 k1: float = 1.5, b: float = 0.75):
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+        self.tf = tf
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+
+    @classmethod
+    def build(cls, texts: Iterable[str], ids: Iterable[int], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        vocabulary: Dict[str, int] = {}
+        term_ids, rows, tf, lengths = _count_terms(texts, vocabulary, 0)
+        ids = np.fromiter(ids, dtype=np.int64, count=len(lengths))
+        return cls._from_postings(ids, vocabulary, term_ids, rows, tf, lengths, k1, b)
+
+    def extend(self, texts: Iterable[str], ids: Iterable[int], keep: Optional[np.ndarray] = None) -> "BM25Index":
+        """Returns an index with the given documents added and, if keep (a boolean mask
+        over the current documents) is given, only the kept current documents retained.
+
+        Only the new texts are tokenized; existing postings are reused as arrays and
+        idf and length normalisation are recomputed over the result.
+        """
+        term_ids = np.repeat(np.arange(len(self.vocabulary), dtype=np.int64), np.diff(self.indptr))
+        rows, tf, lengths, current_ids = self.postings, self.tf, self.lengths, self.ids
+        if keep is not None:
+            renumbered = np.cumsum(keep) - 1
+            kept_postings = keep[rows]
+            term_ids, rows, tf = term_ids[kept_postings], renumbered[rows[kept_postings]], tf[kept_postings]
+            lengths, current_ids = lengths[keep], current_ids[keep]
+
+        vocabulary = dict(self.vocabulary)
+        new_term_ids, new_rows, new_tf, new_lengths = _count_terms(texts, vocabulary, len(lengths))
+        new_ids = np.fromiter(ids, dtype=np.int64, count=len(new_lengths))
+        return self._from_postings(
+            np.concatenate([current_ids, new_ids]), vocabulary,
+            np.concatenate([term_ids, new_term_ids]), np.concatenate([rows, new_rows]),
+            np.concatenate([tf, new_tf]), np.concatenate([lengths, new_lengths]), self.k1, self.b,
+        )
+
+    @classmethod
+    def _from_postings(cls, ids: np.ndarray, vocabulary: Dict[str, int], term_ids: np.ndarray, rows: np.ndarray,
+                       tf: np.ndarray, lengths: np.ndarray, k1: float, b: float) -> "BM25Index":
+        order = np.argsort(term_ids, kind="stable")
+        postings = rows[order]
+        tf = tf[order]
+        document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=indptr[1:])
+
+        n_documents = max(len(lengths), 1)
+        average_length = float(lengths.mean()) if len(lengths) else 1.0
+        idf = np.log1p((n_documents - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths[postings] / max(average_length, 1e-9))
+        weights = np.repeat(idf, document_frequency) * tf * (k1 + 1) / (tf + norm)
+        return cls(ids, vocabulary, indptr, postings, weights.astype(np.float32), tf, lengths, k1, b)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def score_batch(self, queries: Sequence[str]) -> np.ndarray:
+        """Dense (len(queries) x documents) BM25 score matrix."""
+        scores = np.zeros((len(queries), len(self.ids)), dtype=np.float32)
+        query_terms: Dict[int, List[Tuple[int, int]]] = {}
+        for query_row, query in enumerate(queries):
+            for term, count in Counter(tokenize(query)).items():
+                term_id = self.vocabulary.get(term)
+                if term_id is not None:
+                    query_terms.setdefault(term_id, []).append((query_row, count))
+        for term_id, occurrences in query_terms.items():
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            query_rows = np.fromiter((row for row, _ in occurrences), dtype=np.int64)
+            counts = np.fromiter((count for _, count in occurrences), dtype=np.float32)
+            scores[np.ix_(query_rows, self.postings[start:end])] += counts[:, None] * self.weights[start:end][None, :]
+        return scores
+
+    def search_ids(self, queries: Sequence[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (scores, ids) per query; rows with fewer than k matching documents are padded with -1."""
+        scores = self.score_batch(queries)
+        columns = top_k(scores, k)
+        top_scores = np.take_along_axis(scores, columns, axis=1)
+        ids = np.where(top_scores > 0, self.ids[columns], -1)
+        if ids.shape[1] < k:
+            pad = k - ids.shape[1]
+            ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+            top_scores = np.pad(top_scores, ((0, 0), (0, pad)))
+        return top_scores, ids
+
+
+class HybridRetriever:
+    """Combines dense VectorIndex search with BM25 using reciprocal-rank fusion.
+
+    The BM25 index is built from the vector index's own chunk records and updated
+    incrementally whenever the vector index's version changes. Queries are scored in blocks, each costing one
+    embedder call, one FAISS batch search and one BM25 pass over the index.
+    """
+
+    def __init__(self, vector_index, rrf_k: int = 60, candidate_multiplier: int = 4,
+                 max_block_cells: int = 1 << 24):
+        self.vector_index = vector_index
+        self.rrf_k = rrf_k
+        self.candidate_multiplier = candidate_multiplier
+        self.max_block_cells = max_block_cells
+        self.bm25: Optional[BM25Index] = None
+        self._bm25_version = -1
+
+    def refresh(self) -> None:
+        """Brings the BM25 index up to date with the vector index's current chunks.
+
+        Only chunks added since the last refresh are decoded and tokenized; removed
+        chunks are dropped from the existing postings.
+        """
+        version = self.vector_index.version
+        ids = np.asarray(self.vector_index.ids(), dtype=np.int64)
+        if self.bm25 is None:
+            self.bm25 = BM25Index.build((self.vector_index.get_text(int(chunk_id)) for chunk_id in ids), ids)
+        else:
+            keep = np.isin(self.bm25.ids, ids)
+            added = ids[~np.isin(ids, self.bm25.ids)]
+            if len(added) or not keep.all():
+                self.bm25 = self.bm25.extend((self.vector_index.get_text(int(chunk_id)) for chunk_id in added),
+                                             added, keep=None if keep.all() else keep)
+        self._bm25_version = version
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries: Sequence[str], k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Returns the top k (text, fused score) pairs for every query."""
+        if not queries:
+            return []
+        if self._bm25_version != self.vector_index.version:
+            self.refresh()
+        depth = max(k * self.candidate_multiplier, k)
+        block = max(1, self.max_block_cells // max(len(self.bm25), 1))
+        results: List[List[Tuple[str, float]]] = []
+        for start in range(0, len(queries), block):
+            batch = list(queries[start:start + block])
+            _dense_scores, dense_ids = self.vector_index.search_ids(self.vector_index.embed_queries(batch), depth)
+            _sparse_scores, sparse_ids = self.bm25.search_ids(batch, depth)
+            for ids, scores in reciprocal_rank_fusion([dense_ids, sparse_ids], k, self.rrf_k):
+                results.append([(self.vector_index.get_text(int(chunk_id)), float(score))
+                                for chunk_id, score in zip(ids, scores)])
+        return results
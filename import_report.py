@@ -0,0 +1,92 @@
+"""Reports what a cold import of the given modules costs, from `python -X importtime`.
+
+    python -m utils.import_report workflows.default_orchestrator utils.rag_utils --top 15
+    python -m utils.import_report workflows.default_orchestrator --budget-ms 50
+
+Each module is imported in a fresh interpreter, so results reflect a cold start
+(e.g. the first Streamlit run or a serverless cold start).
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+DEFAULT_MODULES = ["workflows.default_orchestrator", "utils.rag_utils", "utils.realtime_utils"]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    """One `-X importtime` record; times are in microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parses the stderr of `python -X importtime`, skipping the header and unrelated lines."""
+    timings = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings
+
+
+def measure_import(module: str, python: str = sys.executable) -> List[ImportTiming]:
+    """Imports module in a fresh interpreter and returns its import-time records."""
+    completed = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        raise RuntimeError(f"Importing {module} failed: {error[-1] if error else completed.returncode}")
+    return parse_importtime(completed.stderr)
+
+
+def summarize(module: str, timings: List[ImportTiming], top: int = 10) -> dict:
+    """Total cold-import time for module plus the slowest imports by self time."""
+    root = next((timing for timing in reversed(timings) if timing.module == module and timing.depth == 0), None)
+    slowest = sorted(timings, key=lambda timing: timing.self_us, reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": (root.cumulative_us if root else sum(t.self_us for t in timings)) / 1000,
+        "modules_imported": len(timings),
+        "slowest": [asdict(timing) for timing in slowest],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report cold import times using python -X importtime.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Exit with status 1 if any module takes longer than this to import")
+    args = parser.parse_args(argv)
+
+    reports = [summarize(module, measure_import(module), args.top) for module in args.modules]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print(f"{report['module']}: {report['total_ms']:.1f} ms ({report['modules_imported']} modules)")
+            for timing in report["slowest"]:
+                print(f"  {timing['self_us'] / 1000:8.2f} ms self {timing['cumulative_us'] / 1000:8.2f} ms cumulative"
+                      f"  {timing['module']}")
+    if args.budget_ms is not None:
+        over = [report for report in reports if report["total_ms"] > args.budget_ms]
+        for report in over:
+            print(f"{report['module']} exceeds the {args.budget_ms:g} ms budget ({report['total_ms']:.1f} ms)",
+                  file=sys.stderr)
+        return 1 if over else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# A piece of source text with its metadata; "start_index" is its offset in the source.
+Segment = Tuple[str, Dict[str, Any]]
+
+_splitters: Dict[Tuple[int, int], RecursiveCharacterTextSplitter] = {}
+
+
+@dataclass
+class IngestionStats:
+    """Counters reported by ingest_files."""
+    segments: int = 0
+    chunks: int = 0
+    embedded: int = 0
+
+
+def get_text_splitter(chunk_size: int = 1000, chunk_overlap: int = 200) -> RecursiveCharacterTextSplitter:
+    """Returns a shared splitter for the given sizes (also reused within each pool worker)."""
+    splitter = _splitters.get((chunk_size, chunk_overlap))
+    if splitter is None:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            add_start_index=True,
+        )
+        _splitters[(chunk_size, chunk_overlap)] = splitter
+    return splitter
+
+
+def iter_text_file(path: str, segment_size: int = 1 << 20) -> Iterator[Segment]:
+    """Reads a text file lazily in segments of roughly segment_size characters.
+
+    Segments end on a paragraph (or line) break where possible so chunks rarely
+    straddle a boundary, and each carries its character offset in "start_index".
+    """
+    offset, carry = 0, ""
+    with open(path, encoding="utf-8", errors="replace") as text_file:
+        while True:
+            block = text_file.read(segment_size)
+            text = carry + block
+            if not block:
+                if text:
+                    yield text, {"source": path, "start_index": offset}
+                return
+            cut = text.rfind("\n\n")
+            if cut <= 0:
+                cut = text.rfind("\n")
+            cut = len(text) if cut <= 0 else cut + 1
+            yield text[:cut], {"source": path, "start_index": offset}
+            offset += cut
+            carry = text[cut:]
+
+
+def iter_pdf_file(path: str) -> Iterator[Segment]:
+    """Extracts a PDF one page at a time."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for page_number, page in enumerate(reader.pages):
+        text = page.extract_text() or ""
+        if text.strip():
+            yield text, {"source": path, "page": page_number, "start_index": 0}
+
+
+def iter_files(paths: Iterable[str], segment_size: int = 1 << 20) -> Iterator[Segment]:
+    """Streams segments from files and directories (walked recursively), PDFs included."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, files in os.walk(path):
+                yield from iter_files((os.path.join(root, name) for name in sorted(files)), segment_size)
+        elif path.lower().endswith(".pdf"):
+            yield from iter_pdf_file(path)
+        else:
+            yield from iter_text_file(path, segment_size)
+
+
+def chunk_segment(segment: Segment, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Segment]:
+    """Splits one segment, offsetting each chunk's start_index by the segment's position."""
+    text, metadata = segment
+    base = metadata.get("start_index", 0)
+    chunks = []
+    for document in get_text_splitter(chunk_size, chunk_overlap).create_documents([text], [metadata]):
+        chunk_metadata = dict(document.metadata)
+        chunk_metadata["start_index"] = base + document.metadata["start_index"]
+        chunks.append((document.page_content, chunk_metadata))
+    return chunks
+
+
+def _chunk_segment_args(args: Tuple[Segment, int, int]) -> List[Segment]:
+    return chunk_segment(*args)
+
+
+def iter_chunks(segments: Iterable[Segment], chunk_size: int = 1000, chunk_overlap: int = 200,
+                executor: Optional[Executor] = None, max_in_flight: int = 64) -> Iterator[Segment]:
+    """Lazily chunks segments, optionally across an executor with bounded in-flight work."""
+    if executor is None:
+        for segment in segments:
+            yield from chunk_segment(segment, chunk_size, chunk_overlap)
+        return
+    work = ((segment, chunk_size, chunk_overlap) for segment in segments)
+    for chunks in bounded_map(executor, _chunk_segment_args, work, max_in_flight):
+        yield from chunks
+
+
+def bounded_map(executor: Executor, func: Callable, iterable: Iterable, max_in_flight: int) -> Iterator[Any]:
+    """Like Executor.map, but keeps at most max_in_flight submissions outstanding and preserves order."""
+    iterator = iter(iterable)
+    in_flight = deque(executor.submit(func, item) for item in islice(iterator, max_in_flight))
+    while in_flight:
+        result = in_flight.popleft().result()
+        for item in islice(iterator, 1):
+            in_flight.append(executor.submit(func, item))
+        yield result
+
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest_files(paths: Sequence[str], vector_index: Any, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 batch_size: int = 512, processes: Optional[int] = None, save_every: int = 100,
+                 segment_size: int = 1 << 20) -> IngestionStats:
+    """Streams files into a VectorIndex: reader -> chunker -> embed batcher -> index writer.
+
+    Memory stays bounded by the segment size, the chunker's in-flight window and one
+    embedding batch. Set processes to chunk across a process pool. The index is
+    saved every save_every batches and once more at the end.
+    """
+    stats = IngestionStats()
+
+    def counted_segments() -> Iterator[Segment]:
+        for segment in iter_files(paths, segment_size):
+            stats.segments += 1
+            yield segment
+
+    executor = ProcessPoolExecutor(max_workers=processes) if processes else None
+    try:
+        chunks = iter_chunks(counted_segments(), chunk_size, chunk_overlap, executor,
+                             max_in_flight=4 * (processes or 1))
+        for batch_number, batch in enumerate(batched(chunks, batch_size), start=1):
+            stats.chunks += len(batch)
+            stats.embedded += vector_index.add_texts([text for text, _ in batch], [meta for _, meta in batch])
+            if batch_number % save_every == 0:
+                vector_index.save()
+        vector_index.save()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return stats
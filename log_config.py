@@ -0,0 +1,28 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_buffered_logging(level: int = logging.INFO, handler: Optional[logging.Handler] = None,
+                           fmt: str = '%(asctime)s - %(levelname)s - %(name)s - %(message)s') -> None:
+    """Routes root logging through a queue so formatting and stream I/O happen on a background thread."""
+    global _listener
+    if _listener is not None:
+        logging.getLogger().setLevel(level)
+        return
+    if handler is None:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(fmt))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -1,38 +1,227 @@
-from typing import List, Dict, Any
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
 from agents.base_agent import BaseAgent
+from config.config import PROMPT_HISTORY_TURNS, PROMPT_TOKEN_BUDGET
+from utils.metrics import metrics
+from utils.prompt_builder import BuiltPrompt, build_general_prompt
+from workflows.dag_workflow import DagRun, DagWorkflow, ensure_no_running_loop, plan_workflow
+from workflows.response_cache import WorkflowResponseCache
+from workflows.routing_index import KeywordRoutingIndex
+from workflows.workflow_history import WorkflowHistory
+
+logger = logging.getLogger(__name__)
 
 class Orchestrator:
     """Central manager for delegating tasks and coordinating agent workflows."""
 
-    def __init__(self, agents: List[BaseAgent]):
-        self.agents = agents
-        self.history = [] # To keep track of conversation/task history
+    def __init__(self, agents: List[BaseAgent], history: WorkflowHistory = None,
+                 response_cache: WorkflowResponseCache = None):
+        self.agents: List[BaseAgent] = []
+        self._agents_by_name: Dict[str, BaseAgent] = {}
+        self.routing_index = KeywordRoutingIndex()
+        # Slots of agents without keywords, which route through can_handle_task
+        self._fallback_slots: List[int] = []
+        # Bounded conversation/task history, windowed per context["session_id"]
+        self.history = history if history is not None else WorkflowHistory()
+        # Optional cache of single-agent workflow results; None disables caching
+        self.response_cache = response_cache
+        for agent in agents:
+            self.register_agent(agent)
+
+    def register_agent(self, agent: BaseAgent) -> None:
+        """Adds an agent and compiles its routing keywords into the routing index."""
+        slot = len(self.agents)
+        self.agents.append(agent)
+        self._agents_by_name[agent.name] = agent
+        if agent.keywords:
+            self.routing_index.add(slot, agent.keywords)
+        else:
+            self._fallback_slots.append(slot)
+
+    def rank_agents(self, task_description: str) -> List[Tuple[BaseAgent, int]]:
+        """Returns every agent matching the task with its keyword hit score, best first.
+
+        Ties keep registration order. Agents without routing keywords fall back to
+        their can_handle_task method and score a single hit when it accepts the task.
+        """
+        scores = self.routing_index.scan(task_description)
+        for slot in self._fallback_slots:
+            if self.agents[slot].can_handle_task(task_description):
+                scores[slot] = max(scores.get(slot, 0), 1)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.agents[slot], score) for slot, score in ranked]
+
+    def get_agent(self, name: str) -> BaseAgent:
+        """Returns the registered agent with the given name."""
+        try:
+            return self._agents_by_name[name]
+        except KeyError:
+            raise ValueError(f"Unknown agent: {name}") from None
 
     def select_agent(self, task_description: str) -> BaseAgent:
-        """Selects the most suitable agent for the given task based on their can_handle_task method."""
-        for agent in self.agents:
-            if agent.can_handle_task(task_description):
-                print(f"Orchestrator: Selected {agent.name} for task: {task_description[:50]}...")
-                return agent
-        raise ValueError(f"No suitable agent found for task: {task_description}")
-
-    def run_workflow(self, initial_task: str, context: Dict[str, Any] = None) -> str:
-        """Executes a task by selecting and delegating to an agent, and records the interaction."""
+        """Selects the highest-scoring agent for the given task from the routing index."""
+        with metrics.timed("routing"):
+            ranked = self.rank_agents(task_description)
+        if not ranked:
+            raise ValueError(f"No suitable agent found for task: {task_description}")
+        agent = ranked[0][0]
+        logger.debug("Selected %s for task: %.50s", agent.name, task_description)
+        return agent
+
+    def run_workflow(self, initial_task: str, context: Dict[str, Any] = None, agent: BaseAgent = None) -> str:
+        """Executes a task by selecting and delegating to an agent, and records the interaction.
+
+        Pass agent to run on an agent chosen earlier instead of routing the task
+        again (the work queue routes at enqueue time). Set context["profile"] to run
+        the agent under cProfile; reports are kept in metrics.profiles. When a
+        response cache is configured, repeated tasks routed to a cacheable agent are
+        answered from it unless context["use_cache"] is False or the run is profiled.
+        """
         if context is None:
             context = {}
 
-        print(f"\nOrchestrator: Starting workflow for task: {initial_task}")
-        self.history.append({"role": "user", "content": initial_task})
+        session_id = context.get("session_id")
+        self._start_workflow(initial_task, session_id)
+        selected_agent = agent
+        try:
+            if selected_agent is None:
+                selected_agent = self.select_agent(initial_task)
+            result = self._cached_response(selected_agent, initial_task, context)
+            if result is None:
+                run_context = self._agent_context(selected_agent, initial_task, context)
+                result = self._run_agent(selected_agent, initial_task, run_context)
+                self._cache_response(selected_agent, initial_task, context, result)
+        except ValueError as e:
+            return self._fail_workflow(e, session_id, selected_agent)
+        return self._complete_workflow(selected_agent, result, session_id)
 
+    async def arun_workflow(self, initial_task: str, context: Dict[str, Any] = None, agent: BaseAgent = None) -> str:
+        """Async counterpart of run_workflow that awaits the selected agent's arun.
+
+        With context["profile"] set the agent call moves to an executor thread, where an
+        arun override is driven on a private event loop (so it must not rely on clients
+        bound to the caller's loop) and agents on the default arun are profiled via run().
+        """
+        if context is None:
+            context = {}
+
+        session_id = context.get("session_id")
+        self._start_workflow(initial_task, session_id)
+        selected_agent = agent
         try:
-            selected_agent = self.select_agent(initial_task)
-            result = selected_agent.run(initial_task, context)
-            self.history.append({"role": "agent", "name": selected_agent.name, "content": result})
-            print(f"Orchestrator: Workflow completed by {selected_agent.name}. Result: {result[:100]}...")
-            return result
+            if selected_agent is None:
+                selected_agent = self.select_agent(initial_task)
+            result = self._cached_response(selected_agent, initial_task, context)
+            if result is None:
+                run_context = self._agent_context(selected_agent, initial_task, context)
+                if context.get("profile"):
+                    # cProfile only sees its own thread, so profile inside the executor thread
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(None, self._profile_arun, selected_agent, initial_task,
+                                                        run_context)
+                else:
+                    with metrics.timed("agent_run", selected_agent.name):
+                        result = await selected_agent.arun(initial_task, run_context)
+                self._cache_response(selected_agent, initial_task, context, result)
         except ValueError as e:
-            self.history.append({"role": "error", "content": str(e)})
-            print(f"Orchestrator: Workflow failed - {e}")
-            return f"Error: {e}"
+            return self._fail_workflow(e, session_id, selected_agent)
+        return self._complete_workflow(selected_agent, result, session_id)
+
+    def build_prompt(self, task_description: str, session_id: str = None,
+                     budget: int = PROMPT_TOKEN_BUDGET) -> BuiltPrompt:
+        """Packs the session's recent turns into a general-agent prompt for the task.
+
+        The turn recorded for the task itself is left out, since the template
+        renders the task separately.
+        """
+        turns = self.history.last(PROMPT_HISTORY_TURNS + 1, session_id)
+        if turns and turns[-1].role == "user" and turns[-1].content == task_description:
+            turns = turns[:-1]
+        else:
+            turns = turns[-PROMPT_HISTORY_TURNS:]
+        return build_general_prompt(task_description, turns, budget)
+
+    def plan_workflow(self, task_description: str) -> DagWorkflow:
+        """Breaks a compound task into a DAG of agent steps using the routing index."""
+        return plan_workflow(task_description, self.rank_agents)
+
+    async def arun_dag_workflow(self, initial_task: str, context: Dict[str, Any] = None,
+                                workflow: DagWorkflow = None) -> DagRun:
+        """Runs a multi-agent workflow, planning one from the task if none is given."""
+        session_id = (context or {}).get("session_id")
+        self._start_workflow(initial_task, session_id)
+        try:
+            if workflow is None:
+                workflow = self.plan_workflow(initial_task)
+            run = await workflow.arun(context)
+        except ValueError as e:
+            self._fail_workflow(e, session_id)
+            raise
+        for step in run.steps.values():
+            self._complete_workflow(workflow.steps[step.name].agent, step.output, session_id)
+        return run
+
+    def run_dag_workflow(self, initial_task: str, context: Dict[str, Any] = None,
+                         workflow: DagWorkflow = None) -> DagRun:
+        """Synchronous wrapper around arun_dag_workflow."""
+        ensure_no_running_loop("Orchestrator.run_dag_workflow()", "await Orchestrator.arun_dag_workflow()")
+        return asyncio.run(self.arun_dag_workflow(initial_task, context, workflow))
+
+    def _run_agent(self, agent: BaseAgent, task: str, context: Dict[str, Any]) -> str:
+        with metrics.profiled(f"{agent.name}: {task[:50]}", enabled=bool(context.get("profile"))):
+            with metrics.timed("agent_run", agent.name):
+                return agent.run(task, context)
+
+    def _profile_arun(self, agent: BaseAgent, task: str, context: Dict[str, Any]) -> str:
+        if not agent.has_native_arun():
+            return self._run_agent(agent, task, context)
+        with metrics.profiled(f"{agent.name}: {task[:50]}"):
+            with metrics.timed("agent_run", agent.name):
+                return asyncio.run(agent.arun(task, context))
+
+    def _agent_context(self, agent: BaseAgent, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        if not agent.uses_history:
+            return context
+        prompt = self.build_prompt(task, context.get("session_id"), context.get("token_budget", PROMPT_TOKEN_BUDGET))
+        return {**context, "prompt": prompt}
+
+    def _cached_response(self, agent: BaseAgent, task: str, context: Dict[str, Any]) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        if not self._cache_allowed(agent, context):
+            self.response_cache.record_bypass()
+            return None
+        with metrics.timed("response_cache", agent.name):
+            result = self.response_cache.get(agent.name, task, context)
+        if result is not None:
+            logger.debug("Answered from the response cache by %s", agent.name)
+        return result
+
+    def _cache_response(self, agent: BaseAgent, task: str, context: Dict[str, Any], result: str) -> None:
+        if self.response_cache is not None and self._cache_allowed(agent, context):
+            self.response_cache.put(agent.name, task, context, result)
+
+    @staticmethod
+    def _cache_allowed(agent: BaseAgent, context: Dict[str, Any]) -> bool:
+        # Profiled runs must execute the agent so the profiler has something to record, and
+        # runs that write to context["output_path"] must execute so the file gets written
+        return (agent.cacheable and context.get("use_cache") is not False and not context.get("profile")
+                and not context.get("output_path"))
+
+    def _start_workflow(self, initial_task: str, session_id: str = None) -> None:
+        logger.info("Starting workflow for task: %s", initial_task)
+        self.history.append("user", initial_task, session_id=session_id)
+
+    def _complete_workflow(self, agent: BaseAgent, result: str, session_id: str = None) -> str:
+        self.history.append("agent", result, name=agent.name, session_id=session_id)
+        metrics.increment("workflows_total", agent=agent.name, status="completed")
+        logger.info("Workflow completed by %s. Result: %.100s", agent.name, result)
+        return result
 
-print(f"Created {project_root}/workflows/orchestrator.py")
+    def _fail_workflow(self, error: Exception, session_id: str = None, agent: BaseAgent = None) -> str:
+        """Records a failed workflow, attributed to agent when routing had already selected one."""
+        self.history.append("error", str(error), session_id=session_id)
+        metrics.increment("workflows_total", agent=agent.name if agent is not None else "", status="failed")
+        logger.warning("Workflow failed - %s", error)
+        return f"Error: {error}"
@@ -0,0 +1,38 @@
+import importlib
+import time
+from typing import Any, Callable, Dict, Optional
+
+from workflows.orchestrator import Orchestrator
+
+DEFAULT_FACTORY = "workflows.default_orchestrator:build_default_orchestrator"
+
+# Orchestrator owned by each worker process
+_process_orchestrator: Optional[Orchestrator] = None
+
+
+def load_factory(path: str) -> Callable[[], Orchestrator]:
+    """Resolves a "module:function" orchestrator factory."""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def run_one(orchestrator: Orchestrator, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one task and returns its result record with the service latency in milliseconds."""
+    started = time.perf_counter()
+    output = {"id": record["id"], "task": record["task"]}
+    try:
+        agent = orchestrator.get_agent(record["agent"]) if record.get("agent") else None
+        output["result"] = orchestrator.run_workflow(record["task"], dict(record["context"]), agent=agent)
+    except Exception as e:
+        output["error"] = f"{type(e).__name__}: {e}"
+    output["latency_ms"] = (time.perf_counter() - started) * 1000
+    return output
+
+
+def init_process_worker(factory_path: str) -> None:
+    global _process_orchestrator
+    _process_orchestrator = load_factory(factory_path)()
+
+
+def run_in_process_worker(record: Dict[str, Any]) -> Dict[str, Any]:
+    return run_one(_process_orchestrator, record)
@@ -0,0 +1,261 @@
+import functools
+import logging
+import re
+import string
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from config.config import PROMPT_HISTORY_TURNS, PROMPT_TOKEN_BUDGET
+from prompts.general_agent_prompt import GENERAL_AGENT_PROMPT_TEMPLATE
+from prompts.rag_prompt import RAG_PROMPT_TEMPLATE
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and single punctuation marks: close to BPE token counts for English text
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_WORD_PATTERN = re.compile(r"\w+")
+# Shortest run of characters shared by two chunks that is treated as split overlap
+MIN_CHUNK_OVERLAP = 32
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+TokenCounter = Callable[[str], int]
+
+
+def get_token_counter(encoding: str = "cl100k_base") -> TokenCounter:
+    """Returns a memoised token counter: tiktoken's encoding when installed, else a regex approximation."""
+    try:
+        import tiktoken
+    except ImportError:
+        def count(text: str) -> int:
+            return len(_TOKEN_PATTERN.findall(text))
+    else:
+        encoder = tiktoken.get_encoding(encoding)
+
+        def count(text: str) -> int:
+            return len(encoder.encode_ordinary(text))
+    return functools.lru_cache(maxsize=4096)(count)
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with the shared default counter."""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = get_token_counter()
+    return _default_counter(text)
+
+
+class PromptTemplate:
+    """A str.format template parsed once into literal text and field slots."""
+
+    def __init__(self, template: str, name: str = "prompt"):
+        self.template = template
+        self.name = name
+        self._parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        for literal, field_name, spec, conversion in string.Formatter().parse(template):
+            if field_name is not None and not field_name.isidentifier():
+                raise ValueError(f"Unsupported placeholder {{{field_name}}} in {name} template")
+            self._parts.append((literal, field_name, spec or "", conversion))
+        self.fields = tuple(dict.fromkeys(part[1] for part in self._parts if part[1]))
+        self.literal_text = "".join(part[0] for part in self._parts)
+
+    def render(self, values: Dict[str, Any]) -> str:
+        missing = [name for name in self.fields if name not in values]
+        if missing:
+            raise KeyError(f"Missing template fields: {', '.join(missing)}")
+        pieces = []
+        for literal, field_name, spec, conversion in self._parts:
+            pieces.append(literal)
+            if field_name:
+                value = values[field_name]
+                if conversion:
+                    value = _CONVERSIONS[conversion](value)
+                pieces.append(format(value, spec))
+        return "".join(pieces)
+
+
+RAG_PROMPT = PromptTemplate(RAG_PROMPT_TEMPLATE, "rag")
+GENERAL_AGENT_PROMPT = PromptTemplate(GENERAL_AGENT_PROMPT_TEMPLATE, "general")
+
+
+@dataclass
+class ContextItem:
+    """A candidate for a packed field: higher score is packed first, position sets render order."""
+    text: str
+    score: float = 0.0
+    position: int = 0
+
+
+@dataclass
+class BuiltPrompt:
+    """A rendered prompt and how its packed fields were fitted to the token budget.
+
+    Token counts are summed per piece (template text, fixed values, packed items
+    and their separators), so tokens and unpacked_tokens are directly comparable.
+    """
+    text: str
+    tokens: int
+    budget: int
+    unpacked_tokens: int
+    included: Dict[str, int] = field(default_factory=dict)
+    candidates: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def over_budget(self) -> bool:
+        """True when the template and fixed values alone exceed the budget."""
+        return self.tokens > self.budget
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens avoided compared with pasting every candidate in verbatim."""
+        return max(0, self.unpacked_tokens - self.tokens)
+
+
+class PromptBuilder:
+    """Renders a template with some fields packed from ranked candidates under a token budget.
+
+    Fixed values are always rendered. The remaining budget is filled greedily with
+    the highest-scoring candidates across all packed fields; a candidate that does
+    not fit is skipped so smaller, lower-ranked ones can still use the space.
+    Candidates of fields in dedupe_fields first have the text they share with a
+    higher-ranked candidate trimmed (see dedupe_overlaps).
+    """
+
+    def __init__(self, template: Union[str, PromptTemplate], budget: int = PROMPT_TOKEN_BUDGET,
+                 counter: Optional[TokenCounter] = None, separators: Optional[Dict[str, str]] = None,
+                 dedupe_fields: Iterable[str] = ()):
+        self.template = template if isinstance(template, PromptTemplate) else PromptTemplate(template)
+        self.budget = budget
+        self.counter = counter or count_tokens
+        self.separators = separators or {}
+        self.dedupe_fields = frozenset(dedupe_fields)
+        self._literal_tokens = self.counter(self.template.literal_text)
+
+    def build(self, values: Dict[str, Any], packed: Dict[str, Sequence[ContextItem]],
+              budget: Optional[int] = None) -> BuiltPrompt:
+        budget = self.budget if budget is None else budget
+        count = self.counter
+        fixed_tokens = self._literal_tokens + sum(count(str(values[name])) for name in values
+                                                  if name in self.template.fields)
+        if fixed_tokens > budget:
+            logger.warning("%s prompt needs %d tokens for its template and fixed values, over the %d-token "
+                           "budget; no packed items fit", self.template.name, fixed_tokens, budget)
+        unpacked_tokens = fixed_tokens
+        ranked: List[Tuple[float, int, str, ContextItem]] = []
+        for name, items in packed.items():
+            separator_tokens = count(self.separators.get(name, "\n"))
+            unpacked_tokens += sum(count(item.text) + separator_tokens for item in items)
+            if name in self.dedupe_fields:
+                items = sorted(items, key=lambda item: -item.score)
+                trimmed = dedupe_overlaps([item.text for item in items])
+                items = [ContextItem(text, item.score, item.position) for item, text in zip(items, trimmed)]
+            ranked.extend((-item.score, len(ranked), name, item) for item in items if item.text.strip())
+        ranked.sort(key=lambda entry: entry[:2])
+
+        remaining = budget - fixed_tokens
+        selected: Dict[str, List[ContextItem]] = {name: [] for name in packed}
+        for _rank, _order, name, item in ranked:
+            cost = count(item.text) + count(self.separators.get(name, "\n"))
+            if cost <= remaining:
+                selected[name].append(item)
+                remaining -= cost
+
+        rendered = dict(values)
+        for name, items in selected.items():
+            items.sort(key=lambda item: item.position)
+            rendered[name] = self.separators.get(name, "\n").join(item.text for item in items)
+        prompt = BuiltPrompt(
+            text=self.template.render(rendered),
+            tokens=budget - remaining,
+            budget=budget,
+            unpacked_tokens=unpacked_tokens,
+            included={name: len(items) for name, items in selected.items()},
+            candidates={name: len(items) for name, items in packed.items()},
+        )
+        metrics.increment("prompt_tokens_total", prompt.tokens, template=self.template.name, kind="sent")
+        metrics.increment("prompt_tokens_total", prompt.tokens_saved, template=self.template.name, kind="saved")
+        logger.debug("Built %s prompt: %d tokens (budget %d, %d saved)", self.template.name,
+                     prompt.tokens, budget, prompt.tokens_saved)
+        return prompt
+
+
+def dedupe_overlaps(texts: Sequence[str], min_overlap: int = MIN_CHUNK_OVERLAP) -> List[str]:
+    """Trims from each text what it shares with an earlier (higher-ranked) one.
+
+    Chunks split with chunk_overlap repeat the tail of their predecessor at their
+    head, so a shared run at either end is cut from the later text, and a text
+    wholly contained in an earlier one becomes "". Output aligns with the input.
+    """
+    kept: List[str] = []
+    result: List[str] = []
+    for text in texts:
+        for other in kept:
+            if len(text) >= min_overlap and text in other:
+                text = ""
+                break
+            text = text[_overlap(other, text, min_overlap):]
+            cut = _overlap(text, other, min_overlap)
+            if cut:
+                text = text[:-cut]
+        text = text.strip()
+        if text:
+            kept.append(text)
+        result.append(text)
+    return result
+
+
+def _overlap(left: str, right: str, min_overlap: int) -> int:
+    """Length of the longest suffix of left that is a prefix of right (0 below min_overlap)."""
+    if len(left) < min_overlap or len(right) < min_overlap:
+        return 0
+    probe = right[:min_overlap]
+    position = left.find(probe, max(0, len(left) - len(right)))
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+def build_rag_prompt(question: str, chunks: Sequence[str], budget: int = PROMPT_TOKEN_BUDGET,
+                     counter: Optional[TokenCounter] = None) -> BuiltPrompt:
+    """Packs retrieved chunks (best first, as retrieve_documents returns them) into RAG_PROMPT_TEMPLATE."""
+    items = [ContextItem(text, score=-rank, position=rank) for rank, text in enumerate(chunks)]
+    builder = PromptBuilder(RAG_PROMPT, budget, counter, separators={"context": "\n\n"}, dedupe_fields=("context",))
+    return builder.build({"question": question}, {"context": items})
+
+
+def build_general_prompt(task_description: str, turns: Sequence[Any], budget: int = PROMPT_TOKEN_BUDGET,
+                         counter: Optional[TokenCounter] = None) -> BuiltPrompt:
+    """Packs history turns (oldest first, e.g. WorkflowHistory.last) into GENERAL_AGENT_PROMPT_TEMPLATE.
+
+    A turn's relevance is the share of task words it mentions plus a recency bonus
+    that decays with age, so the latest turn is nearly always kept.
+    """
+    terms = set(_WORD_PATTERN.findall(task_description.lower()))
+    items = []
+    for position, turn in enumerate(turns):
+        age = len(turns) - 1 - position
+        words = set(_WORD_PATTERN.findall(turn.content.lower()))
+        overlap = len(terms & words) / len(terms) if terms else 0.0
+        items.append(ContextItem(turn.render(), score=overlap + 1.0 / (1 + age), position=position))
+    builder = PromptBuilder(GENERAL_AGENT_PROMPT, budget, counter, separators={"history": "\n"})
+    return builder.build({"task_description": task_description}, {"history": items})
+
+
+def rag_prompt_for(vector_store: Any, question: str, k: int = 5, budget: int = PROMPT_TOKEN_BUDGET,
+                   hybrid: bool = True) -> BuiltPrompt:
+    """Retrieves the top k chunks for question and packs them into a RAG prompt."""
+    from utils.rag_utils import retrieve_documents
+
+    return build_rag_prompt(question, retrieve_documents(vector_store, question, k=k, hybrid=hybrid), budget)
+
+
+def general_prompt_for(history: Any, task_description: str, session_id: Optional[str] = None,
+                       turns: int = PROMPT_HISTORY_TURNS, budget: int = PROMPT_TOKEN_BUDGET) -> BuiltPrompt:
+    """Packs the session's last turns of a WorkflowHistory into a general-agent prompt."""
+    return build_general_prompt(task_description, history.last(turns, session_id), budget)
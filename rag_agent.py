@@ -1,23 +1,36 @@
-from typing import Any
+from typing import Any, Callable, Optional
 from agents.base_agent import BaseAgent, Tool
+from config.config import PROMPT_TOKEN_BUDGET
 
 class RagAgent(BaseAgent):
     """Specialized agent for Retrieval-Augmented Generation (RAG) tasks."""
 
-    def __init__(self, name: str, description: str, vector_store: Any = None, retriever: Any = None):
+    keywords = ["lookup", "retrieve", "knowledge base", "information", "fact", "question"]
+    cacheable = True
+
+    def __init__(self, name: str, description: str, vector_store: Any = None, retriever: Any = None,
+                 llm: Optional[Callable[[str], str]] = None):
         super().__init__(name, description)
         self.vector_store = vector_store  # Placeholder for vector database client
         self.retriever = retriever        # Placeholder for retriever mechanism
+        self.llm = llm                    # Completes a prompt; the packed prompt is reported without one
 
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task based on keywords."""
-        keywords = ["lookup", "retrieve", "knowledge base", "information", "fact", "question"]
-        return any(keyword in task_description.lower() for keyword in keywords)
+        return any(keyword in task_description.lower() for keyword in self.keywords)
 
     def run(self, task_description: str, context: dict) -> str:
         """Executes the RAG agent's task, simulating knowledge retrieval."""
+        if self.vector_store is not None:
+            from utils.prompt_builder import rag_prompt_for
+
+            prompt = rag_prompt_for(self.vector_store, task_description, k=context.get("k", 5),
+                                    budget=context.get("token_budget", PROMPT_TOKEN_BUDGET))
+            if self.llm is not None:
+                return self.llm(prompt.text)
+            return (f"RagAgent executed task: '{task_description}'. Packed {prompt.included['context']} of "
+                    f"{prompt.candidates['context']} retrieved chunks into a {prompt.tokens}-token prompt "
+                    f"({prompt.tokens_saved} tokens saved).")
         # In a real implementation, this would involve using self.retriever and self.vector_store
         # to fetch relevant documents and then generating a response.
         return f"RagAgent executed task: '{task_description}' with context: {context}. Retrieved relevant information."
-
-print(f"Created {project_root}/agents/rag_agent.py")
@@ -1,36 +1,110 @@
-from typing import List, Any
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
+import os
+import weakref
+from typing import TYPE_CHECKING, List, Any, Optional
+
+from config.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_PATH,
+    RAG_STORE_DIR,
+)
+from utils.metrics import metrics
+
+# FAISS, NumPy, LangChain and OpenAI are imported on first use, so importing this
+# module (e.g. at app startup) stays cheap until a RAG call is actually made.
+if TYPE_CHECKING:
+    from utils.hybrid_retrieval import HybridRetriever
+    from utils.ingestion import IngestionStats
+    from utils.vector_index import VectorIndex
 
 # NOTE: Ensure OPENAI_API_KEY is set in your environment or config.py
 
 def chunk_documents(documents: List[str], chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
     """Chunks a list of documents into smaller pieces."""
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-        add_start_index=True,
-    )
-    chunks = text_splitter.create_documents([doc for doc in documents])
-    return [chunk.page_content for chunk in chunks]
-
-def create_vector_store(documents: List[str], collection_name: str = "rag_collection") -> Chroma:
-    """Creates an in-memory Chroma vector store with OpenAI embeddings."""
-    # Ensure OpenAIEmbeddings is configured correctly (e.g., OPENAI_API_KEY is set)
-    embeddings = OpenAIEmbeddings()
-    
-    # Chunk documents before creating vector store
+    from utils.ingestion import iter_chunks
+
+    segments = ((doc, {}) for doc in documents)
+    return [text for text, _metadata in iter_chunks(segments, chunk_size, chunk_overlap)]
+
+_embedding_cache = None
+
+def get_embeddings(backend: str = EMBEDDING_BACKEND) -> Any:
+    """Builds the configured embedder, wrapped in the shared on-disk embedding cache."""
+    from utils.embeddings import CachedEmbeddings, EmbeddingCache, HashingEmbedder
+
+    if backend == "hashing":
+        embedder = HashingEmbedder()
+    elif backend == "openai":
+        # Ensure OpenAIEmbeddings is configured correctly (e.g., OPENAI_API_KEY is set)
+        from langchain_openai import OpenAIEmbeddings
+        embedder = OpenAIEmbeddings()
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    if not EMBEDDING_CACHE_PATH:
+        return embedder
+
+    global _embedding_cache
+    if _embedding_cache is None:
+        os.makedirs(os.path.dirname(EMBEDDING_CACHE_PATH) or ".", exist_ok=True)
+        _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+    return CachedEmbeddings(embedder, _embedding_cache, batch_size=EMBEDDING_BATCH_SIZE)
+
+def load_vector_store(collection_name: str = "rag_collection", embeddings: Any = None) -> "VectorIndex":
+    """Opens (memory-maps) the persistent FAISS index for a collection without embedding anything."""
+    from utils.vector_index import VectorIndex
+
+    if embeddings is None:
+        embeddings = get_embeddings()
+    return VectorIndex(os.path.join(RAG_STORE_DIR, collection_name), embeddings)
+
+def create_vector_store(documents: List[str], collection_name: str = "rag_collection", embeddings: Any = None) -> "VectorIndex":
+    """Syncs the persistent FAISS index for a collection with the given documents.
+
+    Chunks are keyed by content hash, so only new or changed chunks are embedded and
+    chunks no longer present in the documents are dropped.
+    """
+    vector_store = load_vector_store(collection_name, embeddings)
+
+    # Chunk documents before syncing the vector store
     chunked_documents = chunk_documents(documents)
-    
-    # Using .from_documents to create the vector store with embeddings
-    vector_store = Chroma.from_texts(texts=chunked_documents, embedding=embeddings, collection_name=collection_name)
+
+    vector_store.sync(chunked_documents)
+    vector_store.save()
     return vector_store
 
-def retrieve_documents(vector_store: Chroma, query: str, k: int = 5) -> List[str]:
+def ingest_document_files(paths: List[str], collection_name: str = "rag_collection", embeddings: Any = None,
+                          processes: Optional[int] = None, **kwargs: Any) -> "IngestionStats":
+    """Streams text/PDF files or directories into a collection's index with bounded memory.
+
+    Unlike create_vector_store, this only adds chunks; it never removes existing ones.
+    """
+    from utils.ingestion import ingest_files
+
+    vector_store = load_vector_store(collection_name, embeddings)
+    return ingest_files(paths, vector_store, processes=processes, **kwargs)
+
+_retrievers: "weakref.WeakKeyDictionary[VectorIndex, HybridRetriever]" = weakref.WeakKeyDictionary()
+
+def get_retriever(vector_store: "VectorIndex") -> "HybridRetriever":
+    """Returns the hybrid BM25 + vector retriever attached to a vector store."""
+    from utils.hybrid_retrieval import HybridRetriever
+
+    retriever = _retrievers.get(vector_store)
+    if retriever is None:
+        retriever = _retrievers[vector_store] = HybridRetriever(vector_store)
+    return retriever
+
+def retrieve_documents(vector_store: "VectorIndex", query: str, k: int = 5, hybrid: bool = True) -> List[str]:
     """Retrieves top k relevant documents from the vector store based on a query."""
-    docs = vector_store.similarity_search(query, k=k)
-    return [doc.page_content for doc in docs]
+    return retrieve_documents_batch(vector_store, [query], k=k, hybrid=hybrid)[0]
 
-print(f"Created {project_root}/utils/rag_utils.py")
+def retrieve_documents_batch(vector_store: "VectorIndex", queries: List[str], k: int = 5,
+                             hybrid: bool = True) -> List[List[str]]:
+    """Retrieves the top k documents for many queries in one batched pass over the index."""
+    with metrics.timed("retrieval", "hybrid" if hybrid else "vector"):
+        if hybrid:
+            results = get_retriever(vector_store).search_batch(queries, k=k)
+        else:
+            results = vector_store.search_vectors(vector_store.embed_queries(queries), k=k)
+    return [[text for text, _score in hits] for hits in results]
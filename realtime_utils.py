@@ -1,18 +1,58 @@
 import asyncio
-from typing import Any, Callable
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.config import (
+    WORK_QUEUE_BACKOFF_BASE,
+    WORK_QUEUE_DB_PATH,
+    WORK_QUEUE_MAX_ATTEMPTS,
+    WORK_QUEUE_MAX_SIZE,
+    WORK_QUEUE_PROCESSES,
+    WORK_QUEUE_WORKERS_PER_AGENT,
+)
+from workflows.default_orchestrator import build_default_orchestrator
+from workflows.process_worker import DEFAULT_FACTORY, init_process_worker
+from workflows.work_queue import DEFAULT_PRIORITY, BackgroundWorkQueue, WorkQueue, process_pool_handler
+
+logger = logging.getLogger(__name__)
+
+_work_queue: Optional[BackgroundWorkQueue] = None
+_work_queue_lock = threading.Lock()
 
 async def async_run_task(task_func: Callable, *args, **kwargs) -> Any:
-    """Simulates asynchronous execution of a task."""
-    print(f"[Realtime] Starting async task: {task_func.__name__}")
-    await asyncio.sleep(0.1) # Simulate some async work
-    result = task_func(*args, **kwargs)
-    print(f"[Realtime] Async task {task_func.__name__} completed.")
+    """Runs a synchronous task in the event loop's thread pool so the loop stays responsive."""
+    logger.debug("Starting async task: %s", task_func.__name__)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, functools.partial(task_func, *args, **kwargs))
+    logger.debug("Async task %s completed.", task_func.__name__)
     return result
 
-def process_queue_item(item: Any) -> str:
-    """Simulates processing an item from an efficient queuing mechanism."""
-    print(f"[Realtime] Processing queue item: {item[:50]}...")
-    # Simulate processing logic
-    return f"Item '{item[:50]}...' processed successfully in real-time."
+def get_work_queue() -> BackgroundWorkQueue:
+    """Returns the process-wide background work queue, starting it on first use."""
+    global _work_queue
+    with _work_queue_lock:
+        if _work_queue is None:
+            handler = None
+            if WORK_QUEUE_PROCESSES > 0:
+                executor = ProcessPoolExecutor(max_workers=WORK_QUEUE_PROCESSES, initializer=init_process_worker,
+                                               initargs=(DEFAULT_FACTORY,))
+                handler = process_pool_handler(executor)
+            work_queue = WorkQueue(
+                build_default_orchestrator(),
+                workers_per_agent=WORK_QUEUE_WORKERS_PER_AGENT,
+                max_attempts=WORK_QUEUE_MAX_ATTEMPTS,
+                backoff_base=WORK_QUEUE_BACKOFF_BASE,
+                max_queue_size=WORK_QUEUE_MAX_SIZE,
+                db_path=WORK_QUEUE_DB_PATH,
+                handler=handler,
+            )
+            _work_queue = BackgroundWorkQueue(work_queue)
+        return _work_queue
 
-print(f"Created {project_root}/utils/realtime_utils.py")
+def process_queue_item(item: str, context: Optional[Dict[str, Any]] = None, priority: int = DEFAULT_PRIORITY) -> Future:
+    """Queues a task on the background work queue and returns a future for its result."""
+    logger.debug("Queueing item: %.50s", item)
+    return get_work_queue().submit(item, context, priority)
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from utils.metrics import metrics
+from utils.tool_cache import normalize_query
+
+# Context keys that control how a workflow runs rather than what it answers
+DEFAULT_IGNORED_CONTEXT_KEYS = ("session_id", "profile", "use_cache")
+
+ResponseKey = Tuple[str, str, str]  # (agent name, normalised task, context hash)
+
+
+def context_hash(context: Optional[Dict[str, Any]], ignored_keys: Iterable[str] = DEFAULT_IGNORED_CONTEXT_KEYS) -> str:
+    """Order-independent hash of a workflow context, skipping run-control keys."""
+    ignored = set(ignored_keys)
+    canonical = {key: value for key, value in (context or {}).items() if key not in ignored}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class WorkflowResponseCache:
+    """TTL + LRU cache of workflow results keyed on agent, normalised task and context.
+
+    The exact tier matches tasks that normalise to the same text. When an embedder
+    is given, a semantic tier also reuses a result for a task whose embedding has at
+    least similarity_threshold cosine similarity with a cached task routed to the
+    same agent under the same context. Callers are expected to use it only for agents
+    that opt in (BaseAgent.cacheable), since replaying a side effect is never safe.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 300.0, embedder: Any = None,
+                 similarity_threshold: float = 0.9,
+                 ignored_context_keys: Iterable[str] = DEFAULT_IGNORED_CONTEXT_KEYS,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1 or ttl <= 0:
+            raise ValueError("max_entries and ttl must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.ignored_context_keys = tuple(ignored_context_keys)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[ResponseKey, Tuple[float, str]]" = OrderedDict()
+        # Semantic tier: (agent, context hash) -> {key: unit-length task embedding}
+        self._vectors: Dict[Tuple[str, str], Dict[ResponseKey, Any]] = {}
+        self._counters: Dict[str, int] = {}
+
+    def make_key(self, agent_name: str, task: str, context: Optional[Dict[str, Any]]) -> ResponseKey:
+        return agent_name, normalize_query(task), context_hash(context, self.ignored_context_keys)
+
+    def get(self, agent_name: str, task: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Returns a fresh cached result for the task, or None on a miss."""
+        key = self.make_key(agent_name, task, context)
+        vector = self._embed(key[1]) if self.embedder is not None else None
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._count("exact_hits")
+                return entry[1]
+            if entry is not None:
+                self._drop(key)
+                self._count("expirations")
+            if vector is not None:
+                match = self._nearest(key, vector, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self._count("semantic_hits")
+                    return self._entries[match][1]
+            self._count("misses")
+            return None
+
+    def put(self, agent_name: str, task: str, context: Optional[Dict[str, Any]], result: str) -> None:
+        key = self.make_key(agent_name, task, context)
+        vector = self._embed(key[1]) if self.embedder is not None else None
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, result)
+            self._entries.move_to_end(key)
+            if vector is not None:
+                self._vectors.setdefault((key[0], key[2]), {})[key] = vector
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._count("evictions")
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._count("bypass")
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._vectors.clear()
+            return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/bypass/eviction counters, current size and the hit rate over lookups."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["size"] = len(self._entries)
+        hits = stats.get("exact_hits", 0) + stats.get("semantic_hits", 0)
+        lookups = hits + stats.get("misses", 0)
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def _nearest(self, key: ResponseKey, vector: Any, now: float) -> Optional[ResponseKey]:
+        import numpy as np
+
+        candidates = self._vectors.get((key[0], key[2]))
+        if not candidates:
+            return None
+        keys = list(candidates)
+        similarities = np.stack([candidates[candidate] for candidate in keys]) @ vector
+        for index in np.argsort(-similarities):
+            if similarities[index] < self.similarity_threshold:
+                break
+            candidate = keys[index]
+            if self._entries[candidate][0] > now:
+                return candidate
+        return None
+
+    def _embed(self, text: str) -> Any:
+        import numpy as np
+
+        vector = np.asarray(self.embedder.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _drop(self, key: ResponseKey) -> None:
+        self._entries.pop(key, None)
+        vectors = self._vectors.get((key[0], key[2]))
+        if vectors is not None:
+            vectors.pop(key, None)
+            if not vectors:
+                del self._vectors[(key[0], key[2])]
+
+    def _count(self, counter: str) -> None:
+        self._counters[counter] = self._counters.get(counter, 0) + 1
+        metrics.increment("workflow_cache_total", result=counter)
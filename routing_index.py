@@ -0,0 +1,91 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class KeywordRoutingIndex:
+    """Aho-Corasick automaton over the routing keywords of every registered agent.
+
+    Keywords are matched as case-insensitive substrings, the same semantics as the
+    agents' own can_handle_task checks, but a task is scanned once regardless of
+    how many agents or keywords are registered.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]      # keyword ids ending at each state
+        self._keyword_ids: Dict[str, int] = {}
+        self._keyword_slots: List[Set[int]] = []  # keyword id -> agent slots
+        self._compiled = True
+
+    def add(self, slot: int, keywords: Iterable[str]) -> None:
+        """Registers an agent slot under the given keywords."""
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            keyword_id = self._keyword_ids.get(keyword)
+            if keyword_id is None:
+                keyword_id = self._insert(keyword)
+            self._keyword_slots[keyword_id].add(slot)
+
+    def scan(self, text: str) -> Dict[int, int]:
+        """Returns a mapping of agent slot -> number of distinct keywords matched in text."""
+        if not self._compiled:
+            self._compile()
+        goto, fail, out = self._goto, self._fail, self._out
+        matched: Set[int] = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                matched.update(out[state])
+
+        scores: Dict[int, int] = {}
+        for keyword_id in matched:
+            for slot in self._keyword_slots[keyword_id]:
+                scores[slot] = scores.get(slot, 0) + 1
+        return scores
+
+    def _insert(self, keyword: str) -> int:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+            state = next_state
+        keyword_id = len(self._keyword_slots)
+        self._keyword_ids[keyword] = keyword_id
+        self._keyword_slots.append(set())
+        self._compiled = False
+        return keyword_id
+
+    def _compile(self) -> None:
+        """Rebuilds failure links and merged outputs with a breadth-first pass over the trie."""
+        out = [[] for _ in self._goto]
+        for keyword, keyword_id in self._keyword_ids.items():
+            state = 0
+            for char in keyword:
+                state = self._goto[state][char]
+            out[state].append(keyword_id)
+
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = self._goto[fallback].get(char, 0)
+                out[next_state] = out[next_state] + out[fail[next_state]]
+                queue.append(next_state)
+
+        self._fail = fail
+        self._out = out
+        self._compiled = True
@@ -1,22 +1,32 @@
-from typing import Any
+from typing import Any, Callable, Optional
 from agents.base_agent import BaseAgent, Tool
 
 class SalesAgent(BaseAgent):
     """Specialized agent for sales-related tasks like lead qualification and follow-ups."""
 
-    def __init__(self, name: str, description: str, crm_api: Any = None):
+    keywords = ["sales", "lead", "customer", "deal", "opportunity", "crm", "follow-up", "proposal"]
+    # Follow-ups and proposals build on earlier turns of the conversation
+    uses_history = True
+
+    def __init__(self, name: str, description: str, crm_api: Any = None, llm: Optional[Callable[[str], str]] = None):
         super().__init__(name, description)
         self.crm_api = crm_api  # Placeholder for CRM system API
+        self.llm = llm          # Completes a prompt; the packed prompt is reported without one
 
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task based on keywords."""
-        keywords = ["sales", "lead", "customer", "deal", "opportunity", "crm", "follow-up", "proposal"]
-        return any(keyword in task_description.lower() for keyword in keywords)
+        return any(keyword in task_description.lower() for keyword in self.keywords)
 
     def run(self, task_description: str, context: dict) -> str:
         """Executes the Sales agent's task, simulating sales operations."""
-        # In a real implementation, this would involve using self.crm_api
+        prompt = context.get("prompt")
+        if prompt is not None and self.llm is not None:
+            return self.llm(prompt.text)
+        context = {key: value for key, value in context.items() if key != "prompt"}
+        # In a real implementation, the LLM's answer would drive self.crm_api
         # to update records, generate emails, etc.
-        return f"SalesAgent executed task: '{task_description}' with context: {context}. Performed sales operation."
-
-print(f"Created {project_root}/agents/sales_agent.py")
+        result = f"SalesAgent executed task: '{task_description}' with context: {context}. Performed sales operation."
+        if prompt is not None:
+            result += (f" Considered {prompt.included['history']} of {prompt.candidates['history']} earlier turns "
+                       f"in a {prompt.tokens}-token prompt.")
+        return result
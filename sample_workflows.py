@@ -1,6 +1,7 @@
 from typing import Dict, Any
 
 from workflows.orchestrator import Orchestrator
+from workflows.dag_workflow import DagWorkflow, WorkflowStep
 from agents.rag_agent import RagAgent
 from agents.tag_agent import TagAgent
 from agents.email_agent import EmailAgent
@@ -52,8 +53,27 @@ def run_customer_ticket_routing_workflow():
     orchestrator = Orchestrator(agents=[rag_agent, email_agent])
     task = "Route customer support ticket 'CT-9876' concerning a 'product return' and draft an initial response."
     context = {"ticket_id": "CT-9876", "issue_summary": "Product return inquiry"}
-    result = orchestrator.run_workflow(task, context)
-    print(f"Customer Ticket Routing Workflow Result: {result}")
+    # Classification and the reply are separate steps so the responder sees the classifier's output.
+    workflow = DagWorkflow([
+        WorkflowStep(name="classify", agent=rag_agent, task="Retrieve the return policy information for ticket 'CT-9876'."),
+        WorkflowStep(name="respond", agent=email_agent, task="Draft an initial reply for ticket 'CT-9876'.", depends_on=["classify"]),
+    ])
+    run = orchestrator.run_dag_workflow(task, context, workflow=workflow)
+    print(f"Customer Ticket Routing Workflow Result: {run.output}")
+    print(f"Step timings (s): {run.timings()}")
+
+def run_sales_report_distribution_workflow():
+    print("\n--- Running Sales Report Distribution Workflow ---")
+    rag_agent = RagAgent(name="KnowledgeLookup", description="Agent for retrieving knowledge base notes.")
+    tag_agent = TagAgent(name="ReportBuilder", description="Agent for building reports from tabular data.")
+    email_agent = EmailAgent(name="ReportMailer", description="Agent for distributing reports by email.")
+    orchestrator = Orchestrator(agents=[rag_agent, tag_agent, email_agent])
+    # The RAG and TAG steps are planned in parallel; the email step waits for both.
+    task = "Retrieve the Q1 knowledge base notes and build the Q1 sales report, then email it to stakeholders."
+    context = {"quarter": "Q1 2024", "recipients": ["stakeholders@example.com"]}
+    run = orchestrator.run_dag_workflow(task, context)
+    print(f"Sales Report Distribution Workflow Result: {run.output}")
+    print(f"Step timings (s): {run.timings()}, total: {run.total_duration:.4f}")
 
 if __name__ == "__main__":
     print("Running sample workflows...")
@@ -62,6 +82,5 @@ if __name__ == "__main__":
     run_hr_screening_workflow()
     run_data_cleaning_workflow()
     run_customer_ticket_routing_workflow()
+    run_sales_report_distribution_workflow()
     print("All sample workflows completed.")
-
-print(f"Created {project_root}/workflows/sample_workflows.py")
@@ -0,0 +1,393 @@
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# A table source: a file path (CSV, Parquet, Arrow/Feather), a DataFrame, or records as
+# returned by the TAG tools (a list of per-row dicts).
+TableSource = Union[str, pd.DataFrame, Sequence[Dict[str, Any]]]
+
+DEFAULT_CHUNK_ROWS = 250_000
+_PARQUET_EXTENSIONS = (".parquet", ".pq")
+_ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+_AGGREGATIONS = ("sum", "count", "mean", "min", "max")
+# Hash given to null key values whatever the column's dtype in that chunk
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+# Sorted hash runs kept by _SeenHashes before small ones are merged
+_MAX_RUNS = 8
+
+
+def iter_frames(source: TableSource, columns: Optional[List[str]] = None,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yields a table source as DataFrames of at most chunk_rows rows.
+
+    CSV files are read in chunks; Parquet and Arrow files are memory-mapped and read
+    one record batch at a time through pyarrow when it is installed. Only the
+    requested columns are materialized.
+    """
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        for start in range(0, max(len(frame), 1), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+        return
+    if not isinstance(source, str):
+        yield pd.DataFrame.from_records(list(source), columns=columns)
+        return
+
+    extension = os.path.splitext(source)[1].lower()
+    if extension in _PARQUET_EXTENSIONS:
+        yield from _iter_parquet(source, columns, chunk_rows)
+    elif extension in _ARROW_EXTENSIONS:
+        yield from _iter_arrow(source, columns, chunk_rows)
+    else:
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunk_rows)
+
+
+def _iter_parquet(path: str, columns: Optional[List[str]], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        # Without pyarrow, pandas falls back to fastparquet (if installed) and reads the whole file.
+        yield pd.read_parquet(path, columns=columns)
+        return
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def _iter_arrow(path: str, columns: Optional[List[str]], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+    except ImportError:
+        raise ValueError(f"Reading Arrow/Feather files such as {path} requires pyarrow") from None
+    with pa.memory_map(path, "r") as source:
+        reader = ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(start, chunk_rows).to_pandas()
+
+
+@dataclass
+class ColumnSummary:
+    """Streaming statistics for one column, mergeable across chunks.
+
+    Numeric moments are kept as (moment_count, mean, m2) per column and merged
+    chunk by chunk with Chan et al.'s parallel update, which stays accurate for
+    large values where sum-of-squares formulas cancel out.
+    """
+    name: str
+    dtype: str = ""
+    count: int = 0
+    nulls: int = 0
+    total: float = 0.0
+    moment_count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: Any = None
+    maximum: Any = None
+    top_values: Counter = field(default_factory=Counter)
+
+    @property
+    def numeric(self) -> bool:
+        try:
+            dtype = pd.api.types.pandas_dtype(self.dtype)
+        except TypeError:
+            return False
+        return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+    def update(self, column: pd.Series, max_tracked: int) -> None:
+        self.dtype = self.dtype or str(column.dtype)
+        values = column.dropna()
+        self.nulls += len(column) - len(values)
+        self.count += len(values)
+        if values.empty:
+            return
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            as_float = values.to_numpy(dtype=np.float64)
+            self.total += float(as_float.sum())
+            self._merge_moments(as_float)
+            self._extend(values.min(), values.max())
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            self._extend(values.min(), values.max())
+        else:
+            self.top_values.update(values.value_counts(sort=False).to_dict())
+            if len(self.top_values) > max_tracked:
+                # Keep only the heaviest values so high-cardinality columns stay bounded
+                self.top_values = Counter(dict(self.top_values.most_common(max_tracked)))
+
+    def _merge_moments(self, values: np.ndarray) -> None:
+        count, mean = len(values), float(values.mean())
+        deviations = values - mean
+        m2 = float(np.dot(deviations, deviations))
+        combined = self.moment_count + count
+        delta = mean - self.mean
+        self.mean += delta * count / combined
+        self.m2 += m2 + delta * delta * self.moment_count * count / combined
+        self.moment_count = combined
+
+    def _extend(self, low: Any, high: Any) -> None:
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+    def describe(self, top: int = 3) -> str:
+        details = []
+        if self.numeric and self.moment_count:
+            std = (self.m2 / self.moment_count) ** 0.5
+            details.append(f"min {_fmt(self.minimum)}, max {_fmt(self.maximum)}, mean {_fmt(self.mean)}, "
+                           f"std {_fmt(std)}, sum {_fmt(self.total)}")
+        elif self.minimum is not None:
+            details.append(f"from {self.minimum} to {self.maximum}")
+        elif self.top_values:
+            details.append("top: " + ", ".join(f"{value!r} ({count:,})"
+                                               for value, count in self.top_values.most_common(top)))
+        if self.nulls:
+            details.append(f"{self.nulls:,} nulls")
+        head = f"{self.name} ({self.dtype})"
+        return f"{head}: {'; '.join(details)}" if details else head
+
+
+@dataclass
+class TableSummary:
+    """Compact profile of a table, small enough to put in an LLM prompt."""
+    name: str
+    rows: int = 0
+    columns: Dict[str, ColumnSummary] = field(default_factory=dict)
+
+    def to_prompt(self, max_columns: int = 30, top: int = 3) -> str:
+        lines = [f"Table {self.name}: {self.rows:,} rows x {len(self.columns)} columns"]
+        for summary in list(self.columns.values())[:max_columns]:
+            lines.append(f"- {summary.describe(top)}")
+        if len(self.columns) > max_columns:
+            lines.append(f"- ... {len(self.columns) - max_columns} more columns")
+        return "\n".join(lines)
+
+
+@dataclass
+class DedupResult:
+    """Row counts from a streaming deduplication pass."""
+    rows_in: int = 0
+    rows_out: int = 0
+    output_path: Optional[str] = None
+
+    @property
+    def duplicates(self) -> int:
+        return self.rows_in - self.rows_out
+
+
+class TabularEngine:
+    """Vectorized, chunked table operations for TagAgent.
+
+    Every operation streams its source chunk by chunk, so memory grows with
+    chunk_rows plus per-group or per-key state (one group row per distinct group, 8
+    bytes per distinct deduplication key), not with file size. Results are small
+    DataFrames or summaries suitable for an LLM prompt.
+    """
+
+    def __init__(self, chunk_rows: int = DEFAULT_CHUNK_ROWS, max_tracked_values: int = 1000):
+        self.chunk_rows = chunk_rows
+        self.max_tracked_values = max_tracked_values
+
+    def frames(self, source: TableSource, columns: Optional[List[str]] = None,
+               where: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """Yields the source chunk by chunk, filtered with a DataFrame.query expression."""
+        # A filter may reference columns outside the selection, so read them all first
+        for frame in iter_frames(source, None if where else columns, self.chunk_rows):
+            if where:
+                frame = frame.query(where)
+                if columns is not None:
+                    frame = frame[columns]
+            yield frame
+
+    def summarize(self, source: TableSource, name: Optional[str] = None, columns: Optional[List[str]] = None,
+                  where: Optional[str] = None) -> TableSummary:
+        """Row count and per-column statistics (numeric moments, ranges, top values)."""
+        summary = TableSummary(name or (source if isinstance(source, str) else "data"))
+        for frame in self.frames(source, columns, where):
+            summary.rows += len(frame)
+            for column in frame.columns:
+                column_summary = summary.columns.setdefault(column, ColumnSummary(str(column)))
+                column_summary.update(frame[column], self.max_tracked_values)
+        return summary
+
+    def aggregate(self, source: TableSource, group_by: Union[str, List[str]], metrics: Dict[str, Iterable[str]],
+                  where: Optional[str] = None, sort_by: Optional[str] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """Grouped sum/count/mean/min/max over the whole source, e.g. metrics={"sales": ["sum", "mean"]}.
+
+        Each chunk is reduced to per-group partials (sum, count, min, max) that are
+        merged as the scan proceeds, so only one row per group is ever held.
+        """
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        metrics = {column: list(aggregations) for column, aggregations in metrics.items()}
+        for column, aggregations in metrics.items():
+            unknown = [aggregation for aggregation in aggregations if aggregation not in _AGGREGATIONS]
+            if unknown:
+                raise ValueError(f"Unsupported aggregation(s) for {column}: {', '.join(unknown)}")
+        partial_specs = {
+            column: sorted({part for aggregation in aggregations
+                            for part in (("sum", "count") if aggregation == "mean" else (aggregation,))})
+            for column, aggregations in metrics.items()
+        }
+        columns = group_by + [column for column in metrics if column not in group_by]
+        merged: Optional[pd.DataFrame] = None
+        for frame in self.frames(source, columns, where):
+            partial = frame.groupby(group_by, sort=False, dropna=False).agg(partial_specs)
+            merged = partial if merged is None else self._merge_partials(merged, partial)
+        if merged is None:
+            return pd.DataFrame()
+
+        result = pd.DataFrame(index=merged.index)
+        for column, aggregations in metrics.items():
+            for aggregation in aggregations:
+                if aggregation == "mean":
+                    result[f"{column}_mean"] = merged[(column, "sum")] / merged[(column, "count")]
+                else:
+                    result[f"{column}_{aggregation}"] = merged[(column, aggregation)]
+        result = result.reset_index()
+        if sort_by is not None:
+            result = result.sort_values(sort_by, ascending=False)
+        return result.head(limit) if limit is not None else result
+
+    @staticmethod
+    def _merge_partials(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        combined = pd.concat([left, right])
+        how = {key: ("sum" if key[1] in ("sum", "count") else key[1]) for key in combined.columns}
+        return combined.groupby(level=list(range(combined.index.nlevels)), sort=False, dropna=False).agg(how)
+
+    def deduplicate(self, source: TableSource, subset: Optional[List[str]] = None, normalize: bool = True,
+                    output_path: Optional[str] = None, where: Optional[str] = None) -> DedupResult:
+        """Drops repeated rows (by subset columns, or whole rows), keeping the first occurrence.
+
+        Rows are compared by 64-bit hashes of the key columns (see _row_hashes),
+        optionally after trimming and lower-casing text. Only the hashes of rows
+        already seen are kept between chunks, so memory grows by 8 bytes per distinct
+        key rather than with the file. Surviving rows are appended to output_path
+        (CSV, or Parquet when the path ends in .parquet) if given.
+        """
+        result = DedupResult(output_path=output_path)
+        seen = _SeenHashes()
+        writer = _FrameWriter(output_path) if output_path else None
+        try:
+            for frame in self.frames(source, where=where):
+                hashes = _row_hashes(frame[subset] if subset else frame, normalize)
+                unique, first_rows = np.unique(hashes, return_index=True)
+                new = ~seen.contains(unique)
+                keep = np.sort(first_rows[new])
+                seen.add(unique[new])
+                result.rows_in += len(frame)
+                result.rows_out += len(keep)
+                if writer is not None:
+                    writer.write(frame.iloc[keep])
+        finally:
+            if writer is not None:
+                writer.close()
+        return result
+
+
+class _SeenHashes:
+    """Set of uint64 hashes stored as a few sorted runs.
+
+    Each chunk's new hashes become a run, merged into the previous run while that
+    one is no larger or there are more than _MAX_RUNS runs. Runs stay few and large
+    ones are rarely re-sorted, instead of re-sorting every hash on every chunk.
+    """
+
+    def __init__(self):
+        self._runs: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Membership mask; searching is much faster when hashes are sorted."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        run = np.sort(hashes)
+        while self._runs and (len(self._runs[-1]) <= len(run) or len(self._runs) >= _MAX_RUNS):
+            run = np.concatenate((self._runs.pop(), run))
+            run.sort()
+        self._runs.append(run)
+
+
+class _FrameWriter:
+    """Appends DataFrame chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet = path.lower().endswith(_PARQUET_EXTENSIONS)
+        self._writer = None
+        self._wrote_header = False
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header,
+                         index=False)
+            self._wrote_header = True
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _row_hashes(keys: pd.DataFrame, normalize: bool) -> np.ndarray:
+    """One 64-bit hash per row that does not depend on the dtypes a chunk was read with.
+
+    Chunks infer dtypes independently, so an integer column reads as float64 in a
+    chunk that has a gap, and an empty text column as all-NaN float64. Integer keys
+    are hashed as exact int64 (float64 would merge IDs above 2**53), whole floats as
+    the same int64, other floats as float64, other keys as strings, and nulls as one
+    fixed value, so the same row hashes alike in every chunk.
+    """
+    combined = np.zeros(len(keys), dtype=np.uint64)
+    for _name, column in keys.items():
+        if pd.api.types.is_integer_dtype(column):
+            hashes = pd.util.hash_array(column.to_numpy(dtype=np.int64, na_value=0))
+        elif pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            hashes = _float_hashes(column.to_numpy(dtype=np.float64, na_value=np.nan))
+        else:
+            text = column.astype("string")
+            if normalize:
+                text = text.str.strip().str.lower()
+            hashes = pd.util.hash_array(text.to_numpy(dtype=object, na_value=""))
+        hashes[column.isna().to_numpy()] = _NULL_HASH
+        combined = combined * _HASH_MULTIPLIER ^ hashes
+    return combined
+
+
+def _float_hashes(values: np.ndarray) -> np.ndarray:
+    # Whole numbers hash like the int64 they were upcast from, so a gap does not change a key
+    hashes = pd.util.hash_array(values)
+    with np.errstate(invalid="ignore"):
+        whole = np.isfinite(values) & (values == np.trunc(values)) & (np.abs(values) < 2.0 ** 63)
+    hashes[whole] = pd.util.hash_array(values[whole].astype(np.int64))
+    return hashes
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.4g}" if abs(value) < 1e6 else f"{value:,.0f}"
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    return str(value)
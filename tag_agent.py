@@ -1,22 +1,75 @@
-from typing import Any
+import os
+from typing import Any, Optional
 from agents.base_agent import BaseAgent, Tool
 
+# Rows of an aggregate result included in the agent's answer
+MAX_RESULT_ROWS = 20
+
 class TagAgent(BaseAgent):
     """Specialized agent for Table-Augmented Generation (TAG) tasks."""
 
+    keywords = ["table", "database", "query", "data analysis", "report", "spreadsheet"]
+    cacheable = True
+
     def __init__(self, name: str, description: str, db_connector: Any = None):
         super().__init__(name, description)
         self.db_connector = db_connector  # Placeholder for database connection/client
+        self._engine = None
 
     def can_handle_task(self, task_description: str) -> bool:
         """Determines if the agent is suitable for a given task based on keywords."""
-        keywords = ["table", "database", "query", "data analysis", "report", "spreadsheet"]
-        return any(keyword in task_description.lower() for keyword in keywords)
+        return any(keyword in task_description.lower() for keyword in self.keywords)
 
     def run(self, task_description: str, context: dict) -> str:
         """Executes the TAG agent's task, simulating data retrieval and analysis."""
+        table_context = self.build_table_context(context)
+        if table_context is not None:
+            return f"TagAgent executed task: '{task_description}'.\n{table_context}"
         # In a real implementation, this would involve using self.db_connector
         # to query a database and then generating a response.
         return f"TagAgent executed task: '{task_description}' with context: {context}. Processed table data."
 
-print(f"Created {project_root}/agents/tag_agent.py")
+    def build_table_context(self, context: dict) -> Optional[str]:
+        """Runs context["operation"] over the task's table and returns a compact text result.
+
+        The table is context["dataset"] (a CSV, Parquet or Arrow file) or context["records"]
+        (rows as returned by the TAG tools). Operations: "summary" (default), "aggregate"
+        (group_by, metrics, where, limit), "filter" (where) and "clean_deduplicate"
+        (subset, output_path). Returns None when the context names no readable table.
+        """
+        source = context.get("records")
+        if source is None:
+            dataset = context.get("dataset")
+            if not dataset or not os.path.isfile(dataset):
+                return None
+            source = dataset
+        engine = self.engine
+        name = context.get("dataset", "records")
+        operation = context.get("operation", "summary")
+        where = context.get("where")
+        if operation == "aggregate":
+            missing = [key for key in ("group_by", "metrics") if not context.get(key)]
+            if missing:
+                raise ValueError(f"TAG aggregate requires {' and '.join(missing)} in the context")
+            result = engine.aggregate(source, context["group_by"], context["metrics"], where=where,
+                                      sort_by=context.get("sort_by"), limit=context.get("limit"))
+            shown = result.head(MAX_RESULT_ROWS).to_string(index=False)
+            more = f"\n... {len(result) - MAX_RESULT_ROWS} more groups" if len(result) > MAX_RESULT_ROWS else ""
+            return f"Aggregated {name} by {context['group_by']}:\n{shown}{more}"
+        if operation in ("clean_deduplicate", "deduplicate"):
+            result = engine.deduplicate(source, subset=context.get("subset"), output_path=context.get("output_path"),
+                                        where=where)
+            written = f" Deduplicated rows written to {result.output_path}." if result.output_path else ""
+            return (f"Removed {result.duplicates:,} duplicate rows from {name}: "
+                    f"{result.rows_out:,} of {result.rows_in:,} remain.{written}")
+        if operation not in ("summary", "filter"):
+            raise ValueError(f"Unknown TAG operation: {operation}")
+        return engine.summarize(source, name=name, where=where).to_prompt()
+
+    @property
+    def engine(self):
+        """Tabular engine, created on first use so pandas loads only for table work."""
+        if self._engine is None:
+            from utils.tabular_engine import TabularEngine
+            self._engine = TabularEngine()
+        return self._engine
@@ -1,8 +1,24 @@
-from typing import Any, Dict, List
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from config.config import TAG_SIMULATED_CONNECT_LATENCY, TAG_SIMULATED_LATENCY, TAG_TOOL_MAX_CONCURRENCY
+from utils.tool_cache import ToolResultCache
+from utils.tool_registry import SimulatedToolAdapter, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+# Read-only TAG tools are cached per tool; email sends always go through.
+tool_cache = ToolResultCache(
+    default_ttl=60.0,
+    ttls={"google_sheets": 60.0, "notion": 120.0, "crm": 30.0},
+    max_entries=1024,
+    uncacheable=("email",),
+)
 
 def mock_google_sheets_query(query: str) -> List[Dict[str, Any]]:
     """Mocks data retrieval from Google Sheets."""
-    print(f"Mocking Google Sheets query: {query}")
+    logger.debug("Mocking Google Sheets query: %s", query)
     # Simulate different responses based on query or just return a default
     if "sales" in query.lower():
         return [{'id': 1, 'name': 'Product A', 'sales': 100}, {'id': 2, 'name': 'Product B', 'sales': 150}]
@@ -10,34 +26,63 @@ def mock_google_sheets_query(query: str) -> List[Dict[str, Any]]:
 
 def mock_notion_query(query: str) -> List[Dict[str, Any]]:
     """Mocks data retrieval from Notion."""
-    print(f"Mocking Notion query: {query}")
+    logger.debug("Mocking Notion query: %s", query)
     if "task" in query.lower():
         return [{'task': 'Design UI', 'status': 'In Progress'}, {'task': 'Implement Backend', 'status': 'To Do'}]
     return [{'page_title': 'notion_page1', 'content': 'notion_content1'}]
 
 def mock_crm_query(query: str) -> List[Dict[str, Any]]:
     """Mocks data retrieval from a CRM system."""
-    print(f"Mocking CRM query: {query}")
+    logger.debug("Mocking CRM query: %s", query)
     if "lead" in query.lower() or "customer" in query.lower():
         return [{'contact': 'John Doe', 'company': 'ABC Corp', 'status': 'Lead'}, {'contact': 'Jane Smith', 'company': 'XYZ Inc', 'status': 'Opportunity'}]
     return [{'crm_field': 'crm_value'}]
 
 def mock_send_email(recipient: str, subject: str, body: str) -> str:
     """Mocks sending an email."""
-    print(f"Mocking email send: To={recipient}, Subject={subject}, Body snippet={body[:50]}...")
+    logger.info("Mocking email send: To=%s, Subject=%s, Body snippet=%.50s...", recipient, subject, body)
     return f"Email sent to {recipient} with subject '{subject}'"
 
-def process_tag_query(tool_name: str, query: str, **kwargs) -> Any:
-    """Dispatches queries to appropriate mock external tools based on tool_name."""
-    if tool_name.lower() == 'google_sheets':
-        return mock_google_sheets_query(query)
-    elif tool_name.lower() == 'notion':
-        return mock_notion_query(query)
-    elif tool_name.lower() == 'crm':
-        return mock_crm_query(query)
-    elif tool_name.lower() == 'email':
-        return mock_send_email(query, kwargs.get('subject', 'No Subject'), kwargs.get('body', ''))
-    else:
+def _email_handler(query: str, **kwargs) -> str:
+    return mock_send_email(query, kwargs.get('subject', 'No Subject'), kwargs.get('body', ''))
+
+def build_tool_registry(latency: float = TAG_SIMULATED_LATENCY,
+                        connect_latency: float = TAG_SIMULATED_CONNECT_LATENCY) -> ToolRegistry:
+    """Registers the mock backends as pooled, async stand-in adapters."""
+    registry = ToolRegistry()
+    adapters = [
+        ("google_sheets", lambda query, **kwargs: mock_google_sheets_query(query), "Reads rows from Google Sheets."),
+        ("notion", lambda query, **kwargs: mock_notion_query(query), "Reads pages and tasks from Notion."),
+        ("crm", lambda query, **kwargs: mock_crm_query(query), "Reads leads and customers from the CRM."),
+        ("email", _email_handler, "Sends an email; query is the recipient."),
+    ]
+    for name, handler, description in adapters:
+        adapter = SimulatedToolAdapter(name, handler, latency=latency, connect_latency=connect_latency)
+        registry.register(adapter.as_tool(description, max_concurrency=TAG_TOOL_MAX_CONCURRENCY))
+    return registry
+
+tool_registry = build_tool_registry()
+
+def process_tag_query(tool_name: str, query: str, use_cache: bool = True, **kwargs) -> Any:
+    """Dispatches queries to the registered tool adapter, serving repeat reads from tool_cache."""
+    if tool_name not in tool_registry:
+        return f"Unknown TAG tool: {tool_name}"
+    if not use_cache:
+        return tool_registry.call(tool_name, query, **kwargs)
+    return tool_cache.get_or_load(tool_name, query, kwargs, lambda: tool_registry.call(tool_name, query, **kwargs))
+
+async def aprocess_tag_query(tool_name: str, query: str, use_cache: bool = True, **kwargs) -> Any:
+    """Async counterpart of process_tag_query for use inside an event loop."""
+    if tool_name not in tool_registry:
         return f"Unknown TAG tool: {tool_name}"
+    if not use_cache:
+        return await tool_registry.acall(tool_name, query, **kwargs)
+    return await tool_cache.aget_or_load(tool_name, query, kwargs, lambda: tool_registry.acall(tool_name, query, **kwargs))
+
+async def afan_out_tag_queries(queries: List[Tuple[str, str]], **kwargs) -> List[Any]:
+    """Runs several (tool_name, query) lookups concurrently, returning results in order."""
+    return list(await asyncio.gather(*(aprocess_tag_query(tool_name, query, **kwargs) for tool_name, query in queries)))
 
-print(f"Created {project_root}/utils/tag_utils.py")
+def invalidate_tag_cache(tool_name: str = None, query: str = None, **kwargs) -> int:
+    """Drops cached TAG results for one query, one tool, or all tools."""
+    return tool_cache.invalidate(tool_name, query, **kwargs)
@@ -0,0 +1,55 @@
+import sys
+import textwrap
+
+import pytest
+
+from workflows.agent_registry import AgentSpec, LazyAgent
+
+_AGENT_SOURCE = '''
+from agents.base_agent import BaseAgent
+
+
+class LedgerAgent(BaseAgent):
+    keywords = ["ledger", "invoice"]
+    cacheable: bool = False
+
+    def __init__(self, name, description, prefix="ledger"):
+        super().__init__(name, description)
+        self.prefix = prefix
+
+    def can_handle_task(self, task_description):
+        return "ledger" in task_description
+
+    def run(self, task_description, context):
+        return f"{self.prefix}: {task_description}"
+'''
+
+
+@pytest.fixture
+def agent_module(tmp_path, monkeypatch):
+    (tmp_path / "lazy_ledger_agent.py").write_text(textwrap.dedent(_AGENT_SOURCE), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_ledger_agent"
+    sys.modules.pop("lazy_ledger_agent", None)
+
+
+def test_lazy_agent_reads_routing_attributes_without_importing(agent_module):
+    agent = LazyAgent(AgentSpec("LedgerAgent", f"{agent_module}:LedgerAgent", "Books invoices",
+                                kwargs={"prefix": "booked"}))
+
+    assert agent.keywords == ["ledger", "invoice"]
+    assert agent.cacheable is False and agent.consumes_upstream is False
+    assert agent.can_handle_task("Post the INVOICE")
+    assert agent_module not in sys.modules and not agent.loaded
+
+    assert agent.run("post invoice", {}) == "booked: post invoice"
+    assert agent_module in sys.modules and agent.prefix == "booked"
+
+
+def test_declared_spec_attributes_override_the_source(agent_module):
+    agent = LazyAgent(AgentSpec("LedgerAgent", f"{agent_module}:LedgerAgent", "", keywords=["books"],
+                                cacheable=True, consumes_upstream=True))
+
+    assert (agent.keywords, agent.cacheable, agent.consumes_upstream) == (["books"], True, True)
+    with pytest.raises(ValueError, match="not found"):
+        LazyAgent(AgentSpec("Missing", f"{agent_module}:MissingAgent", ""))
@@ -0,0 +1,53 @@
+import io
+import json
+
+from agents.base_agent import BaseAgent
+from workflows.batch_runner import iter_tasks, run_batch
+from workflows.orchestrator import Orchestrator
+
+
+class _EchoAgent(BaseAgent):
+    keywords = ["report"]
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return "report" in task_description
+
+    def run(self, task_description: str, context: dict) -> str:
+        return f"echo: {task_description}"
+
+
+def build_echo_orchestrator() -> Orchestrator:
+    return Orchestrator([_EchoAgent("echo", "")])
+
+
+def test_backlog_records_map_title_and_body_to_the_task():
+    record = {"request_id": "user-001", "title": "Faster routing", "body": "Compile the keyword index."}
+
+    tasks = list(iter_tasks(io.StringIO(json.dumps(record) + "\n")))
+
+    assert tasks == [{"id": "user-001", "task": "Faster routing\n\nCompile the keyword index.", "context": {}}]
+
+
+def test_custom_task_fields():
+    stream = io.StringIO('{"id": 1, "prompt": "weekly report"}\n{"id": 2, "task": "ignored"}\n')
+
+    records = list(iter_tasks(stream, task_fields=["prompt"]))
+
+    assert records[0]["task"] == "weekly report"
+    assert records[1]["error"].startswith("Missing task field")
+
+
+def test_bad_lines_become_error_records_and_the_batch_continues():
+    lines = ['{"task": "sales report"}', "not json", '{"id": 7}', "[1, 2]", '{"task": "hr report"}']
+    output = io.StringIO()
+
+    summary = run_batch(iter_tasks(io.StringIO("\n".join(lines))), output,
+                        factory_path="test_batch_runner:build_echo_orchestrator", workers=2)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    errors = sorted((result["line"], result["error"].split(":")[0]) for result in results if "line" in result)
+    assert errors == [(2, "Invalid JSON"), (3, "Missing task field (expected one of"),
+                      (4, "Task record must be a JSON object")]
+    assert sorted(result["result"] for result in results if "result" in result) == [
+        "echo: hr report", "echo: sales report"]
+    assert (summary["tasks"], summary["failures"], summary["invalid"]) == (5, 3, 3)
@@ -0,0 +1,31 @@
+from benchmarks import compare, flatten
+
+
+def _report(results):
+    return {"meta": {}, "results": results}
+
+
+def test_flatten_keeps_numeric_leaves_under_dotted_names():
+    results = {"routing": {"agents_8": {"p50_ms": 1, "throughput_per_s": 2.5, "label": "x", "warm": True}}}
+
+    assert flatten(results) == {"routing.agents_8.p50_ms": 1.0, "routing.agents_8.throughput_per_s": 2.5}
+
+
+def test_compare_flags_regressions_in_each_metric_direction():
+    baseline = _report({"bench": {"p50_ms": 10.0, "elapsed_s": 2.0, "throughput_per_s": 100.0, "chunks": 50}})
+    current = _report({"bench": {"p50_ms": 12.0, "elapsed_s": 1.0, "throughput_per_s": 70.0, "chunks": 10}})
+
+    regressions = compare(baseline, current, threshold=0.10)
+
+    # Slower latency and lower throughput regress; a faster run and untimed counts do not
+    assert [(r["metric"], round(r["worse_by"], 2)) for r in regressions] == [
+        ("bench.throughput_per_s", 0.3), ("bench.p50_ms", 0.2),
+    ]
+
+
+def test_compare_respects_the_threshold_and_skips_metrics_missing_from_either_side():
+    baseline = _report({"bench": {"p50_ms": 10.0, "p95_ms": 20.0}})
+    current = _report({"bench": {"p50_ms": 11.0, "p99_ms": 500.0}, "new_bench": {"p50_ms": 900.0}})
+
+    assert compare(baseline, current, threshold=0.15) == []
+    assert [r["metric"] for r in compare(baseline, current, threshold=0.05)] == ["bench.p50_ms"]
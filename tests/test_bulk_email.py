@@ -0,0 +1,126 @@
+import smtplib
+import threading
+
+from agents.email_agent import EmailAgent
+from utils.bulk_email import BulkEmailSender, EmailTemplate, TokenBucket
+
+
+class _FakeSMTP:
+    """In-memory smtplib.SMTP stand-in shared by every connection a test opens."""
+
+    def __init__(self, server: "_FakeServer"):
+        self.server = server
+        self.sent_here = 0
+
+    def send_message(self, message, from_addr=None, to_addrs=None):
+        with self.server.lock:
+            if self.server.drop_after is not None and self.sent_here >= self.server.drop_after:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            refused = {address: (550, b"No such user") for address in to_addrs if address in self.server.refused}
+            self.sent_here += 1
+            if not refused:
+                self.server.messages.append(message)
+        return refused
+
+    def quit(self):
+        self.server.closed += 1
+
+
+class _FakeServer:
+    def __init__(self, drop_after=None, refused=(), connect_error=None):
+        self.drop_after = drop_after
+        self.refused = set(refused)
+        self.connect_error = connect_error
+        self.messages = []
+        self.connections = 0
+        self.closed = 0
+        self.lock = threading.Lock()
+
+    def connect(self) -> _FakeSMTP:
+        with self.lock:
+            self.connections += 1
+        if self.connect_error is not None:
+            raise self.connect_error
+        return _FakeSMTP(self)
+
+
+def _recipients(count):
+    return [{"email": f"user{index}@example.com", "name": f"User {index % 3}"} for index in range(count)]
+
+
+def test_sends_personalized_messages_over_reused_connections():
+    server = _FakeServer()
+    sender = BulkEmailSender(server.connect, rate_limit=10_000, connections=2, messages_per_connection=10)
+
+    report = sender.send(_recipients(30), EmailTemplate("Hi {name}", "Report for {name} ({team})"),
+                         common={"team": "sales"})
+
+    assert report.sent == 30 and not report.failed
+    assert report.renders == 3  # one rendering per distinct name
+    assert server.connections == report.connections == 4  # 15 messages per worker, recycled after 10
+    assert server.closed == server.connections
+    assert sorted(message["To"] for message in server.messages) == sorted(r["email"] for r in _recipients(30))
+    assert {message["Subject"] for message in server.messages} == {"Hi User 0", "Hi User 1", "Hi User 2"}
+
+
+def test_reports_each_recipient_outcome_without_aborting():
+    server = _FakeServer(refused={"user1@example.com"})
+    sender = BulkEmailSender(server.connect, rate_limit=10_000, connections=1)
+    recipients = _recipients(3) + [{"name": "no address"}, "user0@example.com", 42, {"email": "x@example.com"}]
+
+    report = sender.send(recipients, EmailTemplate("Hi {name}", "Body"))
+
+    statuses = [(result.recipient, result.status) for result in report.results]
+    assert statuses == [
+        ("user0@example.com", "sent"),
+        ("user1@example.com", "failed"),
+        ("user2@example.com", "sent"),
+        ("", "failed"),
+        ("user0@example.com", "duplicate"),
+        ("42", "failed"),
+        ("x@example.com", "failed"),  # template needs {name}
+    ]
+    assert report.results[1].error.startswith("550")
+    assert "Template error" in report.results[6].error
+
+
+def test_reconnects_and_retries_once_when_the_server_drops_the_session():
+    server = _FakeServer(drop_after=2)
+    sender = BulkEmailSender(server.connect, rate_limit=10_000, connections=1, messages_per_connection=100)
+
+    report = sender.send(_recipients(5), EmailTemplate("Hi", "Body"))
+
+    assert report.sent == 5
+    assert server.connections == 3
+
+
+def test_fails_fast_once_the_server_is_unreachable():
+    server = _FakeServer(connect_error=ConnectionRefusedError("refused"))
+    sender = BulkEmailSender(server.connect, rate_limit=10_000, connections=1)
+
+    report = sender.send(_recipients(20), EmailTemplate("Hi", "Body"))
+
+    assert len(report.failed) == 20
+    assert server.connections == 1
+
+
+def test_token_bucket_paces_sends_to_the_rate_limit(clock):
+    server = _FakeServer()
+    sender = BulkEmailSender(server.connect, rate_limit=10, burst=5, connections=1)
+    sender.rate_limiter = TokenBucket(10, 5, clock=clock.time, sleep=clock.sleep)
+
+    report = sender.send(_recipients(25), EmailTemplate("Hi", "Body"))
+
+    assert report.sent == 25
+    # The first 5 go out as a burst, the remaining 20 at 10 per second
+    assert abs(clock.slept - 2.0) < 1e-6
+
+
+def test_email_agent_sends_bulk_through_an_injected_sender():
+    server = _FakeServer()
+    agent = EmailAgent("Email", "", email_client=BulkEmailSender(server.connect, rate_limit=10_000))
+
+    output = agent.run("Send the {weekly} update", {"recipients": ["a@example.com", "b@example.com"]})
+
+    assert "Sent 2/2 emails" in output
+    assert server.messages[0]["Subject"] == "Send the {weekly} update"
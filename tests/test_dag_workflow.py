@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from workflows.dag_workflow import DagWorkflow, WorkflowStep, plan_workflow
+from workflows.orchestrator import Orchestrator
+
+
+class _SleepingAgent(BaseAgent):
+    def __init__(self, name: str, delay: float = 0.0, consumes_upstream: bool = False):
+        super().__init__(name, "")
+        self.delay = delay
+        self.consumes_upstream = consumes_upstream
+        self.contexts = []
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return self.name in task_description
+
+    def run(self, task_description: str, context: dict) -> str:
+        raise AssertionError("DAG steps should use arun")
+
+    async def arun(self, task_description: str, context: dict) -> str:
+        self.contexts.append(context)
+        await asyncio.sleep(self.delay)
+        return f"{self.name} done"
+
+
+def _ranker(agents):
+    def rank_agents(text):
+        return [(agent, 1) for agent in agents if agent.can_handle_task(text)]
+    return rank_agents
+
+
+def test_independent_steps_run_concurrently_and_feed_their_dependents():
+    sales, hr, email = _SleepingAgent("sales", 0.2), _SleepingAgent("hr", 0.2), _SleepingAgent("email")
+    workflow = DagWorkflow([
+        WorkflowStep("forecast", sales, "sales forecast"),
+        WorkflowStep("headcount", hr, "hr headcount"),
+        WorkflowStep("report", email, "email the report", depends_on=["forecast", "headcount"]),
+    ])
+
+    run = workflow.run({"user": "ana"})
+
+    assert run.total_duration < 0.35  # both 0.2s branches overlap
+    assert workflow.sinks() == ["report"]
+    assert run.output == "email done"
+    assert email.contexts == [{"user": "ana", "upstream_results": {"forecast": "sales done", "headcount": "hr done"}}]
+    assert run.steps["report"].started_at >= run.steps["forecast"].started_at + run.steps["forecast"].duration
+
+
+def test_invalid_graphs_are_rejected():
+    agent = _SleepingAgent("sales")
+    with pytest.raises(ValueError, match="unknown step"):
+        DagWorkflow([WorkflowStep("a", agent, "x", depends_on=["missing"])])
+    with pytest.raises(ValueError, match="Duplicate"):
+        DagWorkflow([WorkflowStep("a", agent, "x"), WorkflowStep("a", agent, "y")])
+    with pytest.raises(ValueError, match="cycle"):
+        DagWorkflow([WorkflowStep("a", agent, "x", depends_on=["b"]), WorkflowStep("b", agent, "y", depends_on=["a"])])
+
+
+def test_plan_workflow_splits_clauses_into_parallel_and_sequential_steps():
+    sales, hr = _SleepingAgent("sales"), _SleepingAgent("hr")
+    email = _SleepingAgent("email", consumes_upstream=True)
+    rank_agents = _ranker([sales, hr, email])
+
+    parallel = plan_workflow("summarize sales and count hr hires and email it", rank_agents)
+    assert [(step.agent.name, step.depends_on) for step in parallel.steps.values()] == [
+        ("sales", []), ("hr", []), ("email", ["step_1", "step_2"]),
+    ]
+
+    sequential = plan_workflow("summarize sales then review hr", rank_agents)
+    assert [step.depends_on for step in sequential.steps.values()] == [[], ["step_1"]]
+
+    with pytest.raises(ValueError):
+        plan_workflow("nothing routable here", rank_agents)
+
+
+def test_sync_wrappers_refuse_to_run_inside_an_event_loop():
+    workflow = DagWorkflow([WorkflowStep("a", _SleepingAgent("sales"), "sales")])
+    orchestrator = Orchestrator([_SleepingAgent("sales")])
+
+    async def call_sync_wrappers():
+        with pytest.raises(RuntimeError, match="DagWorkflow.arun"):
+            workflow.run()
+        with pytest.raises(RuntimeError, match="arun_dag_workflow"):
+            orchestrator.run_dag_workflow("sales", workflow=workflow)
+
+    asyncio.run(call_sync_wrappers())
+    assert workflow.run().output == "sales done"
@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+from utils.embeddings import CachedEmbeddings, EmbeddingCache, HashingEmbedder
+
+
+class _CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(n_features=64)
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def test_hashing_embedder_returns_unit_vectors():
+    vectors = HashingEmbedder(n_features=64).fit(["a b", "b c"]).embed_documents(["a b c", ""])
+
+    assert vectors.shape == (2, 64)
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[1].any()
+
+
+def test_cached_embeddings_only_embed_misses_once(tmp_path):
+    embedder = _CountingEmbedder()
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    cached = CachedEmbeddings(embedder, cache, batch_size=2)
+
+    first = cached.embed_documents(["alpha", "beta", "alpha", "gamma"])
+    assert embedder.embedded == ["alpha", "beta", "gamma"]
+    assert np.array_equal(first[0], first[2])
+
+    second = cached.embed_documents(["gamma", "beta", "delta"])
+    assert embedder.embedded == ["alpha", "beta", "gamma", "delta"]
+    assert np.allclose(second[0], first[3])
+    cache.close()
+
+    # Entries persist across connections
+    reopened = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    assert len(reopened) == 4
+    reopened.close()
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_entries=2)
+    vector = np.ones(4, dtype=np.float32)
+    for key in (b"old", b"new", b"newest"):
+        cache.put_many({key: vector})
+        time.sleep(0.01)  # distinct last_used timestamps
+
+    assert len(cache) == 2
+    assert set(cache.get_many([b"old", b"new", b"newest"])) == {b"new", b"newest"}
+    cache.close()
+
+
+def test_lookups_buffer_last_used_touches_until_the_next_write(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_entries=2)
+    vector = np.ones(4, dtype=np.float32)
+    for key in (b"old", b"new"):
+        cache.put_many({key: vector})
+        time.sleep(0.01)
+
+    changes = cache._connection.total_changes
+    assert set(cache.get_many([b"old"])) == {b"old"}
+    assert cache._connection.total_changes == changes  # a hit does not write
+
+    time.sleep(0.01)
+    cache.put_many({b"newest": vector})  # flushes the touch before evicting
+    assert set(cache.get_many([b"old", b"new", b"newest"])) == {b"old", b"newest"}
+    cache.close()
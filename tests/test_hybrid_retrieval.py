@@ -0,0 +1,117 @@
+import math
+import random
+from collections import Counter
+
+import numpy as np
+
+from utils.hybrid_retrieval import BM25Index, HybridRetriever, reciprocal_rank_fusion, tokenize, top_k
+
+DOCUMENTS = [
+    "invoices are paid within thirty days of receipt",
+    "employees accrue two vacation days per month",
+    "sales leads are qualified by the regional sales team",
+    "the regional team reviews invoices every month",
+    "",
+]
+
+
+def _naive_bm25(documents, query, k1=1.5, b=0.75):
+    tokenized = [tokenize(text) for text in documents]
+    average_length = sum(len(tokens) for tokens in tokenized) / len(tokenized)
+    scores = []
+    for tokens in tokenized:
+        counts = Counter(tokens)
+        score = 0.0
+        for term, query_count in Counter(tokenize(query)).items():
+            document_frequency = sum(term in other for other in tokenized)
+            if not counts[term]:
+                continue
+            idf = math.log1p((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = k1 * (1 - b + b * len(tokens) / average_length)
+            score += query_count * idf * counts[term] * (k1 + 1) / (counts[term] + norm)
+        scores.append(score)
+    return scores
+
+
+def test_bm25_scores_match_a_naive_implementation():
+    queries = ["regional sales", "invoices month month", "unknown words", "days"]
+    index = BM25Index.build(DOCUMENTS, range(len(DOCUMENTS)))
+
+    scores = index.score_batch(queries)
+    for row, query in enumerate(queries):
+        assert np.allclose(scores[row], _naive_bm25(DOCUMENTS, query), rtol=1e-5)
+
+    top_scores, ids = index.search_ids(["regional sales"], k=6)
+    assert ids[0].tolist()[:2] == [2, 3] and ids[0, -1] == -1 and top_scores.shape == (1, 6)
+
+
+def test_extend_matches_a_full_rebuild():
+    index = BM25Index.build(DOCUMENTS[:3], [10, 11, 12])
+    keep = np.array([True, False, True])
+    extended = index.extend(DOCUMENTS[3:], [13, 14], keep=keep)
+    rebuilt = BM25Index.build([DOCUMENTS[0], DOCUMENTS[2], DOCUMENTS[3], DOCUMENTS[4]], [10, 12, 13, 14])
+
+    queries = ["regional team", "vacation days", "invoices"]
+    assert extended.ids.tolist() == [10, 12, 13, 14]
+    assert np.allclose(extended.score_batch(queries), rebuilt.score_batch(queries))
+
+
+def test_top_k_returns_the_best_columns_in_order():
+    rng = np.random.default_rng(3)
+    scores = rng.random((20, 50)).astype(np.float32)
+    for k in (1, 7, 50, 80):
+        expected = np.argsort(-scores, axis=1, kind="stable")[:, :min(k, 50)]
+        assert np.array_equal(top_k(scores, k), expected)
+    assert top_k(scores, 0).shape == (20, 0)
+
+
+def test_reciprocal_rank_fusion_orders_by_summed_reciprocal_ranks():
+    dense = np.array([[1, 2, 3, -1]])
+    sparse = np.array([[3, 1, -1, -1]])
+
+    [(ids, scores)] = reciprocal_rank_fusion([dense, sparse], k=3, rrf_k=0)
+
+    # 1: 1/1 + 1/2, 3: 1/3 + 1/1, 2: 1/2
+    assert ids.tolist() == [1, 3, 2]
+    assert np.allclose(scores, [1.5, 4 / 3, 0.5])
+
+
+class _FakeVectorIndex:
+    def __init__(self, texts):
+        self.texts = dict(enumerate(texts))
+        self.version = 0
+        self.decoded = []
+
+    def ids(self):
+        return list(self.texts)
+
+    def get_text(self, chunk_id):
+        self.decoded.append(chunk_id)
+        return self.texts[chunk_id]
+
+    def add(self, chunk_id, text):
+        self.texts[chunk_id] = text
+        self.version += 1
+
+    def remove(self, chunk_id):
+        del self.texts[chunk_id]
+        self.version += 1
+
+
+def test_refresh_only_decodes_chunks_added_since_the_last_refresh():
+    vector_index = _FakeVectorIndex(DOCUMENTS[:3])
+    retriever = HybridRetriever(vector_index)
+    retriever.refresh()
+    assert sorted(vector_index.decoded) == [0, 1, 2]
+
+    vector_index.decoded.clear()
+    vector_index.add(7, DOCUMENTS[3])
+    vector_index.remove(1)
+    retriever.refresh()
+    assert vector_index.decoded == [7]
+    assert sorted(retriever.bm25.ids.tolist()) == [0, 2, 7]
+
+    rng = random.Random(5)
+    queries = [" ".join(rng.choice(tokenize(" ".join(DOCUMENTS))) for _ in range(3)) for _ in range(10)]
+    rebuilt = BM25Index.build([vector_index.texts[i] for i in retriever.bm25.ids.tolist()], retriever.bm25.ids)
+    assert np.allclose(retriever.bm25.score_batch(queries), rebuilt.score_batch(queries))
@@ -0,0 +1,23 @@
+from utils.import_report import parse_importtime, summarize
+
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        45 |         45 |     marshal
+import time:       800 |       1300 |   json.decoder
+import time:      2100 |       3520 | json
+some unrelated warning line
+import time:       300 |        300 | workflows.default_orchestrator
+"""
+
+
+def test_importtime_output_is_parsed_and_summarized():
+    timings = parse_importtime(IMPORTTIME_SAMPLE)
+
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ("_io", 120, 120, 1), ("marshal", 45, 45, 2), ("json.decoder", 800, 1300, 1),
+        ("json", 2100, 3520, 0), ("workflows.default_orchestrator", 300, 300, 0),
+    ]
+    report = summarize("json", timings, top=2)
+    assert report["total_ms"] == 3.52 and report["modules_imported"] == 5
+    assert [timing["module"] for timing in report["slowest"]] == ["json", "json.decoder"]
@@ -0,0 +1,81 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.embeddings import HashingEmbedder
+from utils.ingestion import bounded_map, chunk_segment, ingest_files, iter_text_file
+from utils.vector_index import VectorIndex
+
+
+def test_text_file_segments_end_on_breaks_and_carry_their_offsets(tmp_path):
+    text = "".join(f"paragraph {index} " + "x" * 20 + "\n\n" for index in range(10))
+    path = tmp_path / "doc.txt"
+    path.write_text(text, encoding="utf-8")
+
+    segments = list(iter_text_file(str(path), segment_size=64))
+
+    assert "".join(segment for segment, _ in segments) == text
+    assert len(segments) > 1 and all(segment.endswith("\n") for segment, _ in segments)
+    for segment, metadata in segments:
+        assert metadata["source"] == str(path)
+        assert text[metadata["start_index"]:metadata["start_index"] + len(segment)] == segment
+
+
+def test_chunk_offsets_are_relative_to_the_whole_file():
+    segment = "zero " * 40 + "\n\n" + "one two three four five six seven eight nine ten " * 5
+    base = 1000
+
+    chunks = chunk_segment((segment, {"source": "doc", "start_index": base}), chunk_size=60, chunk_overlap=10)
+
+    assert len(chunks) > 1
+    for text, metadata in chunks:
+        assert metadata["source"] == "doc"
+        offset = metadata["start_index"] - base
+        assert segment[offset:offset + len(text)] == text
+
+
+def test_bounded_map_preserves_order_and_bounds_outstanding_work():
+    pulled = []
+
+    def items():
+        for index in range(20):
+            pulled.append(index)
+            yield index
+
+    def slow_square(value):
+        time.sleep(random.random() / 200)
+        return value * value
+
+    results = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for result in bounded_map(executor, slow_square, items(), max_in_flight=3):
+            results.append(result)
+            assert len(pulled) - len(results) <= 3
+
+    assert results == [value * value for value in range(20)]
+
+
+class _SaveCountingIndex(VectorIndex):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saves = []
+
+    def save(self):
+        self.saves.append(len(self))
+        super().save()
+
+
+def test_ingest_files_saves_every_n_batches_and_at_the_end(tmp_path):
+    source = tmp_path / "docs"
+    source.mkdir()
+    for index in range(5):
+        (source / f"doc{index}.txt").write_text(f"document number {index} about topic {index}", encoding="utf-8")
+    index = _SaveCountingIndex(str(tmp_path / "index"), HashingEmbedder(n_features=128))
+
+    stats = ingest_files([str(source)], index, chunk_size=200, chunk_overlap=0, batch_size=2, save_every=2)
+
+    assert (stats.segments, stats.chunks, stats.embedded) == (5, 5, 5)
+    # Batches of 2, 2 and 1 chunks: saved after the second batch and once at the end
+    assert index.saves == [4, 5]
+    reloaded = VectorIndex(str(tmp_path / "index"), HashingEmbedder(n_features=128))
+    assert len(reloaded) == 5
@@ -0,0 +1,103 @@
+import atexit
+import json
+import logging
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from utils import log_config
+from utils.metrics import MetricsRegistry, metrics
+from workflows.orchestrator import Orchestrator
+
+
+def test_prometheus_export_renders_counters_and_cumulative_histograms():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.increment("workflows_total", agent="sales", status="completed")
+    registry.increment("workflows_total", 2, agent='say "hi"\\', status="failed")
+    for value in (0.05, 0.5, 5.0):
+        registry.observe("workflow_stage_seconds", value, stage="routing")
+
+    assert registry.to_prometheus().splitlines() == [
+        "# TYPE workflows_total counter",
+        'workflows_total{agent="sales",status="completed"} 1',
+        'workflows_total{agent="say \\"hi\\"\\\\",status="failed"} 2',
+        "# TYPE workflow_stage_seconds histogram",
+        'workflow_stage_seconds_bucket{stage="routing",le="0.1"} 1',
+        'workflow_stage_seconds_bucket{stage="routing",le="1"} 2',
+        'workflow_stage_seconds_bucket{stage="routing",le="+Inf"} 3',
+        'workflow_stage_seconds_sum{stage="routing"} 5.55',
+        'workflow_stage_seconds_count{stage="routing"} 3',
+    ]
+
+
+def test_json_export_reports_counts_quantiles_and_buckets():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    with pytest.raises(RuntimeError):
+        with registry.timed("agent_run", "hr"):
+            raise RuntimeError("boom")
+
+    data = json.loads(registry.to_json())
+    assert data["counters"] == [
+        {"name": "workflow_stage_total", "labels": {"name": "hr", "stage": "agent_run", "status": "error"}, "value": 1.0},
+    ]
+    [histogram] = data["histograms"]
+    assert histogram["labels"] == {"name": "hr", "stage": "agent_run"}
+    assert histogram["count"] == 1 and histogram["p50"] == 0.1
+    assert histogram["buckets"] == {"0.1": 1, "1.0": 0, "+Inf": 0}
+
+
+def test_profiled_blocks_keep_a_report_only_when_enabled():
+    registry = MetricsRegistry(max_profiles=1)
+    with registry.profiled("off", enabled=False):
+        sum(range(10))
+    with registry.profiled("on"):
+        sum(range(10))
+
+    assert [profile["label"] for profile in registry.profiles] == ["on"]
+    assert "function calls" in registry.profiles[0]["report"]
+
+
+class _FailingAgent(BaseAgent):
+    keywords = ["payroll"]
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return True
+
+    def run(self, task_description: str, context: dict) -> str:
+        raise ValueError("no payroll data")
+
+
+def test_failed_workflows_are_attributed_to_the_selected_agent():
+    metrics.reset()
+    orchestrator = Orchestrator([_FailingAgent("HRAgent", "")])
+
+    assert orchestrator.run_workflow("run payroll") == "Error: no payroll data"
+    assert orchestrator.run_workflow("unroutable") == "Error: No suitable agent found for task: unroutable"
+
+    counters = {tuple(sorted(counter["labels"].items())): counter["value"]
+                for counter in json.loads(metrics.to_json())["counters"] if counter["name"] == "workflows_total"}
+    assert counters == {(("agent", "HRAgent"), ("status", "failed")): 1.0, (("agent", ""), ("status", "failed")): 1.0}
+    metrics.reset()
+
+
+def test_buffered_logging_writes_through_the_background_listener(monkeypatch):
+    records = []
+
+    class _ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(self.format(record))
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    monkeypatch.setattr(log_config, "_listener", None)
+    try:
+        log_config.setup_buffered_logging(level=logging.INFO, handler=_ListHandler(), fmt="%(levelname)s %(message)s")
+        listener = log_config._listener
+        logging.getLogger("test").info("queued %s", "message")
+        listener.stop()
+        atexit.unregister(listener.stop)
+    finally:
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+    assert records == ["INFO queued message"]
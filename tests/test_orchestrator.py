@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from agents.base_agent import BaseAgent
+from utils.metrics import metrics
+from utils.realtime_utils import async_run_task
+from workflows.orchestrator import Orchestrator
+
+
+class _AsyncAgent(BaseAgent):
+    keywords = ["forecast", "broken"]
+
+    def __init__(self, name: str):
+        super().__init__(name, "")
+        self.in_flight = 0
+        self.peak = 0
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return True
+
+    def run(self, task_description: str, context: dict) -> str:
+        raise AssertionError("arun_workflow should await the agent's own arun")
+
+    async def arun(self, task_description: str, context: dict) -> str:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        if "broken" in task_description:
+            raise ValueError("forecast data missing")
+        return f"{self.name}: {task_description}"
+
+
+def test_arun_workflow_runs_concurrently_on_the_agents_arun():
+    agent = _AsyncAgent("sales")
+    orchestrator = Orchestrator([agent])
+
+    async def run_both():
+        return await asyncio.gather(
+            orchestrator.arun_workflow("forecast q1", {"session_id": "a"}),
+            orchestrator.arun_workflow("forecast q2", {"session_id": "b"}),
+        )
+
+    assert asyncio.run(run_both()) == ["sales: forecast q1", "sales: forecast q2"]
+    assert agent.peak == 2
+    assert [entry.content for entry in orchestrator.history.last(2, "a")] == ["forecast q1", "sales: forecast q1"]
+
+
+def test_arun_workflow_reports_errors_like_run_workflow():
+    orchestrator = Orchestrator([_AsyncAgent("sales")])
+
+    assert asyncio.run(orchestrator.arun_workflow("broken forecast")) == "Error: forecast data missing"
+    assert asyncio.run(orchestrator.arun_workflow("nothing")) == orchestrator.run_workflow("nothing")
+    assert orchestrator.history.last(1)[0].role == "error"
+
+
+def test_async_run_task_runs_sync_work_off_the_loop_thread():
+    loop_thread = []
+
+    async def main():
+        loop_thread.append(threading.get_ident())
+        return await async_run_task(lambda a, b=0: (threading.get_ident(), a + b), 1, b=2)
+
+    worker_thread, total = asyncio.run(main())
+    assert total == 3 and worker_thread != loop_thread[0]
+
+
+def test_profiled_arun_workflow_still_uses_the_agents_arun():
+    metrics.reset()
+    orchestrator = Orchestrator([_AsyncAgent("sales")])
+
+    assert asyncio.run(orchestrator.arun_workflow("forecast q3", {"profile": True})) == "sales: forecast q3"
+    assert [profile["label"] for profile in metrics.profiles] == ["sales: forecast q3"]
+    metrics.reset()
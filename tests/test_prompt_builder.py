@@ -0,0 +1,120 @@
+import logging
+
+import pytest
+
+from agents.rag_agent import RagAgent
+from agents.sales_agent import SalesAgent
+from utils.embeddings import HashingEmbedder
+
+from utils.prompt_builder import (
+    ContextItem, PromptBuilder, PromptTemplate, build_general_prompt, build_rag_prompt, dedupe_overlaps,
+)
+from utils.vector_index import VectorIndex
+from workflows.orchestrator import Orchestrator
+from workflows.workflow_history import HistoryEntry
+
+
+def _count_words(text: str) -> int:
+    return len(text.split())
+
+
+def test_template_renders_like_str_format_and_reports_missing_fields():
+    template = PromptTemplate("Q: {question!r} ({score:.1f})")
+
+    assert template.fields == ("question", "score")
+    assert template.render({"question": "why", "score": 0.25}) == "Q: {!r} ({:.1f})".format("why", 0.25)
+    with pytest.raises(KeyError):
+        template.render({"question": "why"})
+    with pytest.raises(ValueError):
+        PromptTemplate("{items[0]}")
+
+
+def test_builder_packs_highest_scores_first_within_budget_in_position_order():
+    builder = PromptBuilder("{task}\n{notes}", budget=6, counter=_count_words)
+    items = [
+        ContextItem("one two three", score=0.1, position=0),
+        ContextItem("four five", score=0.9, position=1),
+        ContextItem("six seven eight nine", score=0.5, position=2),
+        ContextItem("ten", score=0.2, position=3),
+    ]
+
+    prompt = builder.build({"task": "plan"}, {"notes": items})
+
+    # 1 fixed token, then "four five" and "ten" fit; the longer items are skipped
+    assert prompt.text == "plan\nfour five\nten"
+    assert prompt.tokens <= prompt.budget
+    assert prompt.included == {"notes": 2} and prompt.candidates == {"notes": 4}
+    assert prompt.tokens_saved == prompt.unpacked_tokens - prompt.tokens > 0
+
+
+def test_dedupe_overlaps_trims_split_overlap_and_contained_chunks():
+    shared = "the shared sentence repeated by the chunk splitter"
+    first = "alpha section. " + shared
+    second = shared + " beta section."
+
+    assert dedupe_overlaps([first, second, shared]) == [first, "beta section.", ""]
+    assert dedupe_overlaps(["short", "short"]) == ["short", "short"]  # below min_overlap
+
+
+def test_rag_prompt_keeps_the_best_chunks_that_fit():
+    chunks = [f"chunk {rank} " + "word " * 20 for rank in range(5)]
+
+    prompt = build_rag_prompt("what changed?", chunks, budget=80, counter=_count_words)
+
+    assert prompt.tokens <= 80
+    assert "chunk 0" in prompt.text and "chunk 4" not in prompt.text
+    assert 0 < prompt.included["context"] < 5
+
+
+def test_general_prompt_prefers_relevant_and_recent_turns():
+    turns = [
+        HistoryEntry("user", "what is the vacation policy", timestamp=0),
+        HistoryEntry("agent", "lunch is served at noon", name="hr", timestamp=1),
+        HistoryEntry("agent", "weather looks sunny today", name="hr", timestamp=2),
+        HistoryEntry("user", "thanks", timestamp=3),
+    ]
+    fixed = build_general_prompt("vacation policy details", [], budget=1000, counter=_count_words).tokens
+
+    prompt = build_general_prompt("vacation policy details", turns, budget=fixed + 12, counter=_count_words)
+
+    assert "user: what is the vacation policy" in prompt.text
+    assert "user: thanks" in prompt.text
+    assert "lunch" not in prompt.text
+    assert prompt.text.index("vacation policy") < prompt.text.index("thanks")
+
+
+def test_fixed_text_over_budget_is_flagged(caplog):
+    builder = PromptBuilder("{task}\n{notes}", budget=2, counter=_count_words)
+
+    with caplog.at_level(logging.WARNING, logger="utils.prompt_builder"):
+        prompt = builder.build({"task": "a long task text"}, {"notes": [ContextItem("note", 1.0)]})
+
+    assert prompt.over_budget and prompt.included == {"notes": 0}
+    assert "over the 2-token budget" in caplog.text
+
+
+def test_history_agents_receive_earlier_turns_packed_into_the_general_prompt():
+    sent = []
+    sales = SalesAgent("Sales Agent", "", llm=lambda text: sent.append(text) or "drafted")
+    orchestrator = Orchestrator([sales])
+    orchestrator.history.append("user", "the customer asked about volume discounts", session_id="s1")
+    orchestrator.history.append("user", "unrelated turn from another session", session_id="s2")
+
+    assert orchestrator.run_workflow("draft the follow-up proposal", {"session_id": "s1"}) == "drafted"
+    assert "user: the customer asked about volume discounts" in sent[0]
+    assert "another session" not in sent[0]
+    # The task is rendered once, in its own slot, not repeated as a history turn
+    assert sent[0].count("draft the follow-up proposal") == 1
+
+    plain = Orchestrator([SalesAgent("Sales Agent", "")]).run_workflow("sales follow-up", {"region": "eu"})
+    assert "with context: {'region': 'eu'}" in plain and "0 of 0 earlier turns" in plain
+
+
+def test_rag_agent_sends_the_packed_prompt_to_its_llm(tmp_path):
+    index = VectorIndex(str(tmp_path), HashingEmbedder(n_features=256))
+    index.add_texts(["refunds are issued within 14 days", "offices close at six"])
+    prompts = []
+    agent = RagAgent("RAG Agent", "", vector_store=index, llm=lambda text: prompts.append(text) or "14 days")
+
+    assert agent.run("lookup when refunds are issued", {"k": 1}) == "14 days"
+    assert "refunds are issued within 14 days" in prompts[0] and "lookup when refunds are issued" in prompts[0]
@@ -0,0 +1,105 @@
+import pytest
+
+from agents.base_agent import BaseAgent
+from utils.embeddings import HashingEmbedder
+from utils.metrics import metrics
+from workflows.default_orchestrator import build_default_agents
+from workflows.orchestrator import Orchestrator
+from workflows.response_cache import WorkflowResponseCache, context_hash
+
+
+class _CountingAgent(BaseAgent):
+    keywords = ["report"]
+
+    def __init__(self, name: str, cacheable: bool = True):
+        super().__init__(name, "")
+        self.cacheable = cacheable
+        self.calls = 0
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return "report" in task_description
+
+    def run(self, task_description: str, context: dict) -> str:
+        self.calls += 1
+        return f"{self.name} #{self.calls}"
+
+
+def test_context_hash_ignores_key_order_and_run_control_keys():
+    assert context_hash({"a": 1, "b": [2]}) == context_hash({"b": [2], "a": 1, "session_id": "s1"})
+    assert context_hash({"a": 1}) != context_hash({"a": 2})
+
+
+def test_exact_hits_expire_and_lru_entries_are_evicted(clock):
+    cache = WorkflowResponseCache(max_entries=2, ttl=10, clock=clock)
+    cache.put("sales", "Quarterly  Report", {"region": "eu"}, "eu report")
+
+    assert cache.get("sales", "quarterly report", {"region": "eu", "session_id": "x"}) == "eu report"
+    assert cache.get("sales", "quarterly report", {"region": "us"}) is None
+    assert cache.get("hr", "quarterly report", {"region": "eu"}) is None
+
+    cache.put("sales", "b", None, "b")
+    cache.put("sales", "c", None, "c")
+    assert len(cache) == 2 and cache.get("sales", "quarterly report", {"region": "eu"}) is None
+
+    clock.now = 11
+    assert cache.get("sales", "b") is None
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["evictions"], stats["expirations"]) == (1, 1, 1)
+
+
+def test_semantic_tier_reuses_results_for_similar_tasks_only():
+    cache = WorkflowResponseCache(embedder=HashingEmbedder(n_features=512), similarity_threshold=0.8)
+    cache.put("sales", "summarize the quarterly sales report for europe", None, "summary")
+
+    assert cache.get("sales", "summarize the quarterly sales report for europe please") == "summary"
+    assert cache.get("sales", "draft an onboarding email") is None
+    assert cache.get("hr", "summarize the quarterly sales report for europe please") is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        WorkflowResponseCache(max_entries=0)
+
+
+def test_orchestrator_skips_the_cache_for_side_effecting_agents_and_opt_outs():
+    reporter = _CountingAgent("reporter")
+    orchestrator = Orchestrator([reporter], response_cache=WorkflowResponseCache())
+    assert orchestrator.run_workflow("weekly report") == orchestrator.run_workflow("Weekly  report") == "reporter #1"
+    assert orchestrator.run_workflow("weekly report", {"use_cache": False}) == "reporter #2"
+
+    mailer = _CountingAgent("mailer", cacheable=False)
+    orchestrator = Orchestrator([mailer], response_cache=WorkflowResponseCache())
+    orchestrator.run_workflow("send report")
+    orchestrator.run_workflow("send report")
+    assert mailer.calls == 2
+    assert orchestrator.response_cache.stats()["bypass"] == 2
+
+
+def test_only_read_only_agents_opt_into_the_cache():
+    assert not BaseAgent.cacheable
+    cacheable = {agent.name: agent.cacheable for agent in build_default_agents()}
+    assert cacheable == {"RAG Agent": True, "TAG Agent": True, "Email Agent": False, "Compliance Agent": False,
+                         "Sales Agent": False, "HR Agent": False}
+
+
+def test_profiled_runs_bypass_the_cache_and_record_a_profile():
+    reporter = _CountingAgent("reporter")
+    orchestrator = Orchestrator([reporter], response_cache=WorkflowResponseCache())
+    orchestrator.run_workflow("weekly report")
+    profiles = len(metrics.profiles)
+
+    assert orchestrator.run_workflow("weekly report", {"profile": True}) == "reporter #2"
+    assert len(metrics.profiles) == profiles + 1
+    assert orchestrator.run_workflow("weekly report") == "reporter #1"
+    assert orchestrator.response_cache.stats()["bypass"] == 1
+
+
+def test_runs_that_write_an_output_file_bypass_the_cache():
+    reporter = _CountingAgent("reporter")
+    orchestrator = Orchestrator([reporter], response_cache=WorkflowResponseCache())
+    context = {"output_path": "deduplicated.csv"}
+
+    orchestrator.run_workflow("weekly report", context)
+    assert orchestrator.run_workflow("weekly report", context) == "reporter #2"
+    assert orchestrator.response_cache.stats()["bypass"] == 2
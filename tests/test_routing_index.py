@@ -0,0 +1,65 @@
+import random
+
+from agents.base_agent import BaseAgent
+from workflows.orchestrator import Orchestrator
+from workflows.routing_index import KeywordRoutingIndex
+
+
+def _naive_scan(keywords_by_slot, text):
+    text = text.lower()
+    scores = {}
+    for slot, keywords in keywords_by_slot.items():
+        hits = len({keyword.lower() for keyword in keywords if keyword and keyword.lower() in text})
+        if hits:
+            scores[slot] = hits
+    return scores
+
+
+def test_scan_matches_naive_substring_search():
+    rng = random.Random(7)
+    alphabet = "abc "
+    for _ in range(200):
+        keywords_by_slot = {
+            slot: ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(0, 4))]
+            for slot in range(rng.randint(1, 6))
+        }
+        index = KeywordRoutingIndex()
+        for slot, keywords in keywords_by_slot.items():
+            index.add(slot, keywords)
+        for _ in range(10):
+            text = "".join(rng.choice(alphabet + "ABC") for _ in range(rng.randint(0, 30)))
+            assert index.scan(text) == _naive_scan(keywords_by_slot, text)
+
+
+def test_keywords_added_after_a_scan_are_recompiled():
+    index = KeywordRoutingIndex()
+    index.add(0, ["sales"])
+    assert index.scan("sales lead") == {0: 1}
+    index.add(1, ["lead", "sales"])
+    assert index.scan("Sales LEAD") == {0: 1, 1: 2}
+
+
+class _Agent(BaseAgent):
+    def __init__(self, name, keywords=(), accepts=None):
+        super().__init__(name, "")
+        self.keywords = list(keywords)
+        self.accepts = accepts
+        self.checked = 0
+
+    def can_handle_task(self, task_description: str) -> bool:
+        self.checked += 1
+        return self.accepts is not None and self.accepts in task_description
+
+    def run(self, task_description: str, context: dict) -> str:
+        return self.name
+
+
+def test_only_keywordless_agents_fall_back_to_can_handle_task():
+    sales = _Agent("sales", ["sales", "deal"])
+    fallback = _Agent("fallback", accepts="invoice")
+    orchestrator = Orchestrator([sales, fallback])
+
+    assert [(agent.name, score) for agent, score in orchestrator.rank_agents("sales deal invoice")] == [
+        ("sales", 2), ("fallback", 1),
+    ]
+    assert sales.checked == 0 and fallback.checked == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from utils.tabular_engine import TabularEngine
+
+
+def test_deduplicate_across_chunks_when_a_gap_changes_the_key_dtype(tmp_path):
+    # The second chunk has a gap, so its "id" column is read as float64 instead of int64
+    path = tmp_path / "people.csv"
+    path.write_text("id,name\n1,a\n2,b\n3,c\n1,A \n,d\n")
+
+    by_id = TabularEngine(chunk_rows=3).deduplicate(str(path), subset=["id"])
+    assert (by_id.rows_in, by_id.rows_out) == (5, 4)  # 1, 2, 3 and the null id
+
+    output = tmp_path / "deduplicated.csv"
+    whole_rows = TabularEngine(chunk_rows=3).deduplicate(str(path), output_path=str(output))
+    assert whole_rows.rows_out == 4  # "A " matches "a" after normalization
+    assert pd.read_csv(output)["name"].tolist() == ["a", "b", "c", "d"]
+
+
+def test_deduplicate_keeps_distinct_ids_above_2_53(tmp_path):
+    # 2**53 and 2**53 + 1 are the same float64, but different IDs
+    path = tmp_path / "accounts.csv"
+    path.write_text("id,name\n9007199254740992,a\n9007199254740993,b\n9007199254740993,c\n")
+
+    result = TabularEngine(chunk_rows=2).deduplicate(str(path), subset=["id"])
+
+    assert (result.rows_in, result.rows_out) == (3, 2)
+
+
+def test_deduplicate_matches_pandas_on_many_chunks():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"key": rng.integers(0, 500, 5_000), "group": rng.choice(["x", "y"], 5_000)})
+
+    result = TabularEngine(chunk_rows=128).deduplicate(frame, subset=["key", "group"])
+
+    assert result.rows_out == len(frame.drop_duplicates(["key", "group"]))
+
+
+def test_summary_std_is_accurate_for_large_values_and_nullable_columns():
+    frame = pd.DataFrame({
+        "big": 1e9 + np.arange(10),
+        "nullable": pd.array([1, 2, None, 4, 5, 6, 7, 8, 9, 10], dtype="Int64"),
+    })
+
+    summary = TabularEngine(chunk_rows=3).summarize(frame, name="t")
+
+    assert np.isclose(summary.columns["big"].m2 / 10, np.var(1e9 + np.arange(10)))
+    assert "std 2.872" in summary.columns["big"].describe()
+    assert "mean 5.778" in summary.columns["nullable"].describe()
+
+
+def test_aggregate_merges_chunk_partials_like_pandas():
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({"region": rng.choice(["n", "s", "e"], 1_000), "amount": rng.random(1_000)})
+
+    result = TabularEngine(chunk_rows=97).aggregate(frame, ["region"], {"amount": ["sum", "mean", "max"]})
+
+    expected = frame.groupby("region")["amount"].agg(["sum", "mean", "max"])
+    merged = result.set_index("region").loc[expected.index]
+    assert np.allclose(merged["amount_sum"], expected["sum"])
+    assert np.allclose(merged["amount_mean"], expected["mean"])
+    assert np.allclose(merged["amount_max"], expected["max"])
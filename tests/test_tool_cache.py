@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from utils.tool_cache import ToolResultCache
+
+
+def test_entries_expire_after_their_tool_ttl_and_keys_are_normalized(clock):
+    cache = ToolResultCache(default_ttl=10, ttls={"Search": 60}, clock=clock)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load("sql", "SELECT  1", {"db": "a", "opts": [1]}, load) == 1
+    assert cache.get_or_load("SQL", "select 1", {"opts": [1], "db": "a"}, load) == 1
+    assert cache.get_or_load("search", "q", {}, load) == 2
+
+    clock.now = 30
+    assert cache.get_or_load("sql", "select 1", {"db": "a", "opts": [1]}, load) == 3  # expired
+    assert cache.get_or_load("search", "q", {}, load) == 2  # still within its own TTL
+    assert cache.stats()["sql"] == {"misses": 2, "hits": 1, "size": 1}
+
+
+def test_uncacheable_tools_and_lru_eviction():
+    cache = ToolResultCache(max_entries=2)
+    sent = []
+    cache.get_or_load("email", "hi", {}, lambda: sent.append(1))
+    cache.get_or_load("email", "hi", {}, lambda: sent.append(1))
+    assert len(sent) == 2
+
+    for query in ("a", "b", "a", "c"):
+        cache.get_or_load("sql", query, {}, lambda: query)
+    assert cache.get_or_load("sql", "b", {}, lambda: "reloaded") == "reloaded"  # least recently used
+    assert cache.stats()["sql"]["evictions"] == 2
+    assert cache.invalidate("sql", "c") == 1
+    assert cache.invalidate() == 1
+
+
+def test_concurrent_identical_calls_share_one_load():
+    cache = ToolResultCache()
+    started = threading.Event()
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("sql", "q", {}, slow_load)))
+               for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["sql"]["coalesced"] == 4
+
+
+def test_failed_loads_are_not_cached():
+    cache = ToolResultCache()
+
+    def fail():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("sql", "q", {}, fail)
+    assert cache.get_or_load("sql", "q", {}, lambda: "ok") == "ok"
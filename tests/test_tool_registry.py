@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.base_agent import Tool
+from utils.tool_registry import ToolRegistry
+
+
+class _InFlightTracker:
+    """Async tool that records how many calls are running at once."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    async def __call__(self, query: str) -> str:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            return query.upper()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_sync_calls_from_many_threads_respect_max_concurrency():
+    tracker = _InFlightTracker()
+    registry = ToolRegistry()
+    registry.register(Tool(name="Sheets", description="", func=tracker, max_concurrency=2))
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(lambda i: registry.call("sheets", f"q{i}"), range(10)))
+
+    assert results == [f"Q{i}" for i in range(10)]
+    assert tracker.peak == 2
+
+
+def test_sync_call_refuses_to_block_a_running_event_loop():
+    registry = ToolRegistry()
+    registry.register(Tool(name="Sheets", description="", func=_InFlightTracker(0), max_concurrency=1))
+
+    async def main() -> str:
+        with pytest.raises(RuntimeError, match="acall"):
+            registry.call("sheets", "inside")
+        return await registry.acall("sheets", "inside")
+
+    assert asyncio.run(main()) == "INSIDE"
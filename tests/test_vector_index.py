@@ -0,0 +1,76 @@
+import pytest
+
+from utils.embeddings import HashingEmbedder
+from utils.vector_index import VectorIndex, content_id
+
+CHUNKS = [
+    "invoices are paid within thirty days",
+    "employees accrue two vacation days per month",
+    "sales leads are qualified by the regional team",
+]
+
+
+def test_add_texts_skips_chunks_already_indexed(tmp_path):
+    index = VectorIndex(str(tmp_path), HashingEmbedder(n_features=256))
+
+    assert index.add_texts(CHUNKS, [{"source": f"doc{i}"} for i in range(3)]) == 3
+    assert index.add_texts(CHUNKS + [CHUNKS[0]]) == 0
+    assert len(index) == 3
+    assert CHUNKS[1] in index
+    assert index.get_record(content_id(CHUNKS[2])) == {"text": CHUNKS[2], "metadata": {"source": "doc2"}}
+
+    text, score = index.search("how many vacation days do employees get", k=1)[0]
+    assert text == CHUNKS[1]
+    assert 0 < score <= 1.0
+
+
+def test_saved_index_reloads_and_syncs_changes(tmp_path):
+    embedder = HashingEmbedder(n_features=256)
+    index = VectorIndex(str(tmp_path), embedder)
+    index.add_texts(CHUNKS)
+    index.save()
+
+    reloaded = VectorIndex(str(tmp_path), embedder)
+    assert reloaded.ids() == [content_id(text) for text in CHUNKS]
+    assert reloaded.search("regional sales team", k=1)[0][0] == CHUNKS[2]
+
+    # One chunk changed and one was dropped: only the changed chunk is embedded
+    updated = [CHUNKS[0], "employees accrue three vacation days per month"]
+    assert reloaded.sync(updated) == (1, 2)
+    reloaded.save()
+
+    final = VectorIndex(str(tmp_path), embedder)
+    assert sorted(final.ids()) == sorted(content_id(text) for text in updated)
+    assert [final.get_text(chunk_id) for chunk_id in final.ids()] == updated
+    with pytest.raises(KeyError):
+        final.get_record(content_id(CHUNKS[2]))
+
+
+def test_reloading_with_a_different_embedder_is_rejected(tmp_path):
+    index = VectorIndex(str(tmp_path), HashingEmbedder(n_features=256))
+    index.add_texts(CHUNKS)
+    index.save()
+
+    with pytest.raises(ValueError):
+        VectorIndex(str(tmp_path), HashingEmbedder(n_features=128))
+
+
+def test_files_from_an_interrupted_save_are_detected_or_discarded(tmp_path):
+    embedder = HashingEmbedder(n_features=256)
+    index = VectorIndex(str(tmp_path), embedder)
+    index.add_texts(CHUNKS[:2])
+    index.save()
+    committed_meta = (tmp_path / "meta.json").read_bytes()
+
+    # Records appended past the committed ones are dropped by the next save
+    with open(tmp_path / "chunks.jsonl", "ab") as chunks_file:
+        chunks_file.write(b'{"text": "half-written')
+    reloaded = VectorIndex(str(tmp_path), embedder)
+    reloaded.add_texts(CHUNKS[2:])
+    reloaded.save()
+    assert [VectorIndex(str(tmp_path), embedder).get_text(content_id(text)) for text in CHUNKS] == CHUNKS
+
+    # Data files from a newer save than meta.json records are rejected
+    (tmp_path / "meta.json").write_bytes(committed_meta)
+    with pytest.raises(ValueError, match="inconsistent"):
+        VectorIndex(str(tmp_path), embedder)
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from workflows.orchestrator import Orchestrator
+from workflows.work_queue import BackgroundWorkQueue, WorkItem, WorkQueue, WorkQueueStore
+
+
+class _RecordingAgent(BaseAgent):
+    def __init__(self, name: str, keywords, failures: int = 0):
+        super().__init__(name, "")
+        self.keywords = keywords
+        self.failures = failures
+        self.calls = []
+
+    def can_handle_task(self, task_description: str) -> bool:
+        return any(keyword in task_description for keyword in self.keywords)
+
+    def run(self, task_description: str, context: dict) -> str:
+        self.calls.append(task_description)
+        if len(self.calls) <= self.failures:
+            raise RuntimeError("flaky")
+        return f"{self.name}: {task_description}"
+
+
+class _CountingOrchestrator(Orchestrator):
+    def __init__(self, agents):
+        super().__init__(agents)
+        self.routings = 0
+
+    def select_agent(self, task_description: str) -> BaseAgent:
+        self.routings += 1
+        return super().select_agent(task_description)
+
+
+def test_items_are_routed_once_and_run_on_their_queued_agent():
+    async def scenario():
+        orchestrator = _CountingOrchestrator([_RecordingAgent("sales", ["sales"]), _RecordingAgent("hr", ["hr"])])
+        queue = WorkQueue(orchestrator)
+        await queue.start()
+        items = [await queue.enqueue(task) for task in ("sales report", "hr review", "sales forecast")]
+        results = await asyncio.gather(*(item.future for item in items))
+        await queue.stop()
+        return orchestrator.routings, results
+
+    routings, results = asyncio.run(scenario())
+    assert routings == 3
+    assert results == ["sales: sales report", "hr: hr review", "sales: sales forecast"]
+
+
+def test_restored_items_keep_their_persisted_agent(tmp_path):
+    db_path = str(tmp_path / "queue.sqlite")
+    store = WorkQueueStore(db_path)
+    store.save(WorkItem(task="sales report", context={}, agent_name="hr"))
+    store.close()
+    sales, hr = _RecordingAgent("sales", ["sales"]), _RecordingAgent("hr", ["hr"])
+
+    async def scenario():
+        queue = WorkQueue(Orchestrator([sales, hr]), db_path=db_path)
+        await queue.start()
+        await queue.join()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert (sales.calls, hr.calls) == ([], ["sales report"])
+
+
+def test_failed_items_are_retried_then_dead_lettered():
+    # The orchestrator reports agent errors as results, so fail inside the handler instead
+    async def flaky_handler(item: WorkItem) -> str:
+        if item.attempts < 2:
+            raise RuntimeError("flaky")
+        if item.task == "always fails":
+            raise RuntimeError("broken")
+        return "done"
+
+    async def scenario():
+        queue = WorkQueue(Orchestrator([_RecordingAgent("a", ["fails", "works"])]), max_attempts=2,
+                          backoff_base=0.001, handler=flaky_handler)
+        await queue.start()
+        works = await queue.enqueue("works")
+        fails = await queue.enqueue("always fails")
+        await queue.join()
+        await queue.stop()
+        return queue, await works.future, fails
+
+    queue, result, fails = asyncio.run(scenario())
+    assert result == "done"
+    assert queue.counters["retried"] == 2
+    assert queue.dead_letters == [fails]
+
+
+def test_stop_cancels_pending_retries_and_refuses_new_work():
+    async def failing_handler(item: WorkItem) -> str:
+        raise RuntimeError("down")
+
+    async def scenario():
+        queue = WorkQueue(Orchestrator([_RecordingAgent("a", ["task"])]), backoff_base=60, handler=failing_handler)
+        await queue.start()
+        item = await queue.enqueue("task")
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        assert item.future.cancelled()
+        with pytest.raises(RuntimeError):
+            await queue.enqueue("task")
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert not queue._queues and not queue._retries
+
+
+def test_background_submit_rejects_unroutable_tasks_immediately():
+    background = BackgroundWorkQueue(WorkQueue(Orchestrator([_RecordingAgent("sales", ["sales"])])))
+    try:
+        with pytest.raises(ValueError):
+            background.submit("weather forecast")
+        assert background.submit("sales report").result(timeout=5) == "sales: sales report"
+    finally:
+        background.shutdown()
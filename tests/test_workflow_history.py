@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from workflows.workflow_history import WorkflowHistory
+
+
+def test_each_session_keeps_only_its_most_recent_turns():
+    history = WorkflowHistory(max_entries=3)
+    for i in range(5):
+        history.append("user", f"a{i}", session_id="a")
+    history.append("agent", "b0", name="SalesAgent", session_id="b")
+
+    assert [entry.content for entry in history.last(10, "a")] == ["a2", "a3", "a4"]
+    assert [entry.content for entry in history.last(2, "a")] == ["a3", "a4"]
+    assert history.last(0, "a") == [] and history.last(5, "missing") == []
+    assert history.format_recent(1, "b") == "agent (SalesAgent): b0"
+    assert len(history) == 4
+
+
+def test_least_recently_used_session_is_evicted():
+    history = WorkflowHistory(max_sessions=2)
+    history.append("user", "first", session_id="a")
+    history.append("user", "second", session_id="b")
+    history.append("user", "again", session_id="a")  # "b" is now the least recently used
+    history.append("user", "third", session_id="c")
+
+    assert [entry.content for entry in history.last(5, "a")] == ["first", "again"]
+    assert history.last(5, "b") == []
+    assert [entry.content for entry in history.last(5, "c")] == ["third"]
+
+
+def test_overflow_and_evicted_sessions_are_spilled_as_json_lines(tmp_path):
+    spill_path = tmp_path / "history.jsonl"
+    history = WorkflowHistory(max_entries=2, max_sessions=1, spill_path=str(spill_path))
+    history.append("user", "one", session_id="a")
+    history.append("agent", "two", name="HRAgent", session_id="a")
+    history.append("user", "three", session_id="a")  # pushes "one" out of the window
+    history.append("user", "other", session_id="b")  # evicts session "a"
+
+    records = [json.loads(line) for line in spill_path.read_text(encoding="utf-8").splitlines()]
+    assert [(record["session_id"], record["role"], record["content"]) for record in records] == [
+        ("a", "user", "one"), ("a", "agent", "two"), ("a", "user", "three"),
+    ]
+    assert records[1]["name"] == "HRAgent" and "timestamp" in records[0]
+    assert [entry.content for entry in history] == ["other"]
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        WorkflowHistory(max_entries=0)
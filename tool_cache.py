@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+CacheKey = Tuple[str, str, Hashable]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turns kwargs values into a hashable, order-independent form."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return tuple(sorted(_freeze(item) for item in value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ToolResultCache:
+    """TTL + LRU cache for read-only tool calls with single-flight de-duplication.
+
+    Entries are keyed by (tool name, normalised query, kwargs). Each tool has its own
+    LRU bucket bounded by max_entries and its own TTL (ttls, falling back to
+    default_ttl). Concurrent identical calls share one in-flight load. Tools in
+    uncacheable (side-effecting ones such as email) always call through. Cached
+    results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, default_ttl: float = 60.0, ttls: Optional[Dict[str, float]] = None,
+                 max_entries: int = 1024, uncacheable: Iterable[str] = ("email",),
+                 clock: Callable[[], float] = time.monotonic):
+        self.default_ttl = default_ttl
+        self.ttls = {name.lower(): ttl for name, ttl in (ttls or {}).items()}
+        self.max_entries = max_entries
+        self.uncacheable = {name.lower() for name in uncacheable}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[CacheKey, Tuple[float, Any]]"] = {}
+        self._in_flight: Dict[CacheKey, Future] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._generation = 0  # bumped by invalidate so in-flight loads don't store stale results
+
+    @staticmethod
+    def make_key(tool_name: str, query: str, kwargs: Dict[str, Any]) -> CacheKey:
+        return tool_name.lower(), normalize_query(query), _freeze(kwargs)
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        tool_name = tool_name.lower()
+        return tool_name not in self.uncacheable and self.ttls.get(tool_name, self.default_ttl) > 0
+
+    def get_or_load(self, tool_name: str, query: str, kwargs: Dict[str, Any], loader: Callable[[], Any]) -> Any:
+        """Returns a fresh cached result, waits on an identical in-flight call, or runs loader."""
+        if not self.is_cacheable(tool_name):
+            with self._lock:
+                self._count(tool_name.lower(), "bypass")
+            return loader()
+        key = self.make_key(tool_name, query, kwargs)
+        hit, value, future, generation = self._begin(key)
+        if hit:
+            return value
+        if generation is None:
+            return future.result()
+        try:
+            value = loader()
+        except BaseException as error:
+            self._fail(key, future, error)
+            raise
+        return self._finish(key, future, generation, value)
+
+    async def aget_or_load(self, tool_name: str, query: str, kwargs: Dict[str, Any],
+                           loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of get_or_load; shares entries and in-flight loads with sync callers."""
+        if not self.is_cacheable(tool_name):
+            with self._lock:
+                self._count(tool_name.lower(), "bypass")
+            return await loader()
+        key = self.make_key(tool_name, query, kwargs)
+        hit, value, future, generation = self._begin(key)
+        if hit:
+            return value
+        if generation is None:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await loader()
+        except BaseException as error:
+            self._fail(key, future, error)
+            raise
+        return self._finish(key, future, generation, value)
+
+    def _begin(self, key: CacheKey) -> Tuple[bool, Any, Optional[Future], Optional[int]]:
+        """Returns (hit, value, future, generation); generation is None when joining another load."""
+        tool = key[0]
+        with self._lock:
+            bucket = self._entries.setdefault(tool, OrderedDict())
+            entry = bucket.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    bucket.move_to_end(key)
+                    self._count(tool, "hits")
+                    return True, value, None, None
+                del bucket[key]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._count(tool, "coalesced")
+                return False, None, future, None
+            future = self._in_flight[key] = Future()
+            self._count(tool, "misses")
+            return False, None, future, self._generation
+
+    def _finish(self, key: CacheKey, future: Future, generation: int, value: Any) -> Any:
+        tool = key[0]
+        with self._lock:
+            self._in_flight.pop(key, None)
+            # Skip storing if the cache was invalidated while loading.
+            if generation == self._generation:
+                bucket = self._entries.setdefault(tool, OrderedDict())
+                bucket[key] = (self._clock() + self.ttls.get(tool, self.default_ttl), value)
+                bucket.move_to_end(key)
+                while len(bucket) > self.max_entries:
+                    bucket.popitem(last=False)
+                    self._count(tool, "evictions")
+        future.set_result(value)
+        return value
+
+    def _fail(self, key: CacheKey, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+
+    def invalidate(self, tool_name: Optional[str] = None, query: Optional[str] = None, **kwargs: Any) -> int:
+        """Drops one entry (tool and query given), one tool's entries, or everything. Returns the count."""
+        with self._lock:
+            self._generation += 1
+            if tool_name is None:
+                removed = sum(len(bucket) for bucket in self._entries.values())
+                self._entries.clear()
+                return removed
+            bucket = self._entries.get(tool_name.lower())
+            if not bucket:
+                return 0
+            if query is None:
+                removed = len(bucket)
+                bucket.clear()
+                return removed
+            return 1 if bucket.pop(self.make_key(tool_name, query, kwargs), None) is not None else 0
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-tool hits/misses/coalesced/bypass/evictions counters plus current sizes."""
+        with self._lock:
+            stats = {tool: dict(counters) for tool, counters in self._counters.items()}
+            for tool, bucket in self._entries.items():
+                stats.setdefault(tool, {})["size"] = len(bucket)
+        return stats
+
+    def _count(self, tool: str, counter: str) -> None:
+        counters = self._counters.setdefault(tool, {})
+        counters[counter] = counters.get(counter, 0) + 1
@@ -0,0 +1,175 @@
+import asyncio
+import inspect
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from agents.base_agent import Tool
+from utils.metrics import metrics
+
+
+class ConnectionPool:
+    """Reuses connections created by an async factory instead of opening one per call.
+
+    Idle connections are kept in a plain list so the pool is not tied to a single
+    event loop; callers bound concurrency (and so the number of open connections)
+    with the registry's per-tool limit.
+    """
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]], max_idle: int = 16):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.created = 0
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> Any:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return await self.factory()
+
+    def release(self, connection: Any) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+
+    def warm_connections(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+
+class SimulatedToolAdapter:
+    """Local stand-in for a remote tool backend with configurable simulated latency.
+
+    Each call borrows a pooled "connection" (opening one costs connect_latency the
+    first time), waits latency seconds as the remote round trip, then answers with
+    handler(query, **kwargs).
+    """
+
+    def __init__(self, name: str, handler: Callable[..., Any], latency: float = 0.0,
+                 connect_latency: float = 0.0, max_idle: int = 16):
+        self.name = name
+        self.handler = handler
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.pool = ConnectionPool(self._connect, max_idle=max_idle)
+
+    async def _connect(self) -> Dict[str, Any]:
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+        return {"backend": self.name}
+
+    async def __call__(self, query: str, **kwargs: Any) -> Any:
+        connection = await self.pool.acquire()
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.handler(query, **kwargs)
+        finally:
+            self.pool.release(connection)
+
+    def as_tool(self, description: str, max_concurrency: Optional[int] = None) -> Tool:
+        return Tool(name=self.name, description=description, func=self, max_concurrency=max_concurrency)
+
+
+class ToolRegistry:
+    """Name -> Tool registry with async dispatch and per-tool concurrency limits.
+
+    Coroutine tools are awaited directly; plain functions run in the event loop's
+    thread pool. Synchronous calls are all dispatched to one long-lived background
+    loop, so they share its semaphores and pooled connections. Names are
+    case-insensitive.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        # Per event loop semaphores, so one registry can serve several loops.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def register(self, tool: Tool) -> Tool:
+        self._tools[tool.name.lower()] = tool
+        return tool
+
+    def unregister(self, name: str) -> None:
+        self._tools.pop(name.lower(), None)
+
+    def get(self, name: str) -> Tool:
+        try:
+            return self._tools[name.lower()]
+        except KeyError:
+            raise KeyError(f"Unknown tool: {name}") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._tools
+
+    def names(self) -> List[str]:
+        return [tool.name for tool in self._tools.values()]
+
+    async def acall(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Invokes a tool, waiting for a slot if it is at its concurrency limit."""
+        tool = self.get(name)
+        semaphore = self._semaphore(tool)
+        if semaphore is None:
+            return await self._invoke(tool, args, kwargs)
+        async with semaphore:
+            return await self._invoke(tool, args, kwargs)
+
+    def call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Synchronous invocation; blocks the calling thread until the tool returns.
+
+        Async and concurrency-limited tools run on the registry's background loop, so
+        from inside a running event loop they raise RuntimeError instead of blocking it.
+        """
+        tool = self.get(name)
+        if not _is_async(tool.func) and not tool.max_concurrency:
+            with metrics.timed("tool_call", tool.name):
+                return tool.func(*args, **kwargs)
+        if _running_loop() is not None:
+            raise RuntimeError("ToolRegistry.call() cannot run inside a running event loop; "
+                               "use await ToolRegistry.acall() instead")
+        loop = self._background_loop()
+        return asyncio.run_coroutine_threadsafe(self.acall(name, *args, **kwargs), loop).result()
+
+    async def gather(self, calls: Sequence[Tuple[str, tuple, Dict[str, Any]]]) -> List[Any]:
+        """Runs several (name, args, kwargs) calls concurrently, returning results in order."""
+        return list(await asyncio.gather(*(self.acall(name, *args, **kwargs) for name, args, kwargs in calls)))
+
+    async def _invoke(self, tool: Tool, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        with metrics.timed("tool_call", tool.name):
+            if _is_async(tool.func):
+                return await tool.func(*args, **kwargs)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: tool.func(*args, **kwargs))
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="tool-registry-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _semaphore(self, tool: Tool) -> Optional[asyncio.Semaphore]:
+        if not tool.max_concurrency:
+            return None
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        key = tool.name.lower()
+        if key not in semaphores:
+            semaphores[key] = asyncio.Semaphore(tool.max_concurrency)
+        return semaphores[key]
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _is_async(func: Callable[..., Any]) -> bool:
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, "__call__", None))
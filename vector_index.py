@@ -0,0 +1,285 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from utils.embeddings import embedder_name
+
+_INDEX_FILE = "index.faiss"
+_IDS_FILE = "ids.npy"
+_ORDER_FILE = "order.npy"
+_OFFSETS_FILE = "offsets.npy"
+_CHUNKS_FILE = "chunks.jsonl"
+_META_FILE = "meta.json"
+
+
+def content_id(text: str) -> int:
+    """Stable int64 FAISS id derived from the SHA-1 hash of a chunk's content."""
+    chunk_id = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "big", signed=True)
+    return chunk_id if chunk_id != -1 else 0  # -1 is FAISS's "no result" marker
+
+
+class VectorIndex:
+    """Persistent FAISS index over content-hashed chunks.
+
+    Vectors live in a flat inner-product index over L2-normalised embeddings, so
+    scores are cosine similarities. Chunk records are stored as JSON lines next to
+    the index with memory-mapped id and offset tables, so loading an existing index
+    only maps files and hits are decoded on demand. Chunks whose content hash is
+    already indexed are skipped; only new or changed chunks are embedded.
+
+    The embedder follows the LangChain Embeddings interface (embed_documents and
+    embed_query).
+    """
+
+    def __init__(self, directory: str, embedder: Any):
+        self.directory = directory
+        self.embedder = embedder
+        self._lock = threading.RLock()
+        self._index: Optional[faiss.Index] = None
+        self._writable = False
+        # Persisted rows: ids in row order, argsort of ids, byte offsets into chunks.jsonl
+        self._ids = np.empty(0, dtype=np.int64)
+        self._order = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._chunks_file = None
+        self._chunks: Any = b""
+        # Unsaved changes: appended records/ids (rows after the persisted ones) and removed rows
+        self._pending: List[bytes] = []
+        self._pending_ids: List[int] = []
+        self._pending_rows: Dict[int, int] = {}
+        self._removed_rows: set = set()
+        # Bumped on every add/remove so derived structures (e.g. BM25) know when to rebuild
+        self.version = 0
+        if os.path.exists(os.path.join(directory, _META_FILE)):
+            self._load()
+
+    def __len__(self) -> int:
+        return 0 if self._index is None else self._index.ntotal
+
+    def __contains__(self, text: str) -> bool:
+        return self._row_of(content_id(text)) is not None
+
+    def ids(self) -> List[int]:
+        """Content ids of every indexed chunk, in row order."""
+        return [chunk_id for row, chunk_id in enumerate(self._all_ids()) if row not in self._removed_rows]
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[Iterable[Dict[str, Any]]] = None) -> int:
+        """Indexes texts whose content hash is not present yet. Returns how many were embedded."""
+        metadatas = iter(metadatas) if metadatas is not None else None
+        new_texts, new_ids, new_metadata, seen = [], [], [], set()
+        with self._lock:
+            for text in texts:
+                metadata = next(metadatas) if metadatas is not None else {}
+                chunk_id = content_id(text)
+                if chunk_id in seen or self._row_of(chunk_id) is not None:
+                    continue
+                seen.add(chunk_id)
+                new_texts.append(text)
+                new_ids.append(chunk_id)
+                new_metadata.append(metadata)
+            if not new_texts:
+                return 0
+            vectors = self._normalize(self.embedder.embed_documents(new_texts))
+            self._ensure_writable(vectors.shape[1])
+            self._index.add_with_ids(vectors, np.asarray(new_ids, dtype=np.int64))
+            for chunk_id, text, metadata in zip(new_ids, new_texts, new_metadata):
+                self._pending_rows[chunk_id] = len(self._ids) + len(self._pending)
+                self._pending_ids.append(chunk_id)
+                self._pending.append((json.dumps({"text": text, "metadata": metadata}) + "\n").encode("utf-8"))
+            self.version += 1
+        return len(new_texts)
+
+    def sync(self, texts: Sequence[str], metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> Tuple[int, int]:
+        """Makes the index hold exactly the given chunks. Returns (embedded, removed)."""
+        with self._lock:
+            wanted = {content_id(text) for text in texts}
+            stale = [chunk_id for chunk_id in self.ids() if chunk_id not in wanted]
+            self.remove_ids(stale)
+            return self.add_texts(texts, metadatas), len(stale)
+
+    def remove_ids(self, ids: Iterable[int]) -> None:
+        """Removes chunks by content id; their records are compacted away on the next save."""
+        with self._lock:
+            rows = {chunk_id: self._row_of(chunk_id) for chunk_id in ids}
+            rows = {chunk_id: row for chunk_id, row in rows.items() if row is not None}
+            if not rows:
+                return
+            self._ensure_writable(self._index.d)
+            self._index.remove_ids(np.asarray(list(rows), dtype=np.int64))
+            self._removed_rows.update(rows.values())
+            self.version += 1
+            for chunk_id in rows:
+                self._pending_rows.pop(chunk_id, None)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Returns the k most similar chunk texts with their cosine scores."""
+        query_vector = self._normalize([self.embedder.embed_query(query)])
+        return self.search_vectors(query_vector, k)[0]
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """Embeds and normalises a batch of queries in a single embedder call."""
+        return self._normalize(self.embedder.embed_documents(list(queries)))
+
+    def search_ids(self, query_vectors: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched search returning (scores, ids) matrices; missing hits have id -1."""
+        if len(self) == 0:
+            empty = np.full((len(query_vectors), k), -1, dtype=np.int64)
+            return np.zeros(empty.shape, dtype=np.float32), empty
+        return self._index.search(np.ascontiguousarray(query_vectors, dtype=np.float32), k)
+
+    def search_vectors(self, query_vectors: np.ndarray, k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Batched search over pre-normalised query vectors, one result list per row."""
+        scores, ids = self.search_ids(query_vectors, k)
+        return [
+            [(self.get_text(int(chunk_id)), float(score)) for score, chunk_id in zip(row_scores, row_ids) if chunk_id != -1]
+            for row_scores, row_ids in zip(scores, ids)
+        ]
+
+    def get_record(self, chunk_id: int) -> Dict[str, Any]:
+        """Decodes the stored record ({"text", "metadata"}) for a chunk id."""
+        row = self._row_of(chunk_id)
+        if row is None:
+            raise KeyError(chunk_id)
+        return json.loads(self._raw_record(row))
+
+    def get_text(self, chunk_id: int) -> str:
+        return self.get_record(chunk_id)["text"]
+
+    def save(self) -> None:
+        """Persists unsaved changes: appends new records, or rewrites them if chunks were removed."""
+        with self._lock:
+            if self._index is None or (not self._pending and not self._removed_rows):
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            if self._removed_rows:
+                all_ids = self._all_ids()
+                rows = [row for row in range(len(all_ids)) if row not in self._removed_rows]
+                records = [self._raw_record(row) for row in rows]
+                ids = np.asarray([all_ids[row] for row in rows], dtype=np.int64)
+                self._close_chunks()
+                self._atomic_write(_CHUNKS_FILE, lambda f: f.writelines(records))
+                base = 0
+            else:
+                records, ids = self._pending, np.asarray(self._all_ids(), dtype=np.int64)
+                base = int(self._offsets[-1])
+                self._close_chunks()
+                with open(os.path.join(self.directory, _CHUNKS_FILE), "ab") as chunks_file:
+                    # Drop bytes an interrupted save appended past the last committed record
+                    chunks_file.truncate(base)
+                    chunks_file.writelines(records)
+                records = None
+
+            if records is None:
+                lengths = [len(record) for record in self._pending]
+                offsets = np.concatenate([np.asarray(self._offsets), base + np.cumsum(lengths, dtype=np.int64)])
+            else:
+                offsets = np.zeros(len(records) + 1, dtype=np.int64)
+                np.cumsum([len(record) for record in records], out=offsets[1:])
+            self._atomic_write(_IDS_FILE, lambda f: np.save(f, ids))
+            self._atomic_write(_ORDER_FILE, lambda f: np.save(f, np.argsort(ids, kind="stable")))
+            self._atomic_write(_OFFSETS_FILE, lambda f: np.save(f, offsets))
+            self._atomic_write(_INDEX_FILE, lambda f: f.write(faiss.serialize_index(self._index).tobytes()))
+            # meta.json is written last and acts as the commit record for the files above
+            meta = {"dim": self._index.d, "count": len(ids), "chunks_bytes": int(offsets[-1]),
+                    "embedder": embedder_name(self.embedder)}
+            self._atomic_write(_META_FILE, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+            self._pending, self._pending_ids, self._pending_rows, self._removed_rows = [], [], {}, set()
+            self._map_files()
+
+    def _load(self) -> None:
+        with open(os.path.join(self.directory, _META_FILE), encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("embedder") != embedder_name(self.embedder):
+            raise ValueError(
+                f"Index at {self.directory} was built with embedder {meta.get('embedder')!r}, "
+                f"not {embedder_name(self.embedder)!r}"
+            )
+        self._index = faiss.read_index(os.path.join(self.directory, _INDEX_FILE),
+                                       faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        self._writable = False
+        self._map_files()
+        self._check_committed(meta)
+
+    def _check_committed(self, meta: Dict[str, Any]) -> None:
+        """Rejects an index whose files do not all belong to the save recorded in meta.json."""
+        count = meta.get("count")
+        counts = {"ids": len(self._ids), "order": len(self._order), "offsets": len(self._offsets) - 1,
+                  "index": self._index.ntotal}
+        mismatched = {name: value for name, value in counts.items() if value != count}
+        chunks_bytes = meta.get("chunks_bytes", int(self._offsets[-1]))
+        chunks_size = os.fstat(self._chunks_file.fileno()).st_size
+        if int(self._offsets[-1]) != chunks_bytes or chunks_size < chunks_bytes:
+            mismatched["chunks_bytes"] = chunks_size
+        if mismatched:
+            self._close_chunks()
+            raise ValueError(
+                f"Index at {self.directory} is inconsistent with its meta.json (count={count}, "
+                f"chunks_bytes={chunks_bytes}; found {mismatched}), probably from an interrupted save; rebuild it"
+            )
+
+    def _map_files(self) -> None:
+        self._ids = np.load(os.path.join(self.directory, _IDS_FILE), mmap_mode="r")
+        self._order = np.load(os.path.join(self.directory, _ORDER_FILE), mmap_mode="r")
+        self._offsets = np.load(os.path.join(self.directory, _OFFSETS_FILE), mmap_mode="r")
+        self._chunks_file = open(os.path.join(self.directory, _CHUNKS_FILE), "rb")
+        if self._offsets[-1] > 0:
+            self._chunks = mmap.mmap(self._chunks_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._chunks = b""
+
+    def _close_chunks(self) -> None:
+        if isinstance(self._chunks, mmap.mmap):
+            self._chunks.close()
+        if self._chunks_file is not None:
+            self._chunks_file.close()
+        self._chunks, self._chunks_file = b"", None
+
+    def _ensure_writable(self, dim: int) -> None:
+        if self._index is None:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+            self._writable = True
+        elif not self._writable:
+            # Memory-mapped indexes are read-only; copy into memory on the first write.
+            self._index = faiss.read_index(os.path.join(self.directory, _INDEX_FILE))
+            self._writable = True
+        if self._index.d != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self._index.d}")
+
+    def _row_of(self, chunk_id: int) -> Optional[int]:
+        row = self._pending_rows.get(chunk_id)
+        if row is not None or not len(self._ids):
+            return row
+        position = int(np.searchsorted(self._ids, chunk_id, sorter=self._order))
+        if position < len(self._order) and self._ids[self._order[position]] == chunk_id:
+            row = int(self._order[position])
+            return None if row in self._removed_rows else row
+        return None
+
+    def _all_ids(self) -> List[int]:
+        return self._ids.tolist() + self._pending_ids
+
+    def _raw_record(self, row: int) -> bytes:
+        persisted = len(self._ids)
+        if row < persisted:
+            return bytes(self._chunks[self._offsets[row]:self._offsets[row + 1]])
+        return self._pending[row - persisted]
+
+    def _atomic_write(self, name: str, write) -> None:
+        path = os.path.join(self.directory, name)
+        with open(path + ".tmp", "wb") as tmp_file:
+            write(tmp_file)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _normalize(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(matrix / norms)
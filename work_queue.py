@@ -0,0 +1,301 @@
+import asyncio
+import itertools
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from concurrent.futures import Future as ThreadFuture
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from workflows.orchestrator import Orchestrator
+from workflows.process_worker import run_in_process_worker
+
+DEFAULT_PRIORITY = 5  # lower numbers run first
+
+
+@dataclass
+class WorkItem:
+    """A queued workflow task routed to one agent's worker pool."""
+    task: str
+    context: Dict[str, Any]
+    agent_name: str
+    priority: int = DEFAULT_PRIORITY
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.time)
+    future: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+
+Handler = Callable[[WorkItem], Awaitable[str]]
+
+
+class WorkQueueStore:
+    """SQLite persistence so queued and dead-lettered work survives restarts."""
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS work_items ("
+            "id TEXT PRIMARY KEY, agent TEXT NOT NULL, priority INTEGER NOT NULL, task TEXT NOT NULL, "
+            "context TEXT NOT NULL, attempts INTEGER NOT NULL, status TEXT NOT NULL, last_error TEXT, "
+            "enqueued_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def save(self, item: WorkItem, status: str = "queued") -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO work_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (item.id, item.agent_name, item.priority, item.task, json.dumps(item.context), item.attempts,
+             status, item.last_error, item.enqueued_at),
+        )
+        self._connection.commit()
+
+    def delete(self, item: WorkItem) -> None:
+        self._connection.execute("DELETE FROM work_items WHERE id = ?", (item.id,))
+        self._connection.commit()
+
+    def load(self, status: str) -> List[WorkItem]:
+        rows = self._connection.execute(
+            "SELECT id, agent, priority, task, context, attempts, last_error, enqueued_at "
+            "FROM work_items WHERE status = ? ORDER BY priority, enqueued_at", (status,)
+        ).fetchall()
+        return [
+            WorkItem(id=row[0], agent_name=row[1], priority=row[2], task=row[3], context=json.loads(row[4]),
+                     attempts=row[5], last_error=row[6], enqueued_at=row[7])
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class WorkQueue:
+    """Asyncio priority work queue with a worker pool per agent.
+
+    Tasks are routed once at enqueue time and placed on the selected agent's
+    priority queue, so a burst for one agent cannot starve the others. Failed
+    items are retried with exponential backoff and jitter, then dead-lettered
+    after max_attempts. With a db_path, queued and dead-lettered items are
+    persisted and recovered on start().
+    """
+
+    def __init__(self, orchestrator: Orchestrator, workers_per_agent: int = 2, max_attempts: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, max_queue_size: int = 0,
+                 db_path: Optional[str] = None, handler: Optional[Handler] = None):
+        self.orchestrator = orchestrator
+        self.workers_per_agent = workers_per_agent
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_queue_size = max_queue_size
+        self.store = WorkQueueStore(db_path) if db_path else None
+        self.handler = handler or self._run_with_orchestrator
+        self.dead_letters: List[WorkItem] = []
+        self.counters = {"enqueued": 0, "completed": 0, "retried": 0, "dead_lettered": 0}
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._workers: List[asyncio.Task] = []
+        # Backoff timers of items waiting to be retried; cancelled by stop()
+        self._retries: Set[asyncio.Task] = set()
+        self._stopped = False
+        self._sequence = itertools.count()
+        self._outstanding = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        """Starts the worker pools and re-queues any persisted work."""
+        self._stopped = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        for agent in self.orchestrator.agents:
+            self._pool(agent.name)
+        if self.store is not None:
+            self.dead_letters.extend(self.store.load("dead"))
+            for item in self.store.load("queued"):
+                await self._put(item)
+
+    async def enqueue(self, task: str, context: Optional[Dict[str, Any]] = None,
+                      priority: int = DEFAULT_PRIORITY, agent_name: Optional[str] = None) -> WorkItem:
+        """Routes and queues a task; await item.future for its result.
+
+        Pass agent_name when the task was already routed to skip routing it again.
+
+        Raises ValueError when no agent can handle the task and RuntimeError after
+        stop(). Waits while the agent's queue is full (max_queue_size), applying
+        backpressure to producers.
+        """
+        if self._stopped:
+            raise RuntimeError("WorkQueue is stopped")
+        if agent_name is None:
+            agent_name = self.orchestrator.select_agent(task).name
+        item = WorkItem(task=task, context=dict(context or {}), agent_name=agent_name, priority=priority)
+        if self.store is not None:
+            self.store.save(item)
+        self.counters["enqueued"] += 1
+        await self._put(item)
+        return item
+
+    async def join(self) -> None:
+        """Waits until every queued item has completed or been dead-lettered."""
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        """Cancels the workers and pending retries; persisted items resume on the next start()."""
+        self._stopped = True
+        tasks = self._workers + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        self._retries.clear()
+        self._queues.clear()
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.counters)
+        stats["outstanding"] = self._outstanding
+        stats["queued_per_agent"] = {name: queue.qsize() for name, queue in self._queues.items()}
+        return stats
+
+    async def _put(self, item: WorkItem) -> None:
+        if item.future is None:
+            item.future = asyncio.get_running_loop().create_future()
+        self._outstanding += 1
+        self._idle.clear()
+        await self._pool(item.agent_name).put((item.priority, next(self._sequence), item))
+
+    def _pool(self, agent_name: str) -> asyncio.PriorityQueue:
+        if self._stopped:
+            raise RuntimeError("WorkQueue is stopped")
+        queue = self._queues.get(agent_name)
+        if queue is None:
+            queue = self._queues[agent_name] = asyncio.PriorityQueue(self.max_queue_size)
+            for _ in range(self.workers_per_agent):
+                self._workers.append(asyncio.ensure_future(self._worker(queue)))
+        return queue
+
+    async def _worker(self, queue: asyncio.PriorityQueue) -> None:
+        while True:
+            _priority, _sequence, item = await queue.get()
+            try:
+                await self._process(item)
+            finally:
+                queue.task_done()
+
+    async def _process(self, item: WorkItem) -> None:
+        item.attempts += 1
+        try:
+            result = await self.handler(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            item.last_error = f"{type(e).__name__}: {e}"
+            if item.attempts < self.max_attempts:
+                self.counters["retried"] += 1
+                if self.store is not None:
+                    self.store.save(item)
+                retry = asyncio.ensure_future(self._retry_later(item))
+                self._retries.add(retry)
+                retry.add_done_callback(self._retries.discard)
+                return
+            self.counters["dead_lettered"] += 1
+            self.dead_letters.append(item)
+            if self.store is not None:
+                self.store.save(item, status="dead")
+            if not item.future.done():
+                item.future.set_exception(e)
+                item.future.exception()  # dead letters are recorded; don't warn when nobody awaited it
+            self._finish()
+            return
+        self.counters["completed"] += 1
+        if self.store is not None:
+            self.store.delete(item)
+        if not item.future.done():
+            item.future.set_result(result)
+        self._finish()
+
+    async def _retry_later(self, item: WorkItem) -> None:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (item.attempts - 1))
+        try:
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+        except asyncio.CancelledError:
+            # Stopped while backing off: release anyone awaiting the item
+            if not item.future.done():
+                item.future.cancel()
+            raise
+        await self._pool(item.agent_name).put((item.priority, next(self._sequence), item))
+
+    def _finish(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding == 0:
+            self._idle.set()
+
+    async def _run_with_orchestrator(self, item: WorkItem) -> str:
+        # Run the agent the item was routed to (and persisted with), not a fresh routing
+        agent = self.orchestrator.get_agent(item.agent_name)
+        return await self.orchestrator.arun_workflow(item.task, item.context, agent=agent)
+
+
+def process_pool_handler(executor: Executor) -> Handler:
+    """Runs items in a process pool whose workers were started with process_worker.init_process_worker."""
+    async def handle(item: WorkItem) -> str:
+        loop = asyncio.get_running_loop()
+        record = {"id": item.id, "task": item.task, "context": item.context, "agent": item.agent_name}
+        output = await loop.run_in_executor(executor, run_in_process_worker, record)
+        if "error" in output:
+            raise RuntimeError(output["error"])
+        return output["result"]
+    return handle
+
+
+class BackgroundWorkQueue:
+    """Runs a WorkQueue on its own event loop thread so callers never block on agent work.
+
+    submit() is thread-safe and returns a concurrent.futures.Future for the result,
+    which makes it usable from Streamlit handlers and other synchronous code.
+    """
+
+    def __init__(self, work_queue: WorkQueue):
+        self.work_queue = work_queue
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="work-queue", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(work_queue.start(), self._loop).result()
+
+    def submit(self, task: str, context: Optional[Dict[str, Any]] = None,
+               priority: int = DEFAULT_PRIORITY) -> ThreadFuture:
+        """Queues a task and returns a future resolving to its result.
+
+        The task is routed in the calling thread, so a task no agent can handle
+        raises ValueError here rather than through the future.
+        """
+        agent_name = self.work_queue.orchestrator.select_agent(task).name
+
+        async def enqueue_and_wait() -> str:
+            item = await self.work_queue.enqueue(task, context, priority, agent_name=agent_name)
+            return await item.future
+        return asyncio.run_coroutine_threadsafe(enqueue_and_wait(), self._loop)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.work_queue.stats()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the workers, first letting queued work finish when wait is true."""
+        asyncio.run_coroutine_threadsafe(self._stop(wait), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _stop(self, wait: bool) -> None:
+        if wait:
+            await self.work_queue.join()
+        await self.work_queue.stop()
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_SESSIONS = 256
+
+
+class HistoryEntry:
+    """A single user/agent/error turn in the workflow history."""
+
+    __slots__ = ("role", "content", "name", "timestamp")
+
+    def __init__(self, role: str, content: str, name: Optional[str] = None, timestamp: Optional[float] = None):
+        self.role = role
+        self.content = content
+        self.name = name
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            entry["name"] = self.name
+        return entry
+
+    def render(self) -> str:
+        """One "speaker: content" line, as used in the {history} prompt slot."""
+        speaker = f"{self.role} ({self.name})" if self.name else self.role
+        return f"{speaker}: {self.content}"
+
+    def __repr__(self) -> str:
+        return f"HistoryEntry(role={self.role!r}, name={self.name!r}, content={self.content[:40]!r})"
+
+
+class WorkflowHistory:
+    """Bounded workflow history with one ring buffer per session.
+
+    Each session keeps at most max_entries turns and at most max_sessions sessions
+    are held in memory, least recently used first out. When spill_path is set,
+    entries pushed out of memory are appended to that file as JSON lines instead of
+    being dropped.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 spill_path: Optional[str] = None):
+        if max_entries < 1 or max_sessions < 1:
+            raise ValueError("max_entries and max_sessions must be positive")
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        self.spill_path = spill_path
+        self._sessions: "OrderedDict[Optional[str], Deque[HistoryEntry]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+
+    def append(self, role: str, content: str, name: Optional[str] = None,
+               session_id: Optional[str] = None) -> HistoryEntry:
+        """Records a turn, evicting (and optionally spilling) the oldest one when full."""
+        entry = HistoryEntry(role, content, name)
+        spilled: List[tuple] = []
+        with self._lock:
+            window = self._sessions.get(session_id)
+            if window is None:
+                window = self._sessions[session_id] = deque(maxlen=self.max_entries)
+                if len(self._sessions) > self.max_sessions:
+                    evicted_id, evicted = self._sessions.popitem(last=False)
+                    spilled.extend((evicted_id, old) for old in evicted)
+            else:
+                self._sessions.move_to_end(session_id)
+            if len(window) == self.max_entries:
+                spilled.append((session_id, window[0]))
+            window.append(entry)
+        if spilled and self.spill_path:
+            self._spill(spilled)
+        return entry
+
+    def last(self, n: int, session_id: Optional[str] = None) -> List[HistoryEntry]:
+        """Returns the most recent n turns of a session, oldest first, without copying the window."""
+        with self._lock:
+            window = self._sessions.get(session_id)
+            if not window or n <= 0:
+                return []
+            recent = list(islice(reversed(window), n))
+        recent.reverse()
+        return recent
+
+    def format_recent(self, n: int, session_id: Optional[str] = None) -> str:
+        """Renders the last n turns for the {history} slot of GENERAL_AGENT_PROMPT_TEMPLATE."""
+        return "\n".join(entry.render() for entry in self.last(n, session_id))
+
+    def clear(self, session_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(window) for window in self._sessions.values())
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        with self._lock:
+            entries = [entry for window in self._sessions.values() for entry in window]
+        return iter(entries)
+
+    def _spill(self, spilled: List[tuple]) -> None:
+        lines = []
+        for session_id, entry in spilled:
+            record = entry.to_dict()
+            record["session_id"] = session_id
+            record["timestamp"] = entry.timestamp
+            lines.append(json.dumps(record) + "\n")
+        with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as spill_file:
+            spill_file.writelines(lines)